@@ -11,9 +11,11 @@ https://docs.djangoproject.com/en/2.0/ref/settings/
 """
 
 import os
+import sys
 
 from django.core.management.utils import get_random_secret_key
-from huey import SqliteHuey
+
+from kallisticore.utils.queue import make_huey
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
@@ -120,7 +122,49 @@ REST_FRAMEWORK = {
 # Kallisti Custom Setting #
 ###########################
 
-HUEY = SqliteHuey('kallisti_queues', filename=DATABASES['default']['NAME'])
+# Task queue backend: sqlite, file, memory or redis. The sqlite queue is
+# kept in the application database unless KALLISTI_QUEUE_SQLITE_FILENAME
+# names a file of its own, e.g. queues.sqlite3, for polling the queue not to
+# compete with the writes to the application database. The tasks left in a
+# queue are not moved to another one: before changing the backend or the
+# queue file, stop the API and run `manage.py run_kallisti_worker` until the
+# queue is empty. The memory queue is only shared within a process, it is
+# the default of the tests.
+KALLISTI_QUEUE_BACKEND = os.getenv(
+    'KALLISTI_QUEUE_BACKEND',
+    'memory' if sys.argv[1:2] == ['test'] else 'sqlite')
+KALLISTI_QUEUE_OPTIONS = {
+    'sqlite': {
+        'filename': os.getenv('KALLISTI_QUEUE_SQLITE_FILENAME',
+                              DATABASES['default']['NAME']),
+        'journal_mode': 'wal'
+    },
+    'file': {
+        'path': os.getenv('KALLISTI_QUEUE_FILE_PATH',
+                          os.path.join(BASE_DIR, 'queues')),
+        'use_thread_lock': True
+    },
+    'memory': {},
+    'redis': {
+        'url': os.getenv('KALLISTI_QUEUE_REDIS_URL',
+                         'redis://localhost:6379/0')
+    }
+}
+
+HUEY = make_huey(KALLISTI_QUEUE_BACKEND, 'kallisti_queues',
+                 **KALLISTI_QUEUE_OPTIONS[KALLISTI_QUEUE_BACKEND])
+
+# Trial worker pool of `manage.py run_kallisti_worker`: worker type (thread,
+# process or greenlet) and number of trials run concurrently. On shutdown,
+# the running trials are given KALLISTI_WORKER_DRAIN_TIMEOUT_SECONDS to
+# complete. The capacity of the pool is logged every
+# KALLISTI_WORKER_CAPACITY_REPORT_INTERVAL_SECONDS (0 to disable).
+KALLISTI_WORKER_TYPE = os.getenv('KALLISTI_WORKER_TYPE', 'thread')
+KALLISTI_WORKER_CONCURRENCY = int(os.getenv('KALLISTI_WORKER_CONCURRENCY',
+                                            '4'))
+KALLISTI_WORKER_DRAIN_TIMEOUT_SECONDS = float(
+    os.getenv('KALLISTI_WORKER_DRAIN_TIMEOUT_SECONDS', '300'))
+KALLISTI_WORKER_CAPACITY_REPORT_INTERVAL_SECONDS = 60
 
 # Config for JWT Verification
 # Audience for Open ID should be a client ID.
@@ -156,6 +200,30 @@ KALLISTI_MODULE_MAP = {
     'aws': 'kallisticore.modules.aws'
 }
 
+# Keep-alive HTTP sessions of the http actions: number of hosts and of
+# connections per host kept in the pools, connect and read timeouts (also of
+# the async http actions)
+KALLISTI_HTTP_POOL_CONNECTIONS = 10
+KALLISTI_HTTP_POOL_MAXSIZE = 10
+KALLISTI_HTTP_CONNECT_TIMEOUT_SECONDS = 10
+KALLISTI_HTTP_READ_TIMEOUT_SECONDS = 60
+
+# OAuth tokens of the http actions are refreshed this many seconds before
+# they expire
+KALLISTI_OAUTH_TOKEN_REFRESH_AHEAD_SECONDS = 60
+
+# Directory of the chaostoolkit-aws activity manifests, which spare workers
+# the discovery of the chaostoolkit-aws activities. Disabled when empty.
+KALLISTI_AWS_ACTIVITY_MANIFEST_DIR = os.getenv(
+    'KALLISTI_AWS_ACTIVITY_MANIFEST_DIR', '')
+
+# Credentials are fetched again after this many seconds, and file based
+# credentials as soon as their file is modified when the check is enabled.
+# Up to KALLISTI_CREDENTIAL_CACHE_MAX_SIZE credentials are kept.
+KALLISTI_CREDENTIAL_CACHE_TTL_SECONDS = 300
+KALLISTI_CREDENTIAL_CACHE_CHECK_MTIME = True
+KALLISTI_CREDENTIAL_CACHE_MAX_SIZE = 256
+
 # credential class map
 KALLISTI_CREDENTIAL_CLASS_MAP = {
     'ENV_VAR_USERNAME_PASSWORD': 'kallisticore.lib.credential.'
@@ -165,6 +233,68 @@ KALLISTI_CREDENTIAL_CLASS_MAP = {
                               'KubernetesServiceAccountTokenCredential'
 }
 
+# Class executing trials. Use
+# 'kallisticore.lib.async_trial_executor.AsyncTrialExecutor' to run the steps
+# on an asyncio event loop.
+KALLISTI_TRIAL_EXECUTOR_CLASS = os.getenv(
+    'KALLISTI_TRIAL_EXECUTOR_CLASS',
+    'kallisticore.lib.trial_executor.TrialExecutor')
+
+# Maximum number of steps of a trial run at the same time. Steps only run
+# concurrently when they declare `depends_on`.
+KALLISTI_TRIAL_STEP_MAX_WORKERS = int(
+    os.getenv('KALLISTI_TRIAL_STEP_MAX_WORKERS', '4'))
+
+# Interval at which running trials check for stops initiated by other
+# processes
+KALLISTI_TRIAL_STOP_POLL_INTERVAL_SECONDS = 1
+
+# How trial log records are persisted: 'rows' appends a row per record, with
+# the step details in indexed columns, written in batches of
+# KALLISTI_TRIAL_RECORDS_BATCH_SIZE; 'blob' rewrites the whole records column
+# of the trial on every commit instead. The trial API, reports and event
+# streams read both. With 'rows' the records column of new trials is left
+# empty: readers of the column must read the record rows instead, which
+# migration 0027 creates for the trials recorded before.
+KALLISTI_TRIAL_RECORDS_STORAGE = os.getenv('KALLISTI_TRIAL_RECORDS_STORAGE',
+                                           'rows')
+KALLISTI_TRIAL_RECORDS_BATCH_SIZE = 1
+
+# Event streams of trials poll for new records at this interval, send a
+# keep-alive comment when idle for KALLISTI_TRIAL_STREAM_HEARTBEAT_SECONDS and
+# are closed after KALLISTI_TRIAL_STREAM_TIMEOUT_SECONDS, for the clients to
+# resume them from their last event id. Each open stream holds a worker of
+# the WSGI server for up to KALLISTI_TRIAL_STREAM_TIMEOUT_SECONDS, polling the
+# database meanwhile: a process serves up to
+# KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS streams at a time, which must stay
+# below its number of workers
+KALLISTI_TRIAL_STREAM_POLL_INTERVAL_SECONDS = 1
+KALLISTI_TRIAL_STREAM_HEARTBEAT_SECONDS = 15
+KALLISTI_TRIAL_STREAM_TIMEOUT_SECONDS = 300
+KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS = int(os.getenv(
+    'KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS', '10'))
+
+# Page size of the trial, experiment and schedule lists, paginated with a
+# cursor ordered by creation time. Clients may request another page size
+# with the 'page_size' query parameter, up to KALLISTI_API_MAX_PAGE_SIZE.
+# Setting it to 0 returns the lists whole, as before pagination, for the
+# clients which do not follow the pages yet.
+KALLISTI_API_PAGE_SIZE = int(os.getenv('KALLISTI_API_PAGE_SIZE',
+                                       '100')) or None
+KALLISTI_API_MAX_PAGE_SIZE = 1000
+
+# Trials and experiments are served with an ETag, privately to the
+# authenticated user. Completed trials may be reused by the client for this
+# many seconds, other trials and experiments are revalidated with their ETag.
+KALLISTI_COMPLETED_TRIAL_CACHE_MAX_AGE_SECONDS = 86400
+
+# Number of compiled step templates kept in memory
+KALLISTI_TEMPLATE_CACHE_SIZE = 1024
+
+# Number of parsed JSONPath expressions of the step expectations kept in
+# memory
+KALLISTI_JSON_PATH_CACHE_SIZE = 1024
+
 # Custom trial observer classes to be executed at trial completion
 # They need to implement kallisticore.lib.observe.observer.Observer
 TRIAL_OBSERVERS = []
@@ -201,3 +331,6 @@ SWAGGER_SETTINGS = {
 
 # Report Header
 KALLISTI_REPORT_HEADER_TITLE = "Kallisti Report"
+
+# Number of trials read at a time while streaming a report
+KALLISTI_REPORT_CHUNK_SIZE = 100
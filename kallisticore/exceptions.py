@@ -48,6 +48,12 @@ class InvalidExpectOperator(KallistiCoreException):
         super().__init__(message, *args)
 
 
+class InvalidExpectAggregate(KallistiCoreException):
+    def __init__(self, aggregate: str, *args: Optional[List]) -> None:
+        message = "Invalid aggregate: " + str(aggregate)
+        super().__init__(message, *args)
+
+
 class FailedExpectation(KallistiCoreException):
     def __init__(self, message: str, *args: Optional[List]) -> None:
         message = "Expectation failed({})".format(message)
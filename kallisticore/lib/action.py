@@ -1,8 +1,15 @@
+import asyncio
+import contextvars
 import importlib
 import inspect
+import logging
+import time
 from copy import deepcopy
+from functools import partial
+from threading import Lock
 from typing import Dict, Callable, Any, List, Optional
 
+from django.conf import settings
 from kallisticore.exceptions import UnknownModuleName, CouldNotFindFunction
 from kallisticore.lib.credential import Credential
 from kallisticore.lib.expectation import Expectation
@@ -10,21 +17,80 @@ from kallisticore.models.step import Step
 from kallisticore.utils.singleton import Singleton
 
 
-class KallistiFunctionCache(metaclass=Singleton):
-    def __init__(self):
-        self.functions = {}
-
-    def add(self, module_name: str, function_name: str,
-            function_implementation: Callable) -> None:
-        key = self._function_key(function_name, module_name)
-        self.functions[key] = function_implementation
+class ActionRegistry(metaclass=Singleton):
+    """
+    Index of the functions declared by the action modules, built once per
+    process: for each function loader and module, the name of every
+    function and the name of the module declaring it. The declaring module
+    is imported when one of its functions is first used, and functions are
+    looked up through their module, so that patched module attributes are
+    honoured.
+    """
+    logger = logging.getLogger(__name__)
 
-    def get(self, module_name, function_name) -> Callable:
-        key = self._function_key(module_name, function_name)
-        return self.functions.get(key, None)
+    def __init__(self):
+        self._functions = {}
+        self._lock = Lock()
+        self.build_duration = None
 
-    def _function_key(self, function_name: str, module_name: str):
-        return module_name, function_name
+    def get_functions(self, func_loader: 'FunctionLoader') -> Dict[str, str]:
+        """
+        :param func_loader: the function loader of the action module
+        :returns the names of the modules declaring the functions of the
+         module by function name, indexed on first use.
+        """
+        key = (type(func_loader), func_loader.module.__name__)
+        functions = self._functions.get(key)
+        if functions is None:
+            with self._lock:
+                functions = self._functions.get(key)
+                if functions is None:
+                    functions = func_loader.get_functions()
+                    self._functions[key] = functions
+        return functions
+
+    def build(self, module_map: dict = None) -> float:
+        """ Index the functions of all the action modules.
+
+        :param module_map: map of action modules, defaults to
+         KALLISTI_MODULE_MAP.
+        :returns the seconds taken to build the registry.
+        """
+        module_map = module_map or getattr(settings, 'KALLISTI_MODULE_MAP',
+                                           {})
+        start = time.monotonic()
+        for namespace in module_map:
+            try:
+                self.get_functions(make_function_loader(module_map,
+                                                        namespace))
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to index actions of module '{}', {}"
+                    .format(namespace, e))
+        self.build_duration = time.monotonic() - start
+        return self.build_duration
+
+    def list_functions(self, module_map: dict = None) -> Dict[str, List[str]]:
+        """
+        :param module_map: map of action modules, defaults to
+         KALLISTI_MODULE_MAP.
+        :returns the sorted function names of the indexed action modules by
+         namespace.
+        """
+        module_map = module_map or getattr(settings, 'KALLISTI_MODULE_MAP',
+                                           {})
+        functions_by_module = {}
+        for (_, module_name), functions in list(self._functions.items()):
+            functions_by_module.setdefault(module_name, set()).update(
+                functions)
+        return {namespace: sorted(functions_by_module[module_name])
+                for namespace, module_name in module_map.items()
+                if module_name in functions_by_module}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._functions = {}
+            self.build_duration = None
 
 
 class FunctionLoader:
@@ -35,41 +101,40 @@ class FunctionLoader:
         :param module_name: the name of the module to search
          e.g. "cf".
         """
-        self._functions = KallistiFunctionCache()
         self._module_path = module_name
         self.module = FunctionLoader.get_module(module_map, self._module_path)
 
     def get_function(self, function_name: str) -> Callable:
         """ Get the function based on the type_name.
 
-        Caches the results for previous findings, and search the cache
-        before searching the modules.
+        Looks the function up in the action registry, which indexes the
+        functions of the modules the first time they are searched.
 
         :param function_name: the name of the function to search
             e.g. "map_route_to_app".
         :returns the function found or raise exception if no function can be
             found.
         """
-        function_implementation = self._functions.get(self._module_path,
-                                                      function_name)
-        if not function_implementation:
-            function_implementation = self._find_function(function_name)
-            self._functions.add(self._module_path, function_name,
-                                function_implementation)
+        declared_name = self._get_declared_name(function_name)
+        module_name = ActionRegistry().get_functions(self).get(declared_name)
+        if module_name is None:
+            raise CouldNotFindFunction(self._module_path + "." + function_name)
+        return getattr(importlib.import_module(module_name), declared_name)
 
-        return function_implementation
+    def get_functions(self) -> Dict[str, str]:
+        """ Search the modules for the functions they declare in `__all__`.
 
-    def _find_function(self, function_name: str) -> Callable:
-        modules_to_search = self._get_modules_to_search()
-
-        for module in modules_to_search:
-            if hasattr(module, "__all__"):
-                declared_action_names = getattr(module, "__all__")
-                if function_name in declared_action_names:
-                    function_implementation = getattr(module, function_name)
-                    return function_implementation
+        :returns the names of the modules declaring the functions by function
+         name, the first module declaring a function takes precedence.
+        """
+        functions = {}
+        for module in self._get_modules_to_search():
+            for function_name in getattr(module, "__all__", []):
+                functions.setdefault(function_name, module.__name__)
+        return functions
 
-        raise CouldNotFindFunction(self._module_path + "." + function_name)
+    def _get_declared_name(self, function_name: str) -> str:
+        return function_name
 
     def _get_modules_to_search(self) -> list:
         modules_to_search = [self.module]
@@ -150,7 +215,26 @@ class Action:
 
         :return True if the action has been executed successfully:
         """
-        result = self.func(**self.arguments)
+        if inspect.iscoroutinefunction(self.func):
+            result = asyncio.run(self.func(**self.arguments))
+        else:
+            result = self.func(**self.arguments)
+        self.check_result_for_expectations(result)
+        return result
+
+    async def execute_async(self) -> Any:
+        """ Execute the action on the running event loop. Actions which are
+        not coroutine functions are run in the default executor of the loop,
+        within a copy of the current context.
+
+        :return True if the action has been executed successfully:
+        """
+        if inspect.iscoroutinefunction(self.func):
+            result = await self.func(**self.arguments)
+        else:
+            result = await asyncio.get_running_loop().run_in_executor(
+                None, partial(contextvars.copy_context().run, self.func,
+                              **self.arguments))
         self.check_result_for_expectations(result)
         return result
 
@@ -169,6 +253,26 @@ def make_action(step: Step, action_module_map: dict,
     :returns a Kallisti Action object.
     """
     namespace = step.get_namespace()
-    module = FunctionLoader.get_module(action_module_map, namespace)
-    action_class = getattr(module, '__action_class__', Action)
+    action_class = get_action_class(action_module_map, namespace)
     return action_class.build(step, action_module_map, credential_class_map)
+
+
+def get_action_class(action_module_map: dict, namespace: str):
+    """
+    :param action_module_map: Action module map
+    :param namespace: the namespace of the action module e.g. "cf"
+    :returns the Action class of the action module.
+    """
+    module = FunctionLoader.get_module(action_module_map, namespace)
+    return getattr(module, '__action_class__', Action)
+
+
+def make_function_loader(action_module_map: dict,
+                         namespace: str) -> FunctionLoader:
+    """
+    :param action_module_map: Action module map
+    :param namespace: the namespace of the action module e.g. "cf"
+    :returns the function loader used by the actions of the module.
+    """
+    action_class = get_action_class(action_module_map, namespace)
+    return action_class.func_loader_class(action_module_map, namespace)
@@ -0,0 +1,52 @@
+import asyncio
+from threading import Lock
+
+import aiohttp
+from django.conf import settings
+
+from kallisticore.utils.singleton import Singleton
+
+
+class AsyncHttpSessionPool(metaclass=Singleton):
+    """
+    Keep-alive aiohttp sessions of the coroutine HTTP actions, one per event
+    loop as an aiohttp session is bound to the loop it has been created on.
+    The actions running on a loop share the connection pools of its session
+    instead of opening new connections on each call.
+
+    The requests time out after the connect and read timeouts of the other
+    HTTP actions. The session of a loop is closed with `close`, before the
+    loop is closed, e.g. at the end of the steps of a trial.
+    """
+
+    def __init__(self):
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=getattr(
+                settings, 'KALLISTI_HTTP_CONNECT_TIMEOUT_SECONDS', None),
+            sock_read=getattr(
+                settings, 'KALLISTI_HTTP_READ_TIMEOUT_SECONDS', None))
+        self._sessions = {}
+        self._lock = Lock()
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """
+        :returns the session of the running event loop
+        """
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(timeout=self.timeout)
+            with self._lock:
+                # forget the sessions of the loops closed without `close`
+                for closed_loop in [key for key in self._sessions
+                                    if key.is_closed()]:
+                    del self._sessions[closed_loop]
+                self._sessions[loop] = session
+        return session
+
+    async def close(self) -> None:
+        """ Close the session of the running event loop. """
+        with self._lock:
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
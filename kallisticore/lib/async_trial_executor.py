@@ -0,0 +1,109 @@
+import asyncio
+import sys
+from threading import Event
+from typing import Any, List, Optional
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from kallisticore.exceptions import StepsExecutionError, TrialStopError
+from kallisticore.lib.action import make_action
+from kallisticore.lib.async_http_session_pool import AsyncHttpSessionPool
+from kallisticore.lib.trial_executor import TrialExecutor
+from kallisticore.lib.trial_log_recorder import TrialStepLogRecord
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
+from kallisticore.models.step import Step, StepGraph
+from kallisticore.models.trial import TrialStepsType
+
+
+class AsyncTrialExecutor(TrialExecutor):
+    """
+    Trial executor running the steps on an asyncio event loop. Coroutine
+    actions are awaited on the loop while other actions are run in the
+    default executor of the loop, so that I/O bound steps do not hold a
+    thread each while they wait.
+
+    Database access is handed back to the thread running the trial.
+    A stop cancels the actions still running, unless they are post steps.
+    """
+    STOP_CHECK_INTERVAL_SECONDS = 0.1
+
+    def _execute_steps(self, steps: List[Step], step_type: TrialStepsType):
+        async_to_sync(self._execute_steps_async)(steps, step_type)
+
+    async def _execute_steps_async(self, steps: List[Step],
+                                   step_type: TrialStepsType):
+        graph = StepGraph(steps)
+        semaphore = asyncio.Semaphore(max(self.max_workers, 1))
+        running = {}
+        failure = None
+        try:
+            ready = graph.get_ready()
+            while ready or running:
+                for index in sorted(ready):
+                    self._raise_error_if_stop_initiated(step_type)
+                    step = graph.steps[index]
+                    trial_steps_log = self._make_step_log_record(
+                        step, step_type, index)
+                    task = asyncio.ensure_future(self._execute_action_async(
+                        step, trial_steps_log, semaphore))
+                    running[task] = index
+                ready = []
+
+                done, _ = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = running.pop(task)
+                    if task.exception():
+                        failure = failure or task.exception()
+                    elif not failure:
+                        ready.extend(graph.complete(index))
+        finally:
+            if running:
+                await asyncio.wait(running)
+            await AsyncHttpSessionPool().close()
+        if isinstance(failure, TrialStopError):
+            raise failure
+        if failure:
+            raise StepsExecutionError(step_type) from failure
+
+    async def _execute_action_async(self, step: Step,
+                                    trial_step_log: TrialStepLogRecord,
+                                    semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            action = await asyncio.get_running_loop().run_in_executor(
+                None, make_action, step, self.action_module_map,
+                self.credential_class_map)
+            try:
+                trial_step_log.start()
+                # post steps are not stopped
+                stop_signal = None if trial_step_log.trial_stage == \
+                    TrialStepsType.POST.value else self._stop_signal
+                with TrialStopSignals().watching(stop_signal):
+                    return_value = await self._stop_on_signal(
+                        action.execute_async(), stop_signal)
+                self._log_step_result(step, action, trial_step_log,
+                                      return_value)
+                await sync_to_async(self.trial_log_recorder.commit)(
+                    trial_step_log)
+            except Exception as exception:
+                await sync_to_async(self._log_step_exception)(
+                    action, trial_step_log, sys.exc_info())
+                raise exception
+
+    async def _stop_on_signal(self, action_coroutine,
+                              stop_signal: Optional[Event]) -> Any:
+        """ Await the action, cancelling it when the trial is stopped.
+
+        :raises TrialStopError: when the trial is stopped
+        """
+        task = asyncio.ensure_future(action_coroutine)
+        if stop_signal is None:
+            return await task
+        while True:
+            done, _ = await asyncio.wait(
+                {task}, timeout=self.STOP_CHECK_INTERVAL_SECONDS)
+            if done:
+                return task.result()
+            if stop_signal.is_set():
+                task.cancel()
+                raise TrialStopError()
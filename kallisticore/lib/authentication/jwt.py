@@ -1,5 +1,6 @@
 import base64
 import json
+from threading import Lock
 from typing import Optional
 
 import requests
@@ -17,9 +18,15 @@ class JwtException(Exception):
 class PublicKeys(metaclass=singleton.Singleton):
     def __init__(self):
         self.keys = {}
+        self.refresh_lock = Lock()
+        self._lock = Lock()
 
     def add(self, kid: str, key: Key):
-        self.keys[kid] = key
+        # readers keep iterating over the previous keys
+        with self._lock:
+            keys = dict(self.keys)
+            keys[kid] = key
+            self.keys = keys
 
     def get(self, kid: str) -> Optional[Key]:
         return self.keys.get(kid, None)
@@ -45,7 +52,10 @@ class JwtHandler:
         if not kid:
             raise JwtException('kid not found in token header')
         if self.public_keys.is_empty() or kid not in self.public_keys.kids():
-            self._retrieve_public_keys()
+            with self.public_keys.refresh_lock:
+                # the keys may have been retrieved while waiting
+                if kid not in self.public_keys.kids():
+                    self._retrieve_public_keys()
         if kid not in self.public_keys.kids():
             raise JwtException('jwk for this token was not found')
         public_key = self.public_keys.get(kid)
@@ -1,40 +1,144 @@
 import abc
 import importlib
+import json
 import logging
 import os
+import time
 from abc import abstractmethod
+from collections import OrderedDict
 from copy import deepcopy
-from typing import Dict
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, Optional
+
+from django.conf import settings
 
 from kallisticore.exceptions import InvalidCredentialType
+from kallisticore.utils.singleton import Singleton
 
 
 class Credential(metaclass=abc.ABCMeta):
     logger = logging.getLogger(__name__)
+    # set on load, also for subclasses not calling Credential.__init__
+    _fetched_at = None
+    _fetched_modified_time = None
+    _load_locks_lock = Lock()
 
     def __init__(self) -> None:
         self.source = self.__class__.__name__
 
     @classmethod
     def build(cls, class_map: Dict, cred_dict: Dict) -> 'Credential':
+        """
+        :returns the credential of the specification, shared through the
+         credential cache.
+        """
         if 'type' not in cred_dict or cred_dict['type'] not in \
                 class_map.keys():
             raise InvalidCredentialType(cred_dict.get('type'))
 
-        full_path = class_map[cred_dict['type']]
-        classname = full_path.split('.')[-1]
-        module_path = '.'.join(full_path.split('.')[:-1])
-        module = importlib.import_module(module_path)
-        klass = getattr(module, classname)
-
+        klass = _get_credential_class(class_map[cred_dict['type']])
         args = deepcopy(cred_dict)
         args.pop('type')
-        return klass(**args)
+        return CredentialCache().get(klass, **args)
 
     @abstractmethod
     def fetch(self):
         raise NotImplementedError
 
+    def load(self) -> 'Credential':
+        """ Fetch the credential, unless it has been fetched less than
+        KALLISTI_CREDENTIAL_CACHE_TTL_SECONDS ago and its source has not been
+        modified since.
+
+        :returns the credential
+        """
+        with self._get_load_lock():
+            modified_time = self.get_modified_time()
+            if self._fetched_at is None or \
+                    modified_time != self._fetched_modified_time or \
+                    time.monotonic() - self._fetched_at >= \
+                    CredentialCache().ttl:
+                self.fetch()
+                self._fetched_at = time.monotonic()
+                self._fetched_modified_time = modified_time
+        return self
+
+    def invalidate(self) -> None:
+        """ Fetch the credential again on the next `load`. """
+        self._fetched_at = None
+
+    def _get_load_lock(self) -> Lock:
+        load_lock = self.__dict__.get('_load_lock')
+        if load_lock is None:
+            with Credential._load_locks_lock:
+                load_lock = self.__dict__.setdefault('_load_lock', Lock())
+        return load_lock
+
+    def get_modified_time(self) -> Optional[float]:
+        """
+        :returns the last modification time of the source of the credential
+         when it is a file, None otherwise.
+        """
+        return None
+
+
+@lru_cache(maxsize=None)
+def _get_credential_class(full_path: str):
+    classname = full_path.split('.')[-1]
+    module_path = '.'.join(full_path.split('.')[:-1])
+    module = importlib.import_module(module_path)
+    return getattr(module, classname)
+
+
+class CredentialCache(metaclass=Singleton):
+    """
+    Credentials shared by the steps and trials of this process, by class and
+    arguments. A shared credential is fetched again by `Credential.load`
+    once KALLISTI_CREDENTIAL_CACHE_TTL_SECONDS have passed, or as soon as
+    its file has been modified. Up to KALLISTI_CREDENTIAL_CACHE_MAX_SIZE
+    credentials are kept, the least recently used ones are dropped first.
+    """
+
+    def __init__(self):
+        self.ttl = getattr(settings, 'KALLISTI_CREDENTIAL_CACHE_TTL_SECONDS',
+                           300)
+        self.max_size = getattr(settings,
+                                'KALLISTI_CREDENTIAL_CACHE_MAX_SIZE', 256)
+        self._credentials = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, klass, **kwargs) -> Credential:
+        """
+        :param klass: the credential class
+        :param kwargs: the arguments of the credential
+        :returns the shared credential of the class and arguments
+        """
+        key = self._get_key(klass, kwargs)
+        with self._lock:
+            credential = self._credentials.get(key)
+            if credential is None:
+                credential = klass(**kwargs)
+                self._credentials[key] = credential
+                while len(self._credentials) > self.max_size:
+                    self._credentials.popitem(last=False)
+            else:
+                self._credentials.move_to_end(key)
+        return credential
+
+    def invalidate(self, klass, **kwargs) -> None:
+        with self._lock:
+            self._credentials.pop(self._get_key(klass, kwargs), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._credentials = OrderedDict()
+
+    @staticmethod
+    def _get_key(klass, kwargs):
+        return '{}.{}'.format(klass.__module__, klass.__qualname__), \
+            json.dumps(kwargs, sort_keys=True, default=str)
+
 
 class TokenCredential(Credential):
     _token = None
@@ -82,6 +186,15 @@ class TokenFileCredential(TokenCredential):
             token = token_fd.read()
         self._token = token
 
+    def get_modified_time(self) -> Optional[float]:
+        if not getattr(settings, 'KALLISTI_CREDENTIAL_CACHE_CHECK_MTIME',
+                       True):
+            return None
+        try:
+            return os.stat(self.token_path).st_mtime
+        except OSError:
+            return None
+
 
 class KubernetesServiceAccountTokenCredential(TokenFileCredential):
     def __init__(self):
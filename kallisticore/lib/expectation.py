@@ -2,11 +2,26 @@ import abc
 import re
 from abc import abstractmethod
 from copy import deepcopy
-from typing import Any, Dict
+from functools import lru_cache
+from operator import eq, ge, gt, le, lt, ne
+from typing import Any, Dict, List, Optional
 
+import numpy as np
+from django.conf import settings
+from jsonpath_ng import JSONPath
 from jsonpath_ng.ext import parse
 from kallisticore.exceptions import InvalidExpectOperator, FailedExpectation, \
-    KeyNotFoundException
+    KeyNotFoundException, InvalidExpectAggregate
+
+JSON_PATH_CACHE_SIZE = getattr(settings, 'KALLISTI_JSON_PATH_CACHE_SIZE', 1024)
+
+
+@lru_cache(maxsize=JSON_PATH_CACHE_SIZE)
+def parse_json_path(json_path: str) -> JSONPath:
+    """ Parse the JSONPath expression, shared by the expectations of all
+    the steps and trials of the process.
+    """
+    return parse(json_path)
 
 
 class Expectation(metaclass=abc.ABCMeta):
@@ -15,7 +30,12 @@ class Expectation(metaclass=abc.ABCMeta):
     def build(cls, expectation_specification: Dict) -> 'Expectation':
         data = deepcopy(expectation_specification)
         operator = data.get('operator', None)
-        if operator == RegexExpectation.REGEX_OPERATOR_VALUE:
+        if AggregateExpectation.AGGREGATE_KEY in data:
+            if operator not in OperatorExpectation.OPERATOR_MAP.keys():
+                raise InvalidExpectAggregate("{} with operator {}".format(
+                    data[AggregateExpectation.AGGREGATE_KEY], operator))
+            expectation = AggregateExpectation.build(data)
+        elif operator == RegexExpectation.REGEX_OPERATOR_VALUE:
             expectation = RegexExpectation.build(data)
         elif operator in OperatorExpectation.OPERATOR_MAP.keys():
             expectation = OperatorExpectation.build(data)
@@ -47,20 +67,30 @@ class OperatorExpectation(Expectation):
             expected_key, expected_value = key, data[key]
         return OperatorExpectation(operator, expected_key, expected_value)
 
+    COMPARATORS = {
+        '!=': ne,
+        '==': eq,
+        '<=': le,
+        '<': lt,
+        '>=': ge,
+        '>': gt,
+    }
+
     def __init__(self, operator: str, expected_key: str,
                  expected_value: object):
         super().__init__()
         self.operator = operator
         self.expected_key = expected_key
         self.expected_value = expected_value
+        self._compare = self.COMPARATORS[operator]
+        self._json_paths = {}
 
     def execute(self, action_result):
         actual_value = self._align_float_values(
-            ValueExtractor(action_result, self.expected_key).extract())
+            ValueExtractor(action_result, self.expected_key,
+                           self._json_paths).extract())
 
-        expression = "actual_value {} self.expected_value".format(
-            self.operator)
-        if not eval(expression):
+        if not self._compare(actual_value, self.expected_value):
             raise FailedExpectation("{}".format("{} {} {}".format(
                 actual_value, self.operator, self.expected_value)))
 
@@ -94,6 +124,119 @@ class OperatorExpectation(Expectation):
             return None
 
 
+class AggregateExpectation(Expectation):
+    """
+    Expectation on an aggregate of all the values matched by the key path,
+    e.g. the samples of a Prometheus range query:
+
+    {"operator": "lt", "aggregate": "p95", "data.result[*].values[*][1]": 0.5}
+
+    The aggregates are mean, min, max, sum, count, percentiles (p50, p99.9,
+    ...), count_where, which counts the values matching the `where`
+    condition, e.g. {"aggregate": "count_where", "where": {"gt": 0.5},
+    "operator": "le", ...: 3}, and all/any, which check that all or any of
+    the values compare with the expected value. Aggregates are compared
+    with the comparison operators only, not with regex.
+    """
+    AGGREGATE_KEY = 'aggregate'
+    WHERE_KEY = 'where'
+    AGGREGATES = {
+        'mean': np.mean,
+        'min': np.min,
+        'max': np.max,
+        'sum': np.sum,
+        'count': np.size,
+    }
+    PERCENTILE_PATTERN = re.compile(r'^p(\d+(?:\.\d+)?)$')
+
+    @classmethod
+    def build(cls, data: Dict) -> 'AggregateExpectation':
+        operator = OperatorExpectation.OPERATOR_MAP[data.pop('operator')]
+        aggregate = data.pop(cls.AGGREGATE_KEY)
+        where = data.pop(cls.WHERE_KEY, None)
+        expected_key, expected_value = None, None
+        for key in data:
+            expected_key, expected_value = key, data[key]
+        return AggregateExpectation(aggregate, operator, expected_key,
+                                    expected_value, where)
+
+    def __init__(self, aggregate: str, operator: str, expected_key: str,
+                 expected_value: object, where: Optional[Dict] = None):
+        super().__init__()
+        self.aggregate = aggregate
+        self.operator = operator
+        self.expected_key = expected_key
+        self.expected_value = expected_value
+        self.where = where
+        self._expected_number = self._to_number(
+            expected_value, "{} of {}".format(aggregate, expected_key))
+        self._compare = OperatorExpectation.COMPARATORS[operator]
+        self._aggregate = self._make_aggregate(aggregate, where)
+        self._json_paths = {}
+
+    def execute(self, action_result):
+        values = ValueExtractor(action_result, self.expected_key,
+                                self._json_paths).extract_all()
+        try:
+            values = np.asarray(values, dtype=float)
+        except (TypeError, ValueError):
+            raise FailedExpectation("{} of {} requires numeric values: {}"
+                                    .format(self.aggregate,
+                                            self.expected_key, values))
+        if values.size == 0 and self.aggregate not in ['count',
+                                                       'count_where']:
+            raise FailedExpectation("No values of {} to aggregate"
+                                    .format(self.expected_key))
+
+        if self.aggregate in ['all', 'any']:
+            matches = self._compare(values, self._expected_number)
+            if not self._aggregate(matches):
+                raise FailedExpectation("{} of {} {} {}".format(
+                    self.aggregate, values.tolist(), self.operator,
+                    self.expected_value))
+            return
+
+        actual_value = float(self._aggregate(values))
+        if not self._compare(actual_value, self._expected_number):
+            raise FailedExpectation("{} of {} {} {} {}".format(
+                self.aggregate, self.expected_key, actual_value,
+                self.operator, self.expected_value))
+
+    @classmethod
+    def _make_aggregate(cls, aggregate: str, where: Optional[Dict]):
+        if aggregate in cls.AGGREGATES:
+            return cls.AGGREGATES[aggregate]
+        if aggregate == 'all':
+            return np.all
+        if aggregate == 'any':
+            return np.any
+        if aggregate == 'count_where':
+            if not where or len(where) != 1 or \
+                    list(where)[0] not in OperatorExpectation.OPERATOR_MAP:
+                raise InvalidExpectAggregate(
+                    "{} with where {}".format(aggregate, where))
+            where_operator, where_value = list(where.items())[0]
+            where_value = cls._to_number(where_value, "{} with where {}"
+                                         .format(aggregate, where_operator))
+            compare = OperatorExpectation.COMPARATORS[
+                OperatorExpectation.OPERATOR_MAP[where_operator]]
+            return lambda values: np.count_nonzero(
+                compare(values, where_value))
+        percentile = cls.PERCENTILE_PATTERN.match(str(aggregate))
+        if percentile and float(percentile.group(1)) <= 100:
+            return lambda values: np.percentile(
+                values, float(percentile.group(1)))
+        raise InvalidExpectAggregate(aggregate)
+
+    @staticmethod
+    def _to_number(value: object, name: str) -> float:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            raise InvalidExpectAggregate(
+                "{} requires a numeric value: {!r}".format(name, value))
+
+
 class RegexExpectation(Expectation):
     REGEX_OPERATOR_VALUE = 'regex'
 
@@ -109,20 +252,30 @@ class RegexExpectation(Expectation):
         super().__init__()
         self.expected_key = expected_key
         self.expected_value = expected_value
+        self._pattern = re.compile(r"{}".format(expected_value))
+        self._json_paths = {}
 
     def execute(self, action_result):
-        actual_value = ValueExtractor(action_result,
-                                      self.expected_key).extract()
-        if not re.search(r"{}".format(self.expected_value), actual_value):
+        actual_value = ValueExtractor(action_result, self.expected_key,
+                                      self._json_paths).extract()
+        if not self._pattern.search(actual_value):
             raise FailedExpectation("Regex pattern {} does not match {}."
                                     .format(self.expected_value, actual_value))
 
 
 class ValueExtractor:
 
-    def __init__(self, input_data: object, key_path: str) -> None:
+    def __init__(self, input_data: object, key_path: str,
+                 json_paths: Optional[Dict[str, JSONPath]] = None) -> None:
+        """
+        :param input_data: the data to extract the value from
+        :param key_path: the JSONPath of the value, relative to the root
+        :param json_paths: the parsed JSONPath expressions of the key path,
+         kept by the caller to reuse them across extractions.
+        """
         self._key_path = key_path
         self._input = input_data
+        self._json_paths = json_paths if json_paths is not None else {}
 
     def extract(self) -> Any:
         if isinstance(self._input, dict):
@@ -133,22 +286,53 @@ class ValueExtractor:
             return self.extract_key_path_from_input_of_type_other_than_dict()
 
     def extract_key_path_from_input_of_type_dict(self):
-        matches = parse("$.{}".format(self._key_path)).find(self._input)
+        matches = self._get_json_path("$.{}").find(self._input)
         if len(matches) < 1:
             self._raise_key_not_found_exception()
         return matches[0].value
 
     def extract_key_path_from_input_of_type_list(self):
-        matches = parse("${}".format(self._key_path)).find(self._input)
+        matches = self._get_json_path("${}").find(self._input)
         if len(matches) < 1:
             self._raise_key_not_found_exception()
         return matches[0].value
 
+    def extract_all(self) -> List[Any]:
+        """
+        :returns all the values matched by the key path. A single matched
+         list is returned as the list of values.
+        """
+        if isinstance(self._input, dict):
+            matches = self._get_json_path("$.{}").find(self._input)
+        elif isinstance(self._input, list):
+            matches = self._get_json_path("${}").find(self._input)
+        else:
+            matches = [
+                self.extract_key_path_from_input_of_type_other_than_dict()]
+            return self._flatten(matches)
+        if len(matches) < 1:
+            self._raise_key_not_found_exception()
+        return self._flatten([match.value for match in matches])
+
+    @staticmethod
+    def _flatten(values: List[Any]) -> List[Any]:
+        if len(values) == 1 and isinstance(values[0], (list, tuple)):
+            return list(values[0])
+        return values
+
     def extract_key_path_from_input_of_type_other_than_dict(self):
         if self._key_path == 'value':
             return self._input
         self._raise_key_not_found_exception()
 
+    def _get_json_path(self, json_path_format: str) -> JSONPath:
+        json_path = self._json_paths.get(json_path_format)
+        if json_path is None:
+            json_path = parse_json_path(
+                json_path_format.format(self._key_path))
+            self._json_paths[json_path_format] = json_path
+        return json_path
+
     def _raise_key_not_found_exception(self):
         raise KeyNotFoundException("The key path {} is not found in {}"
                                    .format(self._key_path, self._input))
@@ -0,0 +1,112 @@
+from threading import Lock
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from kallisticore.utils.singleton import Singleton
+
+
+class HttpSessionPool(metaclass=Singleton):
+    """
+    Keep-alive HTTP connection pools, one per scheme and host, shared by the
+    HTTP actions of this process so that successive requests to a service
+    reuse their connections instead of opening a new one each time.
+
+    The connection pools are held by HTTP adapters shared by a new session
+    for each request: cookies are neither kept nor shared between requests,
+    e.g. of the trials of different users. The requests to other hosts, e.g.
+    redirects, go through the connection pools of their hosts.
+    """
+
+    def __init__(self):
+        self.pool_connections = getattr(
+            settings, 'KALLISTI_HTTP_POOL_CONNECTIONS', 10)
+        self.pool_maxsize = getattr(settings, 'KALLISTI_HTTP_POOL_MAXSIZE', 10)
+        self.timeout = (
+            getattr(settings, 'KALLISTI_HTTP_CONNECT_TIMEOUT_SECONDS', None),
+            getattr(settings, 'KALLISTI_HTTP_READ_TIMEOUT_SECONDS', None))
+        self._adapters = {}
+        self._lock = Lock()
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """ Send the request through the connection pool of the host of the
+        url.
+
+        :param method: the HTTP method
+        :param url: the url of the request
+        :param kwargs: the arguments of `requests.Session.request`, the
+         timeout defaults to the configured connect and read timeouts.
+        :returns the response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.get_session(url).request(method, url, **kwargs)
+
+    def get_session(self, url: str) -> requests.Session:
+        """
+        :returns a new session sending its requests, e.g. to the scheme and
+         host of the url, through their shared connection pools.
+        """
+        return _PooledSession(self)
+
+    def get_adapter(self, url: str) -> HTTPAdapter:
+        key = self._get_key(url)
+        adapter = self._adapters.get(key)
+        if adapter is None:
+            with self._lock:
+                adapter = self._adapters.get(key)
+                if adapter is None:
+                    adapter = HTTPAdapter(
+                        pool_connections=self.pool_connections,
+                        pool_maxsize=self.pool_maxsize)
+                    self._adapters[key] = adapter
+        return adapter
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        :returns for each host, the number of requests sent, connections
+         opened and requests which reused an open connection.
+        """
+        stats = {}
+        for key, adapter in list(self._adapters.items()):
+            requests_count = 0
+            connections_count = 0
+            for pool_key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(pool_key)
+                if pool:
+                    requests_count += pool.num_requests
+                    connections_count += pool.num_connections
+            stats[key] = {'requests': requests_count,
+                          'connections': connections_count,
+                          'reused': max(requests_count - connections_count,
+                                        0)}
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            adapters, self._adapters = self._adapters, {}
+        for adapter in adapters.values():
+            adapter.close()
+
+    @staticmethod
+    def _get_key(url: str) -> str:
+        parts = urlsplit(url)
+        return '{}://{}'.format(parts.scheme.lower(), parts.netloc.lower())
+
+
+class _PooledSession(requests.Session):
+    """
+    Session sending its HTTP requests through the adapters of the pool, and
+    the requests of the other schemes through its own adapters.
+    """
+
+    def __init__(self, pool: HttpSessionPool):
+        super(_PooledSession, self).__init__()
+        self.pool = pool
+
+    def get_adapter(self, url: str):
+        if urlsplit(url).scheme.lower() in ('http', 'https'):
+            return self.pool.get_adapter(url)
+        return super(_PooledSession, self).get_adapter(url)
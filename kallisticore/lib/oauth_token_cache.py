@@ -0,0 +1,94 @@
+import logging
+import time
+from threading import Lock
+from typing import Callable, Hashable, Optional, Tuple
+
+from django.conf import settings
+
+from kallisticore.utils.singleton import Singleton
+
+
+class OAuthTokenCache(metaclass=Singleton):
+    """
+    Access tokens obtained from OAuth token endpoints, reused until shortly
+    before they expire.
+
+    A token is refreshed once it is within KALLISTI_OAUTH_TOKEN_REFRESH_AHEAD
+    _SECONDS of its expiry: a single caller fetches the new token while
+    concurrent callers keep using the current one. Callers asking for an
+    expired or missing token wait for a single fetch of the token.
+    Tokens without `expires_in` are not cached. A token still valid is
+    used when its refresh fails.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self):
+        self.refresh_ahead = getattr(
+            settings, 'KALLISTI_OAUTH_TOKEN_REFRESH_AHEAD_SECONDS', 60)
+        self._tokens = {}
+        self._locks = {}
+        self._lock = Lock()
+
+    def get_token(self, key: Hashable,
+                  fetch_token: Callable[[], Tuple[str, Optional[float]]]) \
+            -> str:
+        """
+        :param key: identifies the token, e.g. the token url, client id,
+         credential and resource.
+        :param fetch_token: returns a new token and the number of seconds
+         it expires in, or None when unknown.
+        :returns the cached token or a new token.
+        """
+        entry = self._tokens.get(key)
+        now = time.monotonic()
+        if entry and now < entry[1]:
+            return entry[0]
+
+        key_lock = self._get_key_lock(key)
+        if entry and now < entry[2]:
+            # still valid: refresh it unless another caller already does
+            if not key_lock.acquire(blocking=False):
+                return entry[0]
+        else:
+            key_lock.acquire()
+        try:
+            entry = self._tokens.get(key)
+            if entry and time.monotonic() < entry[1]:
+                return entry[0]
+            try:
+                token, expires_in = fetch_token()
+            except Exception:
+                if not entry or time.monotonic() >= entry[2]:
+                    raise
+                self.logger.warning('Failed to refresh the token, using the '
+                                    'current token until it expires.',
+                                    exc_info=True)
+                return entry[0]
+            self._store(key, token, expires_in)
+            return token
+        finally:
+            key_lock.release()
+
+    def invalidate(self, key: Hashable) -> None:
+        self._tokens.pop(key, None)
+        with self._lock:
+            self._locks.pop(key, None)
+
+    def clear(self) -> None:
+        self._tokens = {}
+        with self._lock:
+            self._locks = {}
+
+    def _get_key_lock(self, key: Hashable) -> Lock:
+        with self._lock:
+            return self._locks.setdefault(key, Lock())
+
+    def _store(self, key, token, expires_in):
+        if not expires_in:
+            self._tokens.pop(key, None)
+            return
+        fetched_at = time.monotonic()
+        expires_in = float(expires_in)
+        refresh_in = max(expires_in - self.refresh_ahead, expires_in / 2)
+        self._tokens[key] = (token, fetched_at + refresh_in,
+                             fetched_at + expires_in)
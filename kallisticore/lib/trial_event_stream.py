@@ -0,0 +1,128 @@
+import json
+import time
+from typing import Callable, Iterator, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from kallisticore.models.trial import Trial
+from kallisticore.models.trial_record import TrialRecord
+
+
+class TrialEventStream:
+    """
+    Server-sent events of a trial: a 'record' event for each record
+    committed by the TrialLogRecorder and a 'status' event for each status
+    transition of the trial. The stream
+    ends with an 'end' event once the trial has completed.
+
+    New records and status transitions are polled every `poll_interval`
+    seconds, a keep-alive comment is sent when no event has been sent for
+    `heartbeat_interval` seconds and the stream is closed after `timeout`
+    seconds, for the client to resume it from the last event id received.
+    The record events are identified by the id of their record row, or by
+    their position in the records column of the trials recorded there.
+    `on_close` is called once the stream is closed.
+    """
+    EVENT_RECORD = 'record'
+    EVENT_STATUS = 'status'
+    EVENT_END = 'end'
+
+    def __init__(self, trial_id: str, last_event_id: int = 0,
+                 poll_interval: float = None, heartbeat_interval: float = None,
+                 timeout: float = None, on_close: Callable[[], None] = None):
+        self.trial_id = trial_id
+        self.last_event_id = last_event_id
+        self.poll_interval = poll_interval or getattr(
+            settings, 'KALLISTI_TRIAL_STREAM_POLL_INTERVAL_SECONDS', 1)
+        self.heartbeat_interval = heartbeat_interval or getattr(
+            settings, 'KALLISTI_TRIAL_STREAM_HEARTBEAT_SECONDS', 15)
+        self.timeout = timeout or getattr(
+            settings, 'KALLISTI_TRIAL_STREAM_TIMEOUT_SECONDS', 300)
+        self.on_close = on_close
+
+    def __iter__(self) -> Iterator[str]:
+        # clients reconnect after this many milliseconds
+        yield 'retry: {}\n\n'.format(int(self.poll_interval * 1000))
+        trial_status = None
+        deadline = time.monotonic() + self.timeout
+        sent_at = time.monotonic()
+        while True:
+            # read before the records: the records of a completed trial
+            # are all committed
+            current_status, completed_at, records = \
+                Trial.objects.get_queryset_all(id=self.trial_id)\
+                .values_list('status', 'completed_at', 'records')\
+                .first() or (None, None, None)
+            for event_id, data in self._get_new_records(records):
+                self.last_event_id = event_id
+                sent_at = time.monotonic()
+                yield self.format_event(self.EVENT_RECORD, data, event_id)
+            if current_status != trial_status:
+                trial_status = current_status
+                sent_at = time.monotonic()
+                yield self.format_event(
+                    self.EVENT_STATUS, {'status': current_status,
+                                        'completed_at': completed_at})
+            if completed_at or current_status is None:
+                yield self.format_event(self.EVENT_END,
+                                        {'status': current_status})
+                return
+
+            now = time.monotonic()
+            if now >= deadline:
+                return
+            if now - sent_at >= self.heartbeat_interval:
+                sent_at = now
+                yield ': keep-alive\n\n'
+            time.sleep(self.poll_interval)
+
+    def close(self) -> None:
+        # called by the response once sent, even when the stream was not
+        # iterated
+        on_close, self.on_close = self.on_close, None
+        if on_close:
+            on_close()
+
+    def _get_new_records(self, records: dict) -> Iterator[Tuple[int, dict]]:
+        if records:
+            # the records column is written instead of the record rows,
+            # its stages in the order they were recorded
+            records = [(trial_stage, record)
+                       for trial_stage, stage_records in records.items()
+                       for record in stage_records]
+            for position in range(self.last_event_id, len(records)):
+                trial_stage, record = records[position]
+                yield position + 1, self._make_column_record_data(
+                    trial_stage, record)
+            return
+        for trial_record in TrialRecord.objects.filter(
+                trial_id=self.trial_id, id__gt=self.last_event_id)\
+                .order_by('id'):
+            yield trial_record.id, self._make_record_data(trial_record)
+
+    @staticmethod
+    def _make_column_record_data(trial_stage: str, record: dict) -> dict:
+        return {'trial_stage': trial_stage, 'step_index': None,
+                'step_name': record.get('step_name'), 'status': None,
+                'started_at': None, 'completed_at': None, 'record': record}
+
+    @staticmethod
+    def _make_record_data(trial_record: TrialRecord) -> dict:
+        return {'trial_stage': trial_record.trial_stage,
+                'step_index': trial_record.step_index,
+                'step_name': trial_record.step_name,
+                'status': trial_record.status,
+                'started_at': trial_record.started_at,
+                'completed_at': trial_record.completed_at,
+                'record': trial_record.record}
+
+    @staticmethod
+    def format_event(event: str, data: dict, event_id: int = None) -> str:
+        lines = []
+        if event_id is not None:
+            lines.append('id: {}'.format(event_id))
+        lines.append('event: {}'.format(event))
+        lines.append('data: {}'.format(json.dumps(data,
+                                                  cls=DjangoJSONEncoder)))
+        return '\n'.join(lines) + '\n\n'
@@ -1,18 +1,22 @@
 import logging
 import sys
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from inspect import Traceback
 from typing import Optional, Type, List
 from django.conf import settings
+from django.db import connections
+from django.utils.module_loading import import_string
 
 from kallisticore.exceptions import MissingParameterValueError, \
     StepsExecutionError, TrialStopError
-from kallisticore.lib.action import make_action
+from kallisticore.lib.action import make_action, Action
 from kallisticore.lib.observe.subject import Subject
 from kallisticore.lib.trial_log_recorder import TrialLogRecord, \
     TrialStepLogRecord, TrialLogRecorder
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
 from kallisticore.models import Trial
-from kallisticore.models.step import Step
+from kallisticore.models.step import Step, StepGraph
 from kallisticore.models.trial import TrialStatus, TrialStepsType
 
 
@@ -21,39 +25,55 @@ class TrialExecutor(Subject):
     trial_log_recorder = None
 
     def __init__(self, trial: Trial, action_module_map: dict,
-                 credential_class_map: dict):
+                 credential_class_map: dict, max_workers: int = None):
+        """
+        :param max_workers: maximum number of steps to run at the same time
+         when steps declare `depends_on`. Defaults to the
+         KALLISTI_TRIAL_STEP_MAX_WORKERS setting.
+        """
         super(TrialExecutor, self).__init__()
         self.trial = trial
         self.action_module_map = action_module_map
         self.credential_class_map = credential_class_map
+        if max_workers is None:
+            max_workers = getattr(settings,
+                                  'KALLISTI_TRIAL_STEP_MAX_WORKERS', 1)
+        self.max_workers = max_workers
 
     def __enter__(self):
         self._setup_trial_log_recorder()
+        self._setup_stop_signal()
         return self
 
     def __exit__(self, exc_type: Optional[Type[BaseException]],
                  exc_val: Optional[BaseException],
                  exc_tb: Optional[Traceback]) -> bool:
+        TrialStopSignals().unregister(self.trial.id)
         if exc_val:
             if exc_type.__name__ == "MissingParameterValueError":
                 status = TrialStatus.INVALID
+            elif exc_type == TrialStopError:
+                status = TrialStatus.STOPPED
             elif exc_type == StepsExecutionError and \
                     exc_val.is_pre_steps_exception():
                 status = TrialStatus.ABORTED
             else:
                 status = TrialStatus.FAILED
-            self.trial.update_status(status)
             self._log_unsuccessful_trial(
                 exc_type, exc_val, exc_tb, status.value)
         else:
-            self.trial.update_status(TrialStatus.SUCCEEDED)
+            status = TrialStatus.SUCCEEDED
             self._log_successful_trial()
+        # the records are complete once the trial is seen as completed
+        self.trial_log_recorder.flush()
+        self.trial.update_status(status)
         self.notify(trial=self.trial)
         return True
 
     def run(self):
         self.trial.update_executed_at()
         self.trial.update_status(TrialStatus.IN_PROGRESS)
+        self.trial.resolve_parameters()
         self._raise_error_if_missing_parameters(
             self.trial.get_undefined_variables())
         self._log_trial_start_message()
@@ -79,33 +99,98 @@ class TrialExecutor(Subject):
         return post_steps, pre_steps, steps
 
     def _execute_steps(self, steps: List[Step], step_type: TrialStepsType):
-        for step in steps:
-            if step_type != TrialStepsType.POST and \
-                    self.trial.get_status() == TrialStatus.STOP_INITIATED:
-                raise TrialStopError()
-            step_name = step.get_function_name().replace('_', ' ').capitalize()
-            trial_steps_log = TrialStepLogRecord(step_type.value, step_name,
-                                                 step.where)
+        graph = StepGraph(steps)
+        if self.max_workers > 1 and not graph.is_sequential():
+            self._execute_steps_concurrently(graph, step_type)
+            return
+
+        # one step at a time, each after the steps it depends on
+        for index in graph.get_order():
+            step = steps[index]
+            self._raise_error_if_stop_initiated(step_type)
+            trial_steps_log = self._make_step_log_record(step, step_type,
+                                                         index)
             try:
                 self._execute_action(step, trial_steps_log)
+            except TrialStopError:
+                raise
             except Exception as exception:
                 raise StepsExecutionError(step_type) from exception
 
+    def _execute_steps_concurrently(self, graph: StepGraph,
+                                    step_type: TrialStepsType):
+        """ Run the steps on a thread pool, starting each step as soon as
+        the steps it depends on have completed.
+
+        No new step is started once a step has failed; the steps already
+        running are waited for before the failure is raised.
+        """
+        running = {}
+        failure = None
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix='kallisti-step') as pool:
+            ready = graph.get_ready()
+            while ready or running:
+                for index in sorted(ready):
+                    self._raise_error_if_stop_initiated(step_type)
+                    step = graph.steps[index]
+                    trial_steps_log = self._make_step_log_record(
+                        step, step_type, index)
+                    future = pool.submit(self._execute_action_in_worker,
+                                         step, trial_steps_log)
+                    running[future] = index
+                ready = []
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = running.pop(future)
+                    if future.exception():
+                        failure = failure or future.exception()
+                    elif not failure:
+                        ready.extend(graph.complete(index))
+        if isinstance(failure, TrialStopError):
+            raise failure
+        if failure:
+            raise StepsExecutionError(step_type) from failure
+
+    def _execute_action_in_worker(self, step: Step,
+                                  trial_step_log: TrialStepLogRecord) -> None:
+        try:
+            self._execute_action(step, trial_step_log)
+        finally:
+            # database connections are per thread, do not leak them with
+            # the pool threads
+            connections.close_all()
+
+    def _raise_error_if_stop_initiated(self, step_type: TrialStepsType):
+        if step_type != TrialStepsType.POST and self._stop_signal.is_set():
+            raise TrialStopError()
+
+    def _setup_stop_signal(self):
+        stop_signals = TrialStopSignals()
+        self._stop_signal = stop_signals.register(self.trial.id)
+        # catch stops initiated before the trial started
+        stop_signals.refresh()
+
+    @staticmethod
+    def _make_step_log_record(step: Step, step_type: TrialStepsType,
+                              step_index: int = None) -> TrialStepLogRecord:
+        step_name = step.get_function_name().replace('_', ' ').capitalize()
+        return TrialStepLogRecord(step_type.value, step_name, step.where,
+                                  step_index)
+
     def _execute_action(self, step: Step,
                         trial_step_log: TrialStepLogRecord) -> None:
         action = make_action(step, self.action_module_map,
                              self.credential_class_map)
+        # post steps are not stopped
+        stop_signal = None if trial_step_log.trial_stage == \
+            TrialStepsType.POST.value else self._stop_signal
         try:
-            trial_step_log.append("INFO", "Starting command execution.")
-            return_value = action.execute()
-            if return_value is not None:
-                trial_step_log.append("INFO",
-                                      "Result: {}.".format(return_value))
-                if action.expectations:
-                    trial_step_log.append("INFO",
-                                          "Succeeded. All expectations "
-                                          "passed: {}.".format(step.expect))
-            trial_step_log.append("INFO", "Completed.")
+            trial_step_log.start()
+            with TrialStopSignals().watching(stop_signal):
+                return_value = action.execute()
+            self._log_step_result(step, action, trial_step_log, return_value)
             self.trial_log_recorder.commit(trial_step_log)
         except Exception as exception:
             self._log_step_exception(action, trial_step_log)
@@ -128,15 +213,30 @@ class TrialExecutor(Subject):
         self.trial_log_recorder = TrialLogRecorder(self.trial.id)
 
     def _log_trial_start_message(self):
-        parameters = self.trial.get_populated_parameters() or None
+        parameters = dict(self.trial.get_populated_parameters()) or None
         self._app_log(logging.INFO,
                       "Starting with Parameters: {}.".format(parameters))
 
-    def _log_step_exception(self, action, trial_step_log):
-        exc_name, exc_message, exc_tb = self._handle_exception(*sys.exc_info())
+    @staticmethod
+    def _log_step_result(step: Step, action: Action,
+                         trial_step_log: TrialStepLogRecord, return_value):
+        if return_value is not None:
+            trial_step_log.append("INFO",
+                                  "Result: {}.".format(return_value))
+            if action.expectations:
+                trial_step_log.append("INFO",
+                                      "Succeeded. All expectations "
+                                      "passed: {}.".format(step.expect))
+        trial_step_log.append("INFO", "Completed.")
+        trial_step_log.complete(TrialStatus.SUCCEEDED.value)
+
+    def _log_step_exception(self, action, trial_step_log, exc_info=None):
+        exc_name, exc_message, exc_tb = self._handle_exception(
+            *(exc_info or sys.exc_info()))
         trial_step_log.append("ERROR",
                               "Step failed. Type: {}. Error: {}".format(
                                   exc_name, exc_message))
+        trial_step_log.complete(TrialStatus.FAILED.value)
         self.trial_log_recorder.commit(trial_step_log)
         self._app_log_err("Action {} Failed.".format(action.name), exc_name,
                           exc_message, exc_tb)
@@ -184,7 +284,10 @@ class TrialExecutor(Subject):
 def execute_trial(instance):
     action_module_map = getattr(settings, 'KALLISTI_MODULE_MAP', {})
     cred_class_map = getattr(settings, 'KALLISTI_CREDENTIAL_CLASS_MAP', {})
-    with TrialExecutor(
+    executor_class = import_string(getattr(
+        settings, 'KALLISTI_TRIAL_EXECUTOR_CLASS',
+        'kallisticore.lib.trial_executor.TrialExecutor'))
+    with executor_class(
             instance, action_module_map, cred_class_map) as executor:
         for observer in getattr(settings, 'KALLISTI_TRIAL_OBSERVERS', []):
             executor.attach(observer())
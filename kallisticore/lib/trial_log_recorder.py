@@ -1,8 +1,13 @@
 import json
 from collections import OrderedDict
 from logging import Formatter, makeLogRecord, getLogger
+from threading import Lock
+
+from django.conf import settings
+from django.utils import timezone
 
 from kallisticore.models.trial import Trial
+from kallisticore.models.trial_record import TrialRecord
 from kallisticore.utils.sanitizer import Sanitizer
 
 LOGGING_FORMATTER = Formatter('[%(asctime)s - %(levelname)3s] %(message)s',
@@ -26,14 +31,32 @@ class TrialLogRecord:
         data['logs'] = self.logs
         return data
 
+    def get_columns(self) -> dict:
+        """
+        :returns the indexed columns of the record row
+        """
+        return {}
+
 
 class TrialStepLogRecord(TrialLogRecord):
     def __init__(self, trial_stage: str, step_name: str,
-                 step_parameters: dict):
+                 step_parameters: dict, step_index: int = None):
         self.step_name = step_name
         self.step_parameters = Sanitizer.clean_sensitive_data(step_parameters)
+        self.step_index = step_index
+        self.status = None
+        self.started_at = None
+        self.completed_at = None
         super(TrialStepLogRecord, self).__init__(trial_stage)
 
+    def start(self):
+        self.started_at = timezone.now()
+        self.append("INFO", "Starting command execution.")
+
+    def complete(self, status: str):
+        self.status = status
+        self.completed_at = timezone.now()
+
     def make(self) -> OrderedDict:
         data = OrderedDict()
         data['step_name'] = self.step_name
@@ -41,22 +64,71 @@ class TrialStepLogRecord(TrialLogRecord):
         data.update(super(TrialStepLogRecord, self).make())
         return data
 
+    def get_columns(self) -> dict:
+        return {'step_index': self.step_index, 'step_name': self.step_name,
+                'status': self.status, 'started_at': self.started_at,
+                'completed_at': self.completed_at}
+
 
 class TrialLogRecorder:
+    """
+    Persists the log records of a trial, either by appending one TrialRecord
+    row per committed record (STORAGE_ROWS, the default, with the step
+    details in indexed columns) or by rewriting the 'records' column of the
+    trial (STORAGE_BLOB). Appended rows can be written in batches, `flush`
+    writes the rows still pending.
+    """
+    STORAGE_BLOB = 'blob'
+    STORAGE_ROWS = 'rows'
     logger = getLogger(__name__)
 
-    def __init__(self, trial_id: str):
+    def __init__(self, trial_id: str, storage: str = None,
+                 batch_size: int = None):
         self.trial_id = trial_id
         self.trial_record = {}
+        self.storage = storage or getattr(
+            settings, 'KALLISTI_TRIAL_RECORDS_STORAGE', self.STORAGE_ROWS)
+        self.batch_size = batch_size or getattr(
+            settings, 'KALLISTI_TRIAL_RECORDS_BATCH_SIZE', 1)
+        self._pending_rows = []
+        self._lock = Lock()
 
     def commit(self, trial_log_record: TrialLogRecord):
-        self.trial_record.setdefault(trial_log_record.trial_stage, [])\
-            .append(trial_log_record.make())
+        # steps running concurrently commit from different threads
+        with self._lock:
+            record = trial_log_record.make()
+            self.trial_record.setdefault(trial_log_record.trial_stage, [])\
+                .append(record)
+            if self.storage == self.STORAGE_ROWS:
+                self._pending_rows.append(TrialRecord(
+                    trial_id=self.trial_id,
+                    trial_stage=trial_log_record.trial_stage, record=record,
+                    **trial_log_record.get_columns()))
+                if len(self._pending_rows) >= self.batch_size:
+                    self._write_pending_rows()
+            else:
+                self._write_records_column()
 
+    def flush(self):
+        with self._lock:
+            if self._pending_rows:
+                self._write_pending_rows()
+
+    def _write_records_column(self):
         try:
             Trial.objects.filter(pk=self.trial_id).update(
-                records=json.dumps(self.trial_record))
+                records=json.dumps(self.trial_record),
+                updated_at=timezone.now())
         except Exception as e:
             self.logger.warning(
                 "Failed to update 'records' column for trial {}, {}"
                 .format(self.trial_id, e))
+
+    def _write_pending_rows(self):
+        rows, self._pending_rows = self._pending_rows, []
+        try:
+            TrialRecord.objects.bulk_create(rows)
+        except Exception as e:
+            self.logger.warning(
+                "Failed to append {} record(s) for trial {}, {}"
+                .format(len(rows), self.trial_id, e))
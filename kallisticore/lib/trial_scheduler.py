@@ -1,21 +1,71 @@
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
+from typing import List
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
 
 from kallisticore.models import Trial
 from kallisticore.models.trial_schedule import TrialSchedule
 
+logger = logging.getLogger(__name__)
+
+
+def schedule(scheduler_interval_seconds) -> List[Trial]:
+    """ Create the trials of the schedules due within the scheduler interval.
+
+    The trials, their links to the schedules and the updated schedules are
+    saved in bulk, so the Trial signals are not sent: the trials are
+    validated here and are to be enqueued by the caller (see
+    `kallisticore.tasks.enqueue_trials`).
+
+    :param scheduler_interval_seconds: the interval of the scheduler
+    :returns the created trials
+    """
+    scheduled_until = _get_current_datetime() + \
+        timedelta(seconds=scheduler_interval_seconds)
+    trial_schedules = list(TrialSchedule.objects.get_queryset(
+        next_run_at__lte=scheduled_until).select_related('experiment'))
+    if not trial_schedules:
+        return []
+
+    trials = []
+    scheduled_trials = []
+    for trial_schedule in trial_schedules:
+        trial = _build_trial(trial_schedule)
+        if trial:
+            trials.append(trial)
+            scheduled_trials.append((trial_schedule, trial))
+        trial_schedule.record_run(scheduled_until)
+
+    trial_schedule_trials = TrialSchedule.trials.through
+    with transaction.atomic():
+        Trial.objects.bulk_create(trials)
+        TrialSchedule.objects.bulk_update(
+            trial_schedules, ['recurrence_left', 'next_run_at'])
+        trial_schedule_trials.objects.bulk_create(
+            [trial_schedule_trials(trialschedule_id=trial_schedule.id,
+                                   trial_id=trial.id)
+             for trial_schedule, trial in scheduled_trials])
+    return trials
+
 
-def schedule(scheduler_interval_seconds):
-    current_datetime = _get_current_datetime()
-    for trial_schedule in TrialSchedule.objects.get_queryset().all():
-        if trial_schedule.should_execute_at(current_datetime,
-                                            scheduler_interval_seconds):
-            trial = Trial.create(experiment=trial_schedule.experiment,
-                                 parameters=trial_schedule.parameters,
-                                 ticket=trial_schedule.ticket,
-                                 metadata=trial_schedule.metadata)
-            trial_schedule.decrement_recurrence_left()
-            trial_schedule.trials.add(trial)
+def _build_trial(trial_schedule: TrialSchedule) -> Trial:
+    trial = Trial(experiment=trial_schedule.experiment,
+                  parameters=trial_schedule.parameters,
+                  ticket=trial_schedule.ticket,
+                  metadata=trial_schedule.metadata)
+    trial.update_metadata()
+    try:
+        # the experiment has just been fetched and the id is a new uuid
+        trial.full_clean(exclude=['experiment'], validate_unique=False)
+    except ValidationError as e:
+        logger.error("Skipped the trial of schedule {}, {}".format(
+            trial_schedule.id, e))
+        return None
+    return trial
 
 
 def _get_current_datetime() -> datetime:
-    return datetime.now()
+    return timezone.now()
@@ -0,0 +1,120 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Event, Lock, Thread
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from kallisticore.exceptions import TrialStopError
+from kallisticore.models.trial import Trial, TrialStatus
+from kallisticore.utils.singleton import Singleton
+
+
+class TrialStopSignals(metaclass=Singleton):
+    """
+    Stop signals of the trials running in this process.
+
+    A stop initiated in this process is signalled right away (see
+    `kallisticore.signals`). Stops initiated by other processes are picked
+    up by a watcher thread which checks, with a single query, which of the
+    registered trials have been set to 'Stop Initiated', every
+    KALLISTI_TRIAL_STOP_POLL_INTERVAL_SECONDS. The executor checks the event
+    of its trial before each step, and the actions waiting within a step
+    wait on it through `sleep`, so that a stop interrupts their wait.
+    Other actions, e.g. an HTTP request, are not interrupted: the trial
+    stops once they return, within their timeouts.
+    """
+    logger = logging.getLogger(__name__)
+
+    def __init__(self):
+        self.poll_interval = getattr(
+            settings, 'KALLISTI_TRIAL_STOP_POLL_INTERVAL_SECONDS', 1)
+        self._events = {}
+        self._lock = Lock()
+        self._watcher = None
+        self._running = ContextVar('trial_stop_event', default=None)
+
+    def register(self, trial_id) -> Event:
+        with self._lock:
+            event = self._events.setdefault(str(trial_id), Event())
+            self._start_watcher()
+        return event
+
+    def unregister(self, trial_id) -> None:
+        with self._lock:
+            self._events.pop(str(trial_id), None)
+
+    def signal(self, trial_id) -> None:
+        event = self._events.get(str(trial_id))
+        if event:
+            event.set()
+
+    def is_stop_initiated(self, trial_id) -> bool:
+        event = self._events.get(str(trial_id))
+        return bool(event and event.is_set())
+
+    @contextmanager
+    def watching(self, event: Optional[Event]) -> Iterator[None]:
+        """ Make `sleep` in this context stop on the stop event of the
+        trial running in it.
+
+        :param event: the stop event of the trial, None for steps which are
+         not stopped, e.g. post steps.
+        """
+        token = self._running.set(event)
+        try:
+            yield
+        finally:
+            self._running.reset(token)
+
+    def sleep(self, seconds: float) -> None:
+        """ Sleep for `seconds`, unless the trial running in this context
+        is stopped meanwhile.
+
+        :raises TrialStopError: when the trial is stopped
+        """
+        event = self._running.get()
+        if event is None:
+            time.sleep(seconds)
+        elif event.wait(seconds):
+            raise TrialStopError()
+
+    def refresh(self) -> None:
+        """ Signal the registered trials set to 'Stop Initiated' in the
+        database.
+        """
+        with self._lock:
+            trial_ids = [trial_id for trial_id, event in self._events.items()
+                         if not event.is_set()]
+        if not trial_ids:
+            return
+        stopped_trial_ids = Trial.objects.get_queryset_all(
+            id__in=trial_ids, status=TrialStatus.STOP_INITIATED.value)\
+            .values_list('id', flat=True)
+        for trial_id in stopped_trial_ids:
+            self.signal(trial_id)
+
+    def _start_watcher(self):
+        if self.poll_interval <= 0 or self._watcher:
+            return
+        self._watcher = Thread(target=self._watch, daemon=True,
+                               name='kallisti-trial-stop-watcher')
+        self._watcher.start()
+
+    def _watch(self):
+        while True:
+            time.sleep(self.poll_interval)
+            with self._lock:
+                if not self._events:
+                    self._watcher = None
+                    return
+            try:
+                self.refresh()
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to check trials to stop, {}".format(e))
+            finally:
+                connections.close_all()
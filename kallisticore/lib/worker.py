@@ -0,0 +1,166 @@
+import logging
+import time
+from multiprocessing import Value
+from threading import Event
+from typing import Dict
+
+from django.db import connections
+from huey.consumer import Consumer, Worker
+from huey.constants import WORKER_PROCESS
+
+
+class KallistiWorker(Worker):
+    """
+    Huey worker keeping count of the workers busy executing a task.
+    """
+
+    def __init__(self, huey, busy_workers, **kwargs):
+        super(KallistiWorker, self).__init__(huey, **kwargs)
+        self.busy_workers = busy_workers
+
+    def loop(self, now=None):
+        task = None
+        try:
+            task = self.huey.dequeue()
+        except Exception:
+            self._logger.exception('Error reading from queue')
+            self.sleep()
+            return
+        if task is None:
+            if not self.huey.storage.blocking:
+                self.sleep()
+            return
+
+        self.delay = self.default_delay
+        with self.busy_workers.get_lock():
+            self.busy_workers.value += 1
+        try:
+            self.huey.execute(task, now)
+        except Exception:
+            self._logger.exception('Unhandled error during execution of '
+                                   'task %s.', task.id)
+        finally:
+            with self.busy_workers.get_lock():
+                self.busy_workers.value -= 1
+
+    def shutdown(self):
+        super(KallistiWorker, self).shutdown()
+        # the database connections of this worker are not reused
+        connections.close_all()
+
+
+class KallistiConsumer(Consumer):
+    """
+    Huey consumer of the Kallisti trial worker pool.
+
+    On SIGTERM or SIGINT, the workers stop taking tasks and the consumer
+    waits up to `drain_timeout` seconds for the running trials to complete
+    before exiting; a second SIGTERM stops it right away, terminating the
+    busy worker processes. The capacity of the pool is logged every
+    `capacity_report_interval` seconds.
+    """
+    JOIN_INTERVAL = 0.1
+    logger = logging.getLogger(__name__)
+
+    def __init__(self, huey, drain_timeout: float = 300,
+                 capacity_report_interval: float = 60, **options):
+        # shared with the workers, including worker processes
+        self.busy_workers = Value('i', 0)
+        self.drain_timeout = drain_timeout
+        self.capacity_report_interval = capacity_report_interval
+        self._capacity_report_ts = time.monotonic()
+        self._stop_now = Event()
+        super(KallistiConsumer, self).__init__(huey, **options)
+
+    def _create_worker(self):
+        return KallistiWorker(huey=self.huey, busy_workers=self.busy_workers,
+                              default_delay=self.default_delay,
+                              max_delay=self.max_delay, backoff=self.backoff)
+
+    def start(self):
+        if self.worker_type == WORKER_PROCESS:
+            # database connections must not be shared with forked workers
+            connections.close_all()
+        super(KallistiConsumer, self).start()
+
+    def get_capacity(self) -> Dict[str, int]:
+        """
+        :returns the number of workers, the number of busy and idle workers
+         and the number of tasks waiting in the queue.
+        """
+        busy = self.busy_workers.value
+        return {'workers': self.workers, 'busy': busy,
+                'idle': max(self.workers - busy, 0),
+                'pending': self.huey.pending_count()}
+
+    def report_capacity(self) -> None:
+        capacity = self.get_capacity()
+        self.logger.info("Capacity: {busy}/{workers} workers busy, {pending} "
+                         "tasks pending".format(**capacity))
+
+    def loop(self, health_check_ts=None):
+        health_check_ts = super(KallistiConsumer, self).loop(health_check_ts)
+        now = time.monotonic()
+        if self.capacity_report_interval and now >= \
+                self._capacity_report_ts + self.capacity_report_interval:
+            self._capacity_report_ts = now
+            try:
+                self.report_capacity()
+            except Exception as e:
+                self.logger.warning(
+                    "Failed to report the capacity, {}".format(e))
+        return health_check_ts
+
+    def stop(self, graceful=False):
+        if not graceful:
+            return super(KallistiConsumer, self).stop(graceful=False)
+
+        self.stop_flag.set()
+        self.logger.info("Draining {} busy workers, waiting up to {} seconds"
+                         .format(self.busy_workers.value, self.drain_timeout))
+        deadline = time.monotonic() + self.drain_timeout
+        try:
+            # joined at short intervals to notice a request to stop now
+            busy_processes = self._get_busy_processes()
+            while busy_processes and not self._stop_now.is_set() and \
+                    time.monotonic() < deadline:
+                busy_processes[0].join(min(
+                    self.JOIN_INTERVAL, max(deadline - time.monotonic(), 0)))
+                busy_processes = self._get_busy_processes()
+        except KeyboardInterrupt:
+            self.logger.info('Received request to shut down now.')
+            self._restart = False
+            self._stop_now.set()
+        if not self._stop_now.is_set():
+            self.scheduler.join(max(deadline - time.monotonic(), 0))
+
+        busy_processes = self._get_busy_processes()
+        if not busy_processes:
+            self.logger.info('All workers have stopped.')
+            return
+        if self._stop_now.is_set():
+            self.logger.warning("Stopping {} busy workers right away"
+                                .format(len(busy_processes)))
+        else:
+            self.logger.warning("{} workers still busy after {} seconds, "
+                                "stopping them".format(len(busy_processes),
+                                                       self.drain_timeout))
+        if self.worker_type == WORKER_PROCESS:
+            for worker_process in busy_processes:
+                worker_process.terminate()
+
+    def _get_busy_processes(self):
+        return [worker_process for _, worker_process in self.worker_threads
+                if self.environment.is_alive(worker_process)]
+
+    def _handle_stop_signal(self, sig_num, frame):
+        if self._received_signal and self._graceful:
+            # the second SIGTERM interrupts the drain
+            self.logger.info('Received SIGTERM again, stopping right away.')
+            self._restart = False
+            self._stop_now.set()
+            return
+        self.logger.info('Received SIGTERM, draining the workers.')
+        self._received_signal = True
+        self._restart = False
+        self._graceful = True
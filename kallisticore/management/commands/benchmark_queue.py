@@ -0,0 +1,158 @@
+import shutil
+import tempfile
+import time
+from threading import Lock, Thread
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from kallisticore.lib.trial_executor import execute_trial as exec_trial
+from kallisticore.models import Experiment, Trial
+from kallisticore.utils.queue import QUEUE_BACKENDS, make_huey
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the enqueue and dequeue throughput of a task queue ' \
+           'backend, the latency of tasks enqueued while workers consume ' \
+           'them and, optionally, the latency of trials run through it.'
+    queue_name = 'kallisti_queue_benchmark'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', choices=sorted(QUEUE_BACKENDS),
+                            default=getattr(settings,
+                                            'KALLISTI_QUEUE_BACKEND',
+                                            'sqlite'),
+                            help='queue backend, the configured one by '
+                                 'default')
+        parser.add_argument('--tasks', type=int, default=1000,
+                            help='number of tasks to enqueue')
+        parser.add_argument('--workers', type=int, default=4,
+                            help='number of worker threads')
+        parser.add_argument('--trials', type=int, default=0,
+                            help='number of trials of an experiment '
+                                 'without steps to run')
+
+    def handle(self, *args, **options):
+        backend = options['backend']
+        queue_options = dict(getattr(settings, 'KALLISTI_QUEUE_OPTIONS',
+                                     {}).get(backend, {}))
+        if backend == 'file':
+            # flushing a file queue removes its whole directory
+            queue_options['path'] = tempfile.mkdtemp()
+        huey = make_huey(backend, self.queue_name, results=False,
+                         **queue_options)
+        huey.flush()
+        try:
+            self._benchmark_throughput(huey, backend, options['tasks'],
+                                       options['workers'])
+            self._benchmark_latency(huey, backend, options['tasks'],
+                                    options['workers'])
+            if options['trials']:
+                self._benchmark_trials(huey, backend, options['trials'],
+                                       options['workers'])
+        finally:
+            huey.flush()
+            if backend == 'file':
+                shutil.rmtree(queue_options['path'], ignore_errors=True)
+
+    def _benchmark_throughput(self, huey, backend, count, workers):
+        task = huey.task(name='noop')(lambda index: None)
+
+        start = time.monotonic()
+        for index in range(count):
+            task(index)
+        enqueue_seconds = time.monotonic() - start
+
+        start = time.monotonic()
+        self._run_workers(huey, count, workers)
+        dequeue_seconds = time.monotonic() - start
+
+        self.stdout.write('{}: enqueued {} tasks in {:.3f} seconds ({:.0f} '
+                          'tasks/s)'.format(backend, count, enqueue_seconds,
+                                            count / enqueue_seconds))
+        self.stdout.write('{}: dequeued and executed {} tasks with {} '
+                          'workers in {:.3f} seconds ({:.0f} tasks/s)'
+                          .format(backend, count, workers, dequeue_seconds,
+                                  count / dequeue_seconds))
+
+    def _benchmark_latency(self, huey, backend, count, workers):
+        latencies = []
+        task = huey.task(name='latency')(
+            lambda enqueued_at: latencies.append(
+                time.monotonic() - enqueued_at))
+
+        consumer = Thread(target=self._run_workers,
+                          args=(huey, count, workers))
+        consumer.start()
+        for _ in range(count):
+            task(time.monotonic())
+        consumer.join()
+
+        self.stdout.write('{}: task latency under load {}'.format(
+            backend, self._summarize(latencies)))
+
+    def _benchmark_trials(self, huey, backend, count, workers):
+        latencies = []
+
+        def run_trial(trial, enqueued_at):
+            exec_trial(trial)
+            latencies.append(time.monotonic() - enqueued_at)
+
+        task = huey.task(name='trial')(run_trial)
+        experiment = Experiment.create(name=self.queue_name,
+                                       description='Queue benchmark',
+                                       steps=[])
+        try:
+            trials = Trial.objects.bulk_create(
+                [Trial(experiment=experiment) for _ in range(count)])
+            consumer = Thread(target=self._run_workers,
+                              args=(huey, count, workers))
+            consumer.start()
+            for trial in trials:
+                task(trial, time.monotonic())
+            consumer.join()
+        finally:
+            Trial.objects.get_queryset_all(experiment=experiment).delete()
+            Experiment.objects.get_queryset_all(id=experiment.id).delete()
+
+        self.stdout.write('{}: trial latency under load {}'.format(
+            backend, self._summarize(latencies)))
+
+    @staticmethod
+    def _run_workers(huey, count, workers):
+        lock = Lock()
+        executed = [0]
+
+        def work():
+            try:
+                while True:
+                    with lock:
+                        if executed[0] >= count:
+                            return
+                    task = huey.dequeue()
+                    if task is None:
+                        time.sleep(0.001)
+                        continue
+                    huey.execute(task)
+                    with lock:
+                        executed[0] += 1
+            finally:
+                connection.close()
+
+        threads = [Thread(target=work) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    @staticmethod
+    def _summarize(latencies):
+        latencies = sorted(latencies)
+
+        def percentile(value):
+            index = round(value / 100 * (len(latencies) - 1))
+            return latencies[index] * 1000
+
+        return 'p50 {:.1f} ms, p95 {:.1f} ms, max {:.1f} ms'.format(
+            percentile(50), percentile(95), percentile(100))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from kallisticore.lib.action import ActionRegistry
+
+
+class Command(BaseCommand):
+    help = 'Build the action registry from KALLISTI_MODULE_MAP and list ' \
+           'the actions of every namespace.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('namespaces', nargs='*',
+                            help='namespaces to list, e.g. "cf"; all by '
+                                 'default')
+
+    def handle(self, *args, **options):
+        registry = ActionRegistry()
+        duration = registry.build()
+        for namespace, functions in sorted(registry.list_functions().items()):
+            if options['namespaces'] and \
+                    namespace not in options['namespaces']:
+                continue
+            self.stdout.write('{} ({} actions):'.format(namespace,
+                                                        len(functions)))
+            for function_name in functions:
+                self.stdout.write('  {}.{}'.format(namespace, function_name))
+        self.stdout.write('Built action registry in {:.3f} seconds.'
+                          .format(duration))
@@ -0,0 +1,62 @@
+import logging
+
+from django.conf import settings
+from django.utils.module_loading import autodiscover_modules
+from huey.consumer_options import ConsumerConfig
+from huey.contrib.djhuey.management.commands.run_huey import \
+    Command as RunHueyCommand
+
+from kallisticore.lib.worker import KallistiConsumer
+
+
+class Command(RunHueyCommand):
+    help = 'Run the Kallisti trial worker pool: the huey consumer with the ' \
+           'configured worker type and concurrency, draining the running ' \
+           'trials on shutdown and reporting its capacity.'
+
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument('--drain-timeout', type=float,
+                            dest='drain_timeout',
+                            default=getattr(
+                                settings,
+                                'KALLISTI_WORKER_DRAIN_TIMEOUT_SECONDS', 300),
+                            help='seconds to wait for the running trials on '
+                                 'shutdown')
+        parser.add_argument('--capacity-report-interval', type=float,
+                            dest='capacity_report_interval',
+                            default=getattr(
+                                settings,
+                                'KALLISTI_WORKER_CAPACITY_REPORT_INTERVAL_'
+                                'SECONDS', 60),
+                            help='seconds between capacity reports, 0 to '
+                                 'disable them')
+
+    def handle(self, *args, **options):
+        drain_timeout = options.pop('drain_timeout')
+        capacity_report_interval = options.pop('capacity_report_interval')
+
+        consumer_options = {key: value for key, value in options.items()
+                            if value is not None}
+        consumer_options.setdefault(
+            'verbose', consumer_options.pop('huey_verbose', None))
+        consumer_options.setdefault(
+            'workers', getattr(settings, 'KALLISTI_WORKER_CONCURRENCY', 1))
+        consumer_options.setdefault(
+            'worker_type', getattr(settings, 'KALLISTI_WORKER_TYPE',
+                                   'thread'))
+
+        if not options.get('disable_autoload'):
+            autodiscover_modules('tasks')
+
+        config = ConsumerConfig(**consumer_options)
+        config.validate()
+        for logger in [logging.getLogger('huey'), KallistiConsumer.logger]:
+            if not logger.handlers:
+                config.setup_logger(logger)
+
+        consumer = KallistiConsumer(
+            settings.HUEY, drain_timeout=drain_timeout,
+            capacity_report_interval=capacity_report_interval,
+            **config.values)
+        consumer.run()
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.9 on 2026-10-18 01:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+import kallisticore.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0020_trial_initiated_from'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrialRecord',
+            fields=[
+                ('id', models.BigAutoField(editable=False, primary_key=True, serialize=False)),
+                ('trial_stage', models.CharField(max_length=20)),
+                ('record', kallisticore.utils.fields.DictField(default={})),
+                ('trial', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='record_entries', to='kallisticore.trial')),
+            ],
+            options={
+                'verbose_name': 'Trial Record',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-18 01:32
+
+from datetime import datetime
+
+from croniter import croniter
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_next_run_at(apps, schema_editor):
+    # We can't import the TrialSchedule model directly as it may be a newer
+    # version than this migration expects. We use the historical version.
+    trial_schedule_model = apps.get_model('kallisticore', 'TrialSchedule')
+    now = timezone.now()
+    trial_schedules = trial_schedule_model.objects.filter(deleted_at=None)
+    for trial_schedule in trial_schedules:
+        if trial_schedule.recurrence_count is not None and \
+                not (trial_schedule.recurrence_left and
+                     trial_schedule.recurrence_left > 0):
+            continue
+        trial_schedule.next_run_at = croniter(
+            trial_schedule.recurrence_pattern, now).get_next(
+            ret_type=datetime)
+        trial_schedule.save(update_fields=['next_run_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0021_trialrecord'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trialschedule',
+            name='next_run_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(code=populate_next_run_at,
+                             reverse_code=migrations.RunPython.noop),
+    ]
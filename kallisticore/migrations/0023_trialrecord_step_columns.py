@@ -0,0 +1,50 @@
+# Generated by Django 4.2.9 on 2026-10-18 01:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0022_trialschedule_next_run_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trialrecord',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trialrecord',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trialrecord',
+            name='status',
+            field=models.CharField(blank=True, max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='trialrecord',
+            name='step_index',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='trialrecord',
+            name='step_name',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='trialrecord',
+            index=models.Index(fields=['trial', 'trial_stage', 'step_index'], name='trial_record_step_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trialrecord',
+            index=models.Index(fields=['step_name', 'status'], name='trial_record_step_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trialrecord',
+            index=models.Index(fields=['status', 'completed_at'], name='trial_record_completed_idx'),
+        ),
+    ]
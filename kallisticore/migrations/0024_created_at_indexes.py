@@ -0,0 +1,41 @@
+# Generated by Django 4.2.9 on 2026-10-18 01:46
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def populate_trial_created_at(apps, schema_editor):
+    # We can't import the Trial model directly as it may be a newer
+    # version than this migration expects. We use the historical version.
+    trial_model = apps.get_model('kallisticore', 'Trial')
+    # the trials created so far are ordered by their execution
+    trial_model.objects.exclude(executed_at=None).update(
+        created_at=F('executed_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0023_trialrecord_step_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='experiment',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='trial',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='trialschedule',
+            name='created_at',
+            field=models.DateTimeField(db_index=True),
+        ),
+        migrations.RunPython(code=populate_trial_created_at,
+                             reverse_code=migrations.RunPython.noop),
+    ]
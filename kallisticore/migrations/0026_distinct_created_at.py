@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def make_created_at_distinct(apps, schema_editor):
+    # The rows backfilled by 0024 share their creation time, which the
+    # cursor pagination pages through by offset: the rows sharing a creation
+    # time are spread over microseconds, in the order of their ids.
+    for model_name in ['Experiment', 'Trial']:
+        model = apps.get_model('kallisticore', model_name)
+        shared_created_at = model.objects.values('created_at')\
+            .annotate(count=Count('id')).filter(count__gt=1)\
+            .values_list('created_at', flat=True)
+        for created_at in list(shared_created_at):
+            rows = list(model.objects.filter(created_at=created_at)
+                        .order_by('id').only('id', 'created_at'))
+            for index, row in enumerate(rows):
+                row.created_at = created_at + timedelta(microseconds=index)
+            model.objects.bulk_update(rows, ['created_at'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0025_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(code=make_created_at_distinct,
+                             reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def copy_trial_records_to_rows(apps, schema_editor):
+    # Trials are recorded in rows by default: the records column of the
+    # trials recorded before is copied into their record rows, in the order
+    # of their stages, and left in place.
+    trial_model = apps.get_model('kallisticore', 'Trial')
+    trial_record_model = apps.get_model('kallisticore', 'TrialRecord')
+    trials = trial_model.objects.filter(record_entries=None)\
+        .only('id', 'records')
+    for trial in trials.iterator(chunk_size=100):
+        if not trial.records:
+            continue
+        rows = [trial_record_model(
+            trial_id=trial.id, trial_stage=trial_stage, record=record,
+            step_name=record.get('step_name'))
+            for trial_stage, stage_records in trial.records.items()
+            if isinstance(stage_records, list)
+            for record in stage_records if isinstance(record, dict)]
+        trial_record_model.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kallisticore', '0026_distinct_created_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(code=copy_trial_records_to_rows,
+                             reverse_code=migrations.RunPython.noop),
+    ]
@@ -1,2 +1,3 @@
 from .experiment import Experiment  # noqa: F401
 from .trial import Trial  # noqa: F401
+from .trial_record import TrialRecord  # noqa: F401
@@ -27,6 +27,9 @@ class Experiment(BaseModel):
     parameters = DictField(default={})
     deleted_at = models.DateTimeField(null=True, blank=True)
     created_by = models.CharField(max_length=7, default="unknown")
+    created_at = models.DateTimeField(default=timezone.now, editable=False,
+                                      db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = ExperimentManager()
 
@@ -1,29 +1,60 @@
+import heapq
 import json
-from typing import Dict, List, Tuple
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Set, Tuple
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from jinja2 import Template, Environment, meta
 
+TEMPLATE_ENVIRONMENT = Environment()
+TEMPLATE_CACHE_SIZE = getattr(settings, 'KALLISTI_TEMPLATE_CACHE_SIZE', 1024)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _compile_template(source: str) -> Template:
+    return TEMPLATE_ENVIRONMENT.from_string(source)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _find_template_variables(source: str) -> FrozenSet[str]:
+    ast = TEMPLATE_ENVIRONMENT.parse(source)
+    return frozenset(meta.find_undeclared_variables(ast))
+
 
 class Step:
     ACTION_KEY = "do"
     DESC_KEY = "step"
     WHERE_KEY = "where"
     EXPECT_KEY = "expect"
+    ID_KEY = "id"
+    DEPENDS_ON_KEY = "depends_on"
 
     @classmethod
     def build(cls, step_dict: Dict) -> "Step":
         return Step(step_dict.get(cls.ACTION_KEY),
                     step_dict.get(cls.DESC_KEY),
                     step_dict.get(cls.WHERE_KEY),
-                    step_dict.get(cls.EXPECT_KEY))
+                    step_dict.get(cls.EXPECT_KEY),
+                    step_dict.get(cls.ID_KEY),
+                    step_dict.get(cls.DEPENDS_ON_KEY))
 
     def __init__(self, action: str, description: str, where: Dict,
-                 expect: List[Dict] = None):
+                 expect: List[Dict] = None, step_id: str = None,
+                 depends_on: List[str] = None):
+        """
+        :param step_id: identifier other steps of the same list can refer to
+         in their `depends_on`
+        :param depends_on: ids of the steps this step waits for. A step
+         without `depends_on` waits for the step before it, an empty list
+         lets it start right away.
+        """
         self.action = action
         self.description = description
         self.where = where
         self.expect = expect if expect else []
+        self.id = step_id
+        self.depends_on = depends_on
 
     def is_valid(self) -> bool:
         if self.action and self.where:
@@ -31,13 +62,25 @@ class Step:
         return False
 
     def interpolate_with_parameters(self, parameters):
-        where_template = Template(json.dumps(self.where))
+        where_template = _compile_template(json.dumps(self.where))
         self.where = json.loads(where_template.render(parameters))
 
-    def get_where_clause_template_variables(self):
-        env = Environment()
-        ast = env.parse(json.dumps(self.where))
-        return meta.find_undeclared_variables(ast)
+    def get_where_clause_template_variables(self) -> Set[str]:
+        return set(_find_template_variables(json.dumps(self.where)))
+
+    @staticmethod
+    def template_cache_info() -> Dict:
+        """
+        :returns hits, misses and size of the caches of compiled `where`
+         clause templates and of their undeclared variables.
+        """
+        return {'templates': _compile_template.cache_info()._asdict(),
+                'variables': _find_template_variables.cache_info()._asdict()}
+
+    @staticmethod
+    def clear_template_cache() -> None:
+        _compile_template.cache_clear()
+        _find_template_variables.cache_clear()
 
     def __eq__(self, o: "Step") -> bool:
         return self.action == o.action and self.description == o.description \
@@ -57,6 +100,10 @@ class Step:
             step_dict[Step.DESC_KEY] = self.description
         if self.expect:
             step_dict[Step.EXPECT_KEY] = self.expect
+        if self.id:
+            step_dict[Step.ID_KEY] = self.id
+        if self.depends_on is not None:
+            step_dict[Step.DEPENDS_ON_KEY] = self.depends_on
         return step_dict
 
     @staticmethod
@@ -83,6 +130,11 @@ class Step:
                 message="Invalid Steps: Some steps provided are invalid. "
                         "Invalid Steps: " + json.dumps(invalid_steps),
                 code="invalid")
+        try:
+            StepGraph(steps)
+        except ValueError as e:
+            raise ValidationError(message="Invalid Steps: " + str(e),
+                                  code="invalid")
         return steps
 
     def get_namespace(self):
@@ -91,3 +143,96 @@ class Step:
     def get_function_name(self):
         parts = self.action.split('.')
         return '.'.join(parts[1:])
+
+
+class StepGraph:
+    """
+    Dependency graph of a list of steps, used to find out which steps can
+    run at the same time. Steps are referred to by their index in the list.
+    """
+
+    def __init__(self, steps: List[Step]):
+        self.steps = steps
+        indices_by_id = self._index_step_ids(steps)
+        self._dependencies = [
+            self._resolve_dependencies(steps, index, indices_by_id)
+            for index in range(len(steps))]
+        self._dependants = [[] for _ in steps]
+        for index, dependencies in enumerate(self._dependencies):
+            for dependency in dependencies:
+                self._dependants[dependency].append(index)
+        self._order = self._sort()
+        self._completed = set()
+
+    def is_sequential(self) -> bool:
+        return all(step.depends_on is None for step in self.steps)
+
+    def get_order(self) -> List[int]:
+        """
+        :returns indices of the steps in an order running each step after
+         the steps it depends on, in the order of the list otherwise.
+        """
+        return list(self._order)
+
+    def get_ready(self) -> List[int]:
+        """
+        :returns indices of the steps without any dependency.
+        """
+        return [index for index, dependencies in
+                enumerate(self._dependencies) if not dependencies]
+
+    def complete(self, index: int) -> List[int]:
+        """ Mark the step as completed.
+
+        :returns indices of the steps that got all their dependencies
+         completed by this step.
+        """
+        self._completed.add(index)
+        return [dependant for dependant in self._dependants[index]
+                if self._dependencies[dependant] <= self._completed]
+
+    @staticmethod
+    def _index_step_ids(steps: List[Step]) -> Dict[str, int]:
+        indices_by_id = {}
+        for index, step in enumerate(steps):
+            if step.id:
+                if step.id in indices_by_id:
+                    raise ValueError(
+                        "Duplicate step id: '{}'.".format(step.id))
+                indices_by_id[step.id] = index
+        return indices_by_id
+
+    @staticmethod
+    def _resolve_dependencies(steps: List[Step], index: int,
+                              indices_by_id: Dict[str, int]) -> Set[int]:
+        depends_on = steps[index].depends_on
+        if depends_on is None:
+            return {index - 1} if index > 0 else set()
+        if not isinstance(depends_on, list) or \
+                not all(isinstance(step_id, str) for step_id in depends_on):
+            raise ValueError("depends_on must be a list of step ids: {}."
+                             .format(json.dumps(depends_on)))
+
+        dependencies = set()
+        for step_id in depends_on:
+            if step_id not in indices_by_id:
+                raise ValueError("Unknown step id in depends_on: '{}'."
+                                 .format(step_id))
+            dependencies.add(indices_by_id[step_id])
+        return dependencies
+
+    def _sort(self) -> List[int]:
+        remaining = [len(dependencies) for dependencies in self._dependencies]
+        ready = self.get_ready()
+        heapq.heapify(ready)
+        order = []
+        while ready:
+            index = heapq.heappop(ready)
+            order.append(index)
+            for dependant in self._dependants[index]:
+                remaining[dependant] -= 1
+                if remaining[dependant] == 0:
+                    heapq.heappush(ready, dependant)
+        if len(order) != len(self.steps):
+            raise ValueError("Circular dependency between steps.")
+        return order
@@ -1,6 +1,7 @@
 from copy import deepcopy
 from enum import Enum
-from typing import Set
+from types import MappingProxyType
+from typing import List, Mapping, Set
 from uuid import uuid4
 
 from django.conf import settings
@@ -74,6 +75,9 @@ class Trial(BaseModel):
     executed_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     records = DictField(default={}, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, editable=False,
+                                      db_index=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = TrialManager()
 
@@ -82,9 +86,11 @@ class Trial(BaseModel):
         if self.status == TrialStatus.SUCCEEDED.value or \
                 self.status == TrialStatus.FAILED.value or \
                 self.status == TrialStatus.ABORTED.value or \
-                self.status == TrialStatus.INVALID.value:
+                self.status == TrialStatus.INVALID.value or \
+                self.status == TrialStatus.STOPPED.value:
             self.completed_at = timezone.datetime.now()
-        self.save()
+        # the records may have been written since the trial was read
+        self.save(update_fields=['status', 'completed_at', 'updated_at'])
 
     def get_status(self) -> TrialStatus:
         return Trial.objects.get(id=self.id).status
@@ -103,40 +109,82 @@ class Trial(BaseModel):
         return undefined_variables
 
     def _get_undefined_variables(self, steps):
+        parameters = self.get_populated_parameters()
         undefined_variables = set()
         for step in steps:
             variables = step.get_where_clause_template_variables()
-            for variable in variables:
-                if variable not in self.get_populated_parameters():
-                    undefined_variables.add(variable)
+            undefined_variables.update(variables.difference(parameters))
         return undefined_variables
 
-    def get_populated_parameters(self):
-        experiment_parameters = self.experiment.parameters
-        if experiment_parameters:
-            experiment_parameters.update(self.parameters)
-            return experiment_parameters
-        else:
-            return self.parameters
+    def get_populated_parameters(self) -> Mapping:
+        """
+        :returns the experiment parameters overridden by the trial
+         parameters. They are resolved once per trial instance (see
+         `resolve_parameters`) and cannot be modified.
+        """
+        populated_parameters = getattr(self, '_populated_parameters', None)
+        if populated_parameters is None:
+            populated_parameters = self.resolve_parameters()
+        return populated_parameters
+
+    def resolve_parameters(self) -> Mapping:
+        """
+        Take a snapshot of the experiment parameters overridden by the trial
+        parameters, used for the validation, interpolation and logging of
+        the trial. Neither the experiment nor the trial parameters are
+        modified.
+        :returns the frozen parameters
+        """
+        parameters = deepcopy(self.experiment.parameters) or {}
+        parameters.update(deepcopy(self.parameters) or {})
+        self._populated_parameters = MappingProxyType(parameters)
+        return self._populated_parameters
 
     def get_steps(self) -> [Step]:
-        steps = deepcopy(self.experiment.steps)
-        for step in steps:
-            step.interpolate_with_parameters(self.get_populated_parameters())
-        return steps
+        return self._get_interpolated_steps(self.experiment.steps)
 
     def get_post_steps(self) -> [Step]:
-        steps = deepcopy(self.experiment.post_steps)
-        for step in steps:
-            step.interpolate_with_parameters(self.get_populated_parameters())
-        return steps
+        return self._get_interpolated_steps(self.experiment.post_steps)
 
     def get_pre_steps(self) -> [Step]:
-        steps = deepcopy(self.experiment.pre_steps)
+        return self._get_interpolated_steps(self.experiment.pre_steps)
+
+    def _get_interpolated_steps(self, steps) -> [Step]:
+        parameters = self.get_populated_parameters()
+        steps = deepcopy(steps)
         for step in steps:
-            step.interpolate_with_parameters(self.get_populated_parameters())
+            step.interpolate_with_parameters(parameters)
         return steps
 
+    def get_records(self, trial_stages: List[str] = None) -> dict:
+        """
+        :param trial_stages: the stages to read the records of, e.g.
+         ['steps', 'result'], all of them by default
+        :returns the records of the trial, assembled from the appended record
+         rows when the trial has been recorded that way.
+        """
+        entries = self.record_entries.all()
+        if not entries:
+            if trial_stages is None:
+                return self.records
+            return {trial_stage: records for trial_stage, records
+                    in self.records.items() if trial_stage in trial_stages}
+        if trial_stages is not None:
+            entries = [entry for entry in entries
+                       if entry.trial_stage in trial_stages]
+        records = {}
+        for entry in entries:
+            records.setdefault(entry.trial_stage, []).append(entry.record)
+        return records
+
+    def get_last_step_record(self):
+        """
+        :returns the record row of the step which completed last, None when
+         the steps of the trial have not been recorded as rows.
+        """
+        return self.record_entries.steps()\
+            .order_by('-completed_at', '-id').first()
+
     def update_metadata(self):
         temp_metadata = deepcopy(self.metadata)
         self.metadata = deepcopy(self.experiment.metadata)
@@ -146,5 +194,11 @@ class Trial(BaseModel):
         self.update_metadata()
         super(Trial, self).save(*args, **kwargs)
 
+    def __getstate__(self):
+        # the parameter snapshot is resolved again where the trial runs
+        state = super(Trial, self).__getstate__()
+        state.pop('_populated_parameters', None)
+        return state
+
     def is_completed(self):
         return not not self.completed_at
@@ -0,0 +1,50 @@
+from django.db import models
+
+from kallisticore.models.trial import Trial, TrialStatus
+from kallisticore.utils.fields import DictField
+
+
+class TrialRecordQuerySet(models.QuerySet):
+    def steps(self):
+        return self.exclude(step_index=None)
+
+    def failed(self):
+        return self.filter(status=TrialStatus.FAILED.value)
+
+    def succeeded(self):
+        return self.filter(status=TrialStatus.SUCCEEDED.value)
+
+
+class TrialRecord(models.Model):
+    """
+    A log record committed during a trial, stored as its own row so that
+    committing a record does not rewrite the records of the whole trial.
+
+    The records of steps carry the stage, index, name, status and times of
+    the step in indexed columns, e.g. to find the trials which failed in a
+    step or the last step of a trial without parsing the records.
+    """
+    id = models.BigAutoField(primary_key=True, editable=False)
+    trial = models.ForeignKey(Trial, related_name="record_entries",
+                              on_delete=models.DO_NOTHING)
+    trial_stage = models.CharField(max_length=20)
+    step_index = models.IntegerField(null=True, blank=True)
+    step_name = models.CharField(max_length=255, null=True, blank=True)
+    status = models.CharField(max_length=20, null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    record = DictField(default={})
+
+    objects = TrialRecordQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Trial Record"
+        ordering = ('id',)
+        indexes = [
+            models.Index(fields=['trial', 'trial_stage', 'step_index'],
+                         name='trial_record_step_idx'),
+            models.Index(fields=['step_name', 'status'],
+                         name='trial_record_step_status_idx'),
+            models.Index(fields=['status', 'completed_at'],
+                         name='trial_record_completed_idx'),
+        ]
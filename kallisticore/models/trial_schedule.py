@@ -43,14 +43,16 @@ class TrialSchedule(BaseModel):
     recurrence_count = models.IntegerField(null=True, blank=True)
     recurrence_left = models.IntegerField(null=True, blank=True)
     created_by = models.CharField(max_length=7, default="unknown")
-    created_at = models.DateTimeField()
+    created_at = models.DateTimeField(db_index=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
+    next_run_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
     objects = TrialScheduleManager()
 
     def __init__(self, *args, **kwargs):
         super(TrialSchedule, self).__init__(*args, **kwargs)
         self._original_recurrence_count = self.recurrence_count
+        self._original_recurrence_pattern = self.recurrence_pattern
 
     def save(self, *args, **kwargs):
         self.update_metadata()
@@ -64,6 +66,7 @@ class TrialSchedule(BaseModel):
             self.recurrence_left = self.recurrence_count
             self._original_recurrence_count = self.recurrence_count
 
+        self.update_next_run_at()
         return super(TrialSchedule, self).save(*args, **kwargs)
 
     def delete(self, using=None, keep_parents=False):
@@ -76,19 +79,38 @@ class TrialSchedule(BaseModel):
     def has_recurrence_left(self) -> bool:
         return self.recurrence_left and self.recurrence_left > 0
 
-    def should_execute_at(self, datetime_at: datetime,
-                          scheduler_interval_seconds: int) -> bool:
-        if self.has_recurrence_count_set() and not self.has_recurrence_left():
-            return False
-        next_datetime = croniter(self.recurrence_pattern, datetime_at)\
+    def get_next_run_at(self, datetime_at: datetime) -> datetime:
+        return croniter(self.recurrence_pattern, datetime_at)\
             .get_next(ret_type=datetime)
-        return scheduler_interval_seconds >= \
-            (next_datetime - datetime_at).total_seconds()
 
-    def decrement_recurrence_left(self):
+    def update_next_run_at(self):
+        """ Keep the next fire time in line with the recurrence: cleared
+        when deleted, invalid or without recurrence left, computed from now
+        when missing or when the recurrence pattern changes.
+        """
+        if self.deleted_at or \
+                not croniter.is_valid(self.recurrence_pattern) or \
+                (self.has_recurrence_count_set() and
+                 not self.has_recurrence_left()):
+            self.next_run_at = None
+        elif self.next_run_at is None or \
+                self.recurrence_pattern != self._original_recurrence_pattern:
+            self.next_run_at = self.get_next_run_at(timezone.now())
+        self._original_recurrence_pattern = self.recurrence_pattern
+
+    def record_run(self, scheduled_until: datetime):
+        """ Record a trial run of the schedule: the recurrence left and the
+        next run time are updated, the schedule is saved by the caller.
+
+        :param scheduled_until: the end of the scheduler interval the run
+         belongs to; the next run is the first one after it, so runs missed
+         while the scheduler was down are not caught up one by one.
+        """
         if self.has_recurrence_count_set() and self.has_recurrence_left():
             self.recurrence_left -= 1
-            self.save()
+        self.next_run_at = self.get_next_run_at(
+            max(self.next_run_at or scheduled_until, scheduled_until))
+        self.update_next_run_at()
 
     def update_metadata(self):
         temp_metadata = deepcopy(self.metadata)
@@ -1,8 +1,13 @@
-import importlib
+import json
+import logging
+import os
+import tempfile
+from functools import lru_cache
 from typing import Dict
 
+import chaosaws
 from chaosaws import discover
-from kallisticore.exceptions import CouldNotFindFunction
+from django.conf import settings
 from kallisticore.exceptions import InvalidCredentialType
 from kallisticore.lib.action import Action
 from kallisticore.lib.action import FunctionLoader
@@ -11,15 +16,81 @@ from kallisticore.lib.credential import Credential,\
 from kallisticore.lib.expectation import Expectation
 
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_activity_index() -> Dict[str, str]:
+    """ Index of the chaostoolkit-aws activities.
+
+    The index is read from the manifest of the installed chaostoolkit-aws
+    version in KALLISTI_AWS_ACTIVITY_MANIFEST_DIR when there is one.
+    Otherwise it is generated with the chaostoolkit-aws discovery, which
+    imports the whole package, and written to the manifest.
+
+    :returns the names of the activities mapped to their module name.
+    """
+    manifest_path = _get_manifest_path()
+    if manifest_path:
+        activities = _read_manifest(manifest_path)
+        if activities is not None:
+            return activities
+
+    activities = {}
+    for activity in discover(False)['activities']:
+        activities.setdefault(activity.get('name'), activity.get('mod'))
+
+    if manifest_path:
+        _write_manifest(manifest_path, activities)
+    return activities
+
+
+def _get_manifest_path():
+    manifest_dir = getattr(settings, 'KALLISTI_AWS_ACTIVITY_MANIFEST_DIR',
+                           None)
+    if not manifest_dir:
+        return None
+    return os.path.join(manifest_dir, 'chaosaws-activities-{}.json'
+                        .format(chaosaws.__version__))
+
+
+def _read_manifest(manifest_path):
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('version') == chaosaws.__version__:
+            return manifest['activities']
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("Ignoring invalid chaosaws activity manifest {}, {}"
+                       .format(manifest_path, e))
+    return None
+
+
+def _write_manifest(manifest_path, activities):
+    manifest = {'version': chaosaws.__version__, 'activities': activities}
+    try:
+        manifest_dir = os.path.dirname(manifest_path)
+        os.makedirs(manifest_dir, exist_ok=True)
+        # write to a temporary file first, so that workers starting at the
+        # same time never read a partially written manifest
+        with tempfile.NamedTemporaryFile('w', dir=manifest_dir,
+                                         delete=False) as manifest_file:
+            json.dump(manifest, manifest_file)
+        os.replace(manifest_file.name, manifest_path)
+    except Exception as e:
+        logger.warning("Failed to write chaosaws activity manifest {}, {}"
+                       .format(manifest_path, e))
+
+
 class AwsFunctionLoader(FunctionLoader):
-    def _find_function(self, function_name: str):
-        method_name = function_name.split('.')[-1]
-        for activity in discover(False)['activities']:
-            if activity.get('name') == method_name:
-                module = importlib.import_module(activity.get('mod'))
-                return getattr(module, method_name)
-        raise CouldNotFindFunction(
-            self._module_path + "." + function_name)
+    def get_functions(self) -> Dict[str, str]:
+        # the activity modules are imported on first use of their functions
+        return dict(get_activity_index())
+
+    def _get_declared_name(self, function_name: str) -> str:
+        return function_name.split('.')[-1]
 
 
 class AwsAction(Action):
@@ -1,9 +1,12 @@
-from typing import Dict, Callable
+from collections.abc import Mapping
+from typing import Dict, Callable, Iterator, Optional, Tuple
 
+import chaoscf
 from kallisticore.lib import credential as cred
 from kallisticore.lib.action import Action
 from kallisticore.lib.credential import Credential
 from kallisticore.lib.expectation import Expectation
+from kallisticore.lib.oauth_token_cache import OAuthTokenCache
 
 
 class CloudFoundryAction(Action):
@@ -20,18 +23,59 @@ class CloudFoundryAction(Action):
         pool_url = self.arguments.pop('cf_api_url')
         if credential is None:
             credential = self._get_default_credentials_for_environment()
-        credential.fetch()
+        credential.load()
         assert isinstance(credential, cred.UsernamePasswordCredential)
 
-        self.arguments['secrets'] = {
-            'cf_client_id': self.arguments.pop('client_id', 'cf'),
-            'cf_client_secret': self.arguments.pop('client_secret', ''),
-            'cf_username': credential.username,
-            'cf_password': credential.password}
         self.arguments['configuration'] = {'cf_verify_ssl': True,
                                            'cf_api_url': pool_url}
+        self.arguments['secrets'] = CloudFoundrySecrets(
+            self.arguments['configuration'],
+            cf_client_id=self.arguments.pop('client_id', 'cf'),
+            cf_client_secret=self.arguments.pop('client_secret', ''),
+            cf_username=credential.username,
+            cf_password=credential.password)
 
     def _get_default_credentials_for_environment(self) -> Credential:
-        return cred.EnvironmentUserNamePasswordCredential(
+        return cred.CredentialCache().get(
+            cred.EnvironmentUserNamePasswordCredential,
             username_key=self.CF_DEFAULT_USERNAME_KEY,
             password_key=self.CF_DEFAULT_PASSWORD_KEY)
+
+
+class CloudFoundrySecrets(Mapping):
+    """
+    Secrets of the chaoscf functions. The UAA access token is taken from
+    the token cache the first time chaoscf asks for it, so that the CF
+    actions of a worker authenticate once per API url, client and user
+    until the token expires, instead of on every API call.
+    """
+    TOKEN_KEYS = ('cf_access_token', 'cf_token_type')
+
+    def __init__(self, configuration: Dict, **secrets):
+        self._configuration = configuration
+        self._secrets = secrets
+
+    def __getitem__(self, key):
+        if key in self.TOKEN_KEYS and key not in self._secrets:
+            return self._get_token()[self.TOKEN_KEYS.index(key)]
+        return self._secrets[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._secrets
+        for key in self.TOKEN_KEYS:
+            if key not in self._secrets:
+                yield key
+
+    def __len__(self) -> int:
+        return len(set(self._secrets) | set(self.TOKEN_KEYS))
+
+    def _get_token(self) -> Tuple[str, str]:
+        token_key = ('cf', self._configuration['cf_api_url'],
+                     self._secrets.get('cf_client_id', 'cf'),
+                     self._secrets.get('cf_username'))
+        return OAuthTokenCache().get_token(token_key, self._fetch_token)
+
+    def _fetch_token(self) -> Tuple[Tuple[str, str], Optional[int]]:
+        tokens = chaoscf.auth(self._configuration, dict(self._secrets))
+        return (tokens['access_token'], tokens.get('token_type', 'bearer')), \
+            tokens.get('expires_in')
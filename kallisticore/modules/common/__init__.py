@@ -1,17 +1,25 @@
+import asyncio
 import base64
+import hashlib
 import json
 import time
+from functools import partial
 from json import JSONDecodeError
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 import requests
 from django.conf import settings
 
 from kallisticore import exceptions
+from kallisticore.lib.async_http_session_pool import AsyncHttpSessionPool
 from kallisticore.lib.credential import Credential, TokenCredential, \
     UsernamePasswordCredential
+from kallisticore.lib.http_session_pool import HttpSessionPool
+from kallisticore.lib.oauth_token_cache import OAuthTokenCache
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
 
-__all__ = ["http_probe", "http_request", "wait"]
+__all__ = ["async_http_probe", "async_http_request", "http_probe",
+           "http_request", "wait"]
 
 
 def wait(time_in_seconds: int):
@@ -20,7 +28,8 @@ def wait(time_in_seconds: int):
             "Expected integer for argument 'time_in_seconds' "
             "(got %s)" % type(time_in_seconds).__name__)
 
-    time.sleep(time_in_seconds)
+    # interrupted when the trial is stopped
+    TrialStopSignals().sleep(time_in_seconds)
 
 
 def http_request(url: str, method: str = "GET",
@@ -31,11 +40,11 @@ def http_request(url: str, method: str = "GET",
 
     method = method.upper()
     if method in ["GET", "DELETE"]:
-        response = requests.request(method, url=url, headers=headers)
+        response = HttpSessionPool().request(method, url, headers=headers)
     elif method in ["POST", "PATCH", "PUT"]:
-        response = requests.request(method, url=url,
-                                    data=json.dumps(request_body),
-                                    headers=headers)
+        response = HttpSessionPool().request(method, url,
+                                             data=json.dumps(request_body),
+                                             headers=headers)
     else:
         raise exceptions.InvalidHttpRequestMethod(
             "Invalid method: {}. Please specify a valid HTTP request "
@@ -54,11 +63,10 @@ def http_probe(url: str, method: str = "GET",
     headers = extract_authentication_headers(authentication, headers)
 
     method = method.upper()
-    if method == "GET":
-        response = requests.get(url=url, headers=headers)
-    elif method == "POST":
-        response = requests.post(url=url, data=json.dumps(request_body),
-                                 headers=headers)
+    if method in ["GET", "POST"]:
+        data = json.dumps(request_body) if method == "POST" else None
+        response = HttpSessionPool().request(method, url, data=data,
+                                             headers=headers)
     else:
         raise exceptions.InvalidHttpProbeMethod(
             "Invalid method: {}. "
@@ -76,6 +84,64 @@ def http_probe(url: str, method: str = "GET",
                              response.text))
 
 
+async def async_http_request(url: str, method: str = "GET",
+                             request_body: Optional[Dict] = None,
+                             headers: Optional[Dict] = None,
+                             authentication: Optional[Dict] = None) -> Dict:
+    """ Coroutine variant of http_request. """
+    method = method.upper()
+    if method in ["GET", "DELETE"]:
+        data = None
+    elif method in ["POST", "PATCH", "PUT"]:
+        data = json.dumps(request_body)
+    else:
+        raise exceptions.InvalidHttpRequestMethod(
+            "Invalid method: {}. Please specify a valid HTTP request "
+            "method".format(method))
+    headers = await asyncio.get_running_loop().run_in_executor(
+        None, extract_authentication_headers, authentication, headers)
+    return await _send_async_request(method, url, data, headers)
+
+
+async def async_http_probe(url: str, method: str = "GET",
+                           request_body: Optional[Dict] = None,
+                           headers: Optional[Dict] = None,
+                           authentication: Optional[Dict] = None) -> Dict:
+    """ Coroutine variant of http_probe. """
+    method = method.upper()
+    if method == "GET":
+        data = None
+    elif method == "POST":
+        data = json.dumps(request_body)
+    else:
+        raise exceptions.InvalidHttpProbeMethod(
+            "Invalid method: {}. "
+            "HTTP Probe allows only GET and POST methods".format(method))
+    headers = await asyncio.get_running_loop().run_in_executor(
+        None, extract_authentication_headers, authentication, headers)
+    result = await _send_async_request(method, url, data, headers)
+    if result['status_code'] < 400:
+        return result
+    raise exceptions.FailedAction(
+        "Http probe failed after {} seconds for url {} with status code {}. "
+        "Details: {}".format(result['response_time_in_seconds'], url,
+                             result['status_code'], result['response_text']))
+
+
+async def _send_async_request(method: str, url: str, data: Optional[str],
+                              headers: Optional[Dict]) -> Dict:
+    start = time.monotonic()
+    session = AsyncHttpSessionPool().get_session()
+    async with session.request(method, url, data=data,
+                               headers=headers) as response:
+        duration = time.monotonic() - start
+        text = await response.text()
+        return _append_parsed_json_response(
+            {'status_code': response.status, 'response_text': text,
+             'response_headers': dict(response.headers),
+             'response_time_in_seconds': duration})
+
+
 def _append_parsed_json_response(result: dict) -> Dict:
     try:
         result['response'] = json.loads(result['response_text'])
@@ -91,37 +157,63 @@ def _get_oauth_token_for_http_request_auth_header(config: Dict) -> str:
 
     cred_class_map = getattr(settings, 'KALLISTI_CREDENTIAL_CLASS_MAP', {})
     credential = Credential.build(cred_class_map, config['credentials'])
-    credential.fetch()
+    credential.load()
 
     if isinstance(credential, TokenCredential):
         return _format_oauth_token(credential.token)
 
     if isinstance(credential, UsernamePasswordCredential):
-        request_body = {
-            'grant_type': 'password',
-            'username': credential.username,
-            'password': credential.password
-        }
-        if 'resource' in config:
-            request_body['resource'] = config['resource']
-        client_secret = config['client']['secret'] \
-            if 'secret' in config['client'] else ''
-        client_base64 = base64.b64encode('{}:{}'.format(
-            config['client']['id'], client_secret).encode()).decode('utf-8')
-        headers = {'Authorization': 'Basic {}'.format(client_base64)}
-
-        response = requests.post(config['url'], request_body, headers=headers)
-        if response.status_code >= 400:
-            raise exceptions.FailedAction(
-                "Authentication for http request failed with status code {}. "
-                "Details: {}".format(response.status_code, response.text))
-
-        response_body = response.json()
-        return _format_oauth_token(response_body[response_token_key])
+        # the secrets are part of the key so that a token obtained with
+        # rotated secrets is not reused
+        token_key = (config['url'], config['client']['id'],
+                     config['credentials'].get('type'), credential.username,
+                     config.get('resource'), response_token_key,
+                     _hash_secrets(_get_client_secret(config),
+                                   credential.password))
+        token = OAuthTokenCache().get_token(token_key, partial(
+            _request_oauth_token, config, credential, response_token_key))
+        return _format_oauth_token(token)
 
     raise exceptions.InvalidCredentialType(credential.__class__.__name__)
 
 
+def _request_oauth_token(config: Dict,
+                         credential: UsernamePasswordCredential,
+                         response_token_key: str) -> Tuple[str, Optional[int]]:
+    request_body = {
+        'grant_type': 'password',
+        'username': credential.username,
+        'password': credential.password
+    }
+    if 'resource' in config:
+        request_body['resource'] = config['resource']
+    client_base64 = base64.b64encode('{}:{}'.format(
+        config['client']['id'], _get_client_secret(config)).encode()) \
+        .decode('utf-8')
+    headers = {'Authorization': 'Basic {}'.format(client_base64)}
+
+    response = requests.post(config['url'], request_body, headers=headers)
+    if response.status_code >= 400:
+        raise exceptions.FailedAction(
+            "Authentication for http request failed with status code {}. "
+            "Details: {}".format(response.status_code, response.text))
+
+    response_body = response.json()
+    return response_body[response_token_key], response_body.get('expires_in')
+
+
+def _get_client_secret(config: Dict) -> str:
+    return config['client']['secret'] if 'secret' in config['client'] else ''
+
+
+def _hash_secrets(*secrets: str) -> str:
+    digest = hashlib.sha256()
+    for secret in secrets:
+        digest.update(str(secret).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
 def _format_oauth_token(token: str) -> str:
     auth_token_prefix = 'Bearer'
     return '{} {}'.format(auth_token_prefix, token)
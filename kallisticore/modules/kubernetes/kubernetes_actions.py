@@ -1,15 +1,19 @@
 import base64
 import os
 import re
+import tempfile
+import time
 from pathlib import Path
-from typing import Dict, Callable
+from threading import Lock
+from typing import Dict, Callable, List
 
 import boto3
 import yaml
 from botocore.signers import RequestSigner
 from kallisticore.exceptions import FailedAction
 from kallisticore.lib.action import Action
-from kallisticore.lib.credential import Credential, UsernamePasswordCredential
+from kallisticore.lib.credential import Credential, CredentialCache, \
+    UsernamePasswordCredential
 from kallisticore.lib.credential import KubernetesServiceAccountTokenCredential
 
 
@@ -21,6 +25,15 @@ class KubernetesAction(Action):
                      '?Action=GetCallerIdentity&Version=2011-06-15'
     STS_TOKEN_EXPIRES_IN = 60
 
+    # EKS contexts by cluster name and region, shared by the actions. Each
+    # cluster has its own lock, so that AWS calls for one cluster do not
+    # hold up the actions on the others; the kube config file, with the
+    # contexts of all the clusters, is written under a lock of its own.
+    _eks_contexts = {}
+    _eks_context_locks = {}
+    _eks_contexts_lock = Lock()
+    _eks_config_lock = Lock()
+
     def __init__(self, module_func: Callable, arguments: Dict,
                  expectations: [], description: str = None,
                  credential: Credential = None):
@@ -37,7 +50,7 @@ class KubernetesAction(Action):
         elif self.platform == self.PLATFORM_K8S:
             if credential is None:
                 credential = self._get_default_credential()
-            credential.fetch()
+            credential.load()
             if isinstance(credential, UsernamePasswordCredential):
                 self.arguments['secrets'] = {
                     'KUBERNETES_HOST': self.arguments.pop('k8s_api_host', ''),
@@ -56,16 +69,41 @@ class KubernetesAction(Action):
                                .format(self.platform))
 
     def _get_default_credential(self):
-        return KubernetesServiceAccountTokenCredential()
+        return CredentialCache().get(KubernetesServiceAccountTokenCredential)
 
     def _make_eks_context(self) -> str:
         eks_cluster_name = self.arguments.pop('cluster_name')
         region = self.arguments.pop('region', '')
-        session = self._create_aws_session(region)
-        cluster_info = self._get_eks_cluster_info(session, eks_cluster_name)
-        token = self._retrieve_eks_token(session, region, eks_cluster_name)
-        self._create_eks_k8s_config(cluster_info, token)
-        return cluster_info['cluster']['arn']
+        key = (eks_cluster_name, region)
+        with self._get_eks_context_lock(key):
+            context = self._eks_contexts.get(key)
+            if context is None:
+                session = self._create_aws_session(region)
+                context = EksContext(
+                    session, self._get_eks_cluster_info(session,
+                                                        eks_cluster_name))
+                with self._eks_contexts_lock:
+                    self._eks_contexts[key] = context
+            if context.is_token_expiring():
+                context.set_token(self._retrieve_eks_token(
+                    context.session, region, eks_cluster_name),
+                    self.STS_TOKEN_EXPIRES_IN)
+                with self._eks_config_lock:
+                    with self._eks_contexts_lock:
+                        contexts = list(self._eks_contexts.values())
+                    self._create_eks_k8s_config(contexts)
+        return context.arn
+
+    @classmethod
+    def _get_eks_context_lock(cls, key) -> Lock:
+        with cls._eks_contexts_lock:
+            return cls._eks_context_locks.setdefault(key, Lock())
+
+    @classmethod
+    def clear_eks_contexts(cls):
+        with cls._eks_contexts_lock:
+            cls._eks_contexts.clear()
+            cls._eks_context_locks.clear()
 
     def _create_aws_session(self, region: str = ''):
         aws_session_params = {'region_name': region} if region else {}
@@ -99,42 +137,69 @@ class KubernetesAction(Action):
             signed_url.encode('utf-8')).decode('utf-8')
         return 'k8s-aws-v1.' + re.sub(r'=*', '', base64_url)
 
-    def _create_eks_k8s_config(self, cluster_info: dict, token: str):
-        cluster_cert = cluster_info['cluster']['certificateAuthority']['data']
-        cluster_endpoint = cluster_info['cluster']['endpoint']
-        cluster_arn = cluster_info['cluster']['arn']
+    def _create_eks_k8s_config(self, contexts: List['EksContext']):
         k8s_config = {
             'apiVersion': 'v1',
             'clusters': [
                 {
                     'cluster': {
-                        'server': cluster_endpoint,
-                        'certificate-authority-data': cluster_cert
+                        'server': context.endpoint,
+                        'certificate-authority-data': context.certificate
                     },
-                    'name': cluster_arn
-                }
+                    'name': context.arn
+                } for context in contexts
             ],
             'contexts': [
                 {
                     'context': {
-                        'cluster': cluster_arn,
-                        'user': cluster_arn
+                        'cluster': context.arn,
+                        'user': context.arn
                     },
-                    'name': cluster_arn
-                }
+                    'name': context.arn
+                } for context in contexts
             ],
-            'current-context': cluster_arn,
+            'current-context': contexts[-1].arn,
             'users': [
                 {
-                    'name': cluster_arn,
+                    'name': context.arn,
                     'user': {
-                        'token': token
+                        'token': context.token
                     }
-                }
+                } for context in contexts if context.token
             ]
         }
         config_text = yaml.dump(k8s_config, default_flow_style=False)
         k8s_config_dir = os.path.join(str(Path.home()), '.kube')
         Path(k8s_config_dir).mkdir(parents=True, exist_ok=True)
         k8s_config_file = os.path.join(k8s_config_dir, 'config')
-        open(k8s_config_file, "w+").write(config_text)
+        # replace the file at once, steps running on other clusters may be
+        # reading it
+        with tempfile.NamedTemporaryFile('w', dir=k8s_config_dir,
+                                         delete=False) as k8s_config_fd:
+            k8s_config_fd.write(config_text)
+        os.replace(k8s_config_fd.name, k8s_config_file)
+
+
+class EksContext:
+    """
+    Kubernetes context of an EKS cluster: the cluster information, looked
+    up once, and the last STS token signed for the cluster.
+    """
+    TOKEN_REFRESH_MARGIN_SECONDS = 10
+
+    def __init__(self, session: boto3.Session, cluster_info: dict):
+        self.session = session
+        self.arn = cluster_info['cluster']['arn']
+        self.endpoint = cluster_info['cluster']['endpoint']
+        self.certificate = \
+            cluster_info['cluster']['certificateAuthority']['data']
+        self.token = None
+        self._token_refresh_at = 0
+
+    def is_token_expiring(self) -> bool:
+        return time.monotonic() >= self._token_refresh_at
+
+    def set_token(self, token: str, expires_in: int):
+        self.token = token
+        self._token_refresh_at = time.monotonic() + expires_in - \
+            self.TOKEN_REFRESH_MARGIN_SECONDS
@@ -0,0 +1,24 @@
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KallistiCursorPagination(CursorPagination):
+    """
+    Cursor pagination of the lists ordered by creation time, the latest
+    first: a page is read from the creation time encoded in the cursor
+    through the index of the 'created_at' column, so that deep pages cost as
+    much as the first one. The rows created at the same time are ordered by
+    their ids and paged by offset from that time; migration 0026 spreads the
+    creation times shared by the rows backfilled by migration 0024.
+
+    Lists are paginated by KALLISTI_API_PAGE_SIZE, or by the 'page_size'
+    query parameter up to KALLISTI_API_MAX_PAGE_SIZE, and returned whole
+    when the page size is set to 0 and not requested.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'KALLISTI_API_PAGE_SIZE', 100)
+        self.max_page_size = getattr(settings, 'KALLISTI_API_MAX_PAGE_SIZE',
+                                     1000)
@@ -1,5 +1,8 @@
 from __future__ import unicode_literals
 
+import logging
+from typing import Iterable, Iterator
+
 from django.conf import settings
 from django.template import loader
 import six
@@ -17,6 +20,7 @@ class XMLRenderer(BaseRenderer):
     format = 'xml'
     charset = 'utf-8'
     ITEM_TAG_NAME = 'list-item'
+    ERROR_TAG_NAME = 'error'
     ROOT_TAG_NAME = 'root'
     TITLE_TAG_NAME = 'report-title'
     XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
@@ -25,6 +29,7 @@ class XMLRenderer(BaseRenderer):
                  '[<!ATTLIST xsl:stylesheet id    ID  #REQUIRED>]>'
     XSL_TEMPLATE = loader.get_template(
         'kallisticore/xsl_template.xml').template
+    logger = logging.getLogger(__name__)
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
@@ -32,24 +37,87 @@ class XMLRenderer(BaseRenderer):
         """
         if data is None:
             return ''
+        return ''.join(self._render(data))
 
-        stream = StringIO()
-        xml = SimplerXMLGenerator(stream, self.charset)
-        self._append_title(xml)
-        self._append_data(xml, data)
-        xml.endDocument()
-        return self.XML_HEADER + self.XSL_HEADER + '<report>\n' \
-            + self.XSL_TEMPLATE.source + stream.getvalue() + '</report>\n'
+    def render_stream(self, items: Iterable) -> Iterator[str]:
+        """
+        Renders the items of `items` into serialized XML one at a time, for
+        a streaming response. Iterators within the items, e.g. the trials of
+        an experiment, are rendered one item at a time as well.
+
+        The response has been sent by the time an item fails to render: the
+        error is logged and the document is closed after an error element.
+        """
+        open_tags = []
+        try:
+            yield from self._render(iter(items), open_tags)
+        except Exception:
+            self.logger.exception('Failed to render the report.')
+            yield self._to_string(lambda xml: self._to_xml(xml, {
+                self.ERROR_TAG_NAME: 'The report is incomplete.'}))
+            yield self._close_tags(open_tags)
+
+    def _render(self, data, open_tags=None):
+        open_tags = [] if open_tags is None else open_tags
+        yield self.XML_HEADER + self.XSL_HEADER + '<report>\n' \
+            + self.XSL_TEMPLATE.source + self._to_string(self._append_title)
+        open_tags.append('report')
+        yield from self._iter_element(self.ROOT_TAG_NAME, data, open_tags)
+        yield self._close_tags(open_tags)
+
+    @staticmethod
+    def _close_tags(open_tags) -> str:
+        closing_tags = ''.join('</{}>'.format(tag)
+                               for tag in reversed(open_tags))
+        open_tags.clear()
+        return closing_tags + '\n'
 
     def _append_title(self, xml):
         xml.startElement(self.TITLE_TAG_NAME, {})
         xml.characters(settings.KALLISTI_REPORT_HEADER_TITLE)
         xml.endElement(self.TITLE_TAG_NAME)
 
-    def _append_data(self, xml, data):
-        xml.startElement(self.ROOT_TAG_NAME, {})
-        self._to_xml(xml, data)
-        xml.endElement(self.ROOT_TAG_NAME)
+    def _iter_element(self, tag, data, open_tags):
+        yield '<{}>'.format(tag)
+        open_tags.append(tag)
+        yield from self._iter_xml(data, open_tags)
+        open_tags.pop()
+        yield '</{}>'.format(tag)
+
+    def _iter_xml(self, data, open_tags):
+        # only the iterators are rendered lazily, the other values are
+        # rendered into a chunk each
+        if isinstance(data, Iterator):
+            for item in data:
+                if self._is_streamed(item):
+                    yield from self._iter_element(self.ITEM_TAG_NAME, item,
+                                                  open_tags)
+                else:
+                    yield self._to_string(
+                        lambda xml: self._to_xml(xml, [item]))
+
+        elif self._is_streamed(data):
+            for key, value in six.iteritems(data):
+                if isinstance(value, Iterator):
+                    yield from self._iter_element(key, value, open_tags)
+                else:
+                    yield self._to_string(
+                        lambda xml: self._to_xml(xml, {key: value}))
+
+        else:
+            yield self._to_string(lambda xml: self._to_xml(xml, data))
+
+    @staticmethod
+    def _is_streamed(data):
+        return isinstance(data, Iterator) or isinstance(data, dict) and \
+            any(isinstance(value, Iterator) for value in data.values())
+
+    def _to_string(self, append):
+        stream = StringIO()
+        xml = SimplerXMLGenerator(stream, self.charset)
+        append(xml)
+        xml.endDocument()
+        return stream.getvalue()
 
     def _to_xml(self, xml, data):
         if isinstance(data, (list, tuple)):
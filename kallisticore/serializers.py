@@ -65,17 +65,19 @@ class TrialSerializer(serializers.ModelSerializer):
     initiated_by = serializers.CharField(read_only=True)
 
     def get_trial_record(self, instance: Trial) -> OrderedDict:
+        trial_records = instance.get_records(
+            self.context.get('trial_record_stages'))
         records = OrderedDict()
-        pre_steps = instance.records.get('pre_steps', None)
+        pre_steps = trial_records.get('pre_steps', None)
         if pre_steps:
             records['pre_steps'] = pre_steps
-        steps = instance.records.get('steps', None)
+        steps = trial_records.get('steps', None)
         if steps:
             records['steps'] = steps
-        post_steps = instance.records.get('post_steps', None)
+        post_steps = trial_records.get('post_steps', None)
         if post_steps:
             records['post_steps'] = post_steps
-        result = instance.records.get('result', None)
+        result = trial_records.get('result', None)
         if result:
             records['result'] = result
         return records
@@ -94,16 +96,16 @@ class TrialSerializer(serializers.ModelSerializer):
 
 class TrialForReportSerializer(TrialSerializer):
     trial_record = serializers.SerializerMethodField()
+    records = serializers.CharField(source='get_records', read_only=True)
 
     def get_trial_record(self, instance: Trial) -> dict:
-        if not instance or not instance.records:
+        if not instance:
             return {}
-        else:
-            return instance.records
+        return instance.get_records() or {}
 
     class Meta:
         model = Trial
-        exclude = ('experiment',)
+        exclude = ('experiment', 'created_at', 'updated_at')
 
 
 class ReportSerializer(serializers.ModelSerializer):
@@ -119,6 +121,11 @@ class ReportSerializer(serializers.ModelSerializer):
         if self.context.get('trial_id'):
             trial = experiment.trials.get(id=self.context.get('trial_id'))
             return TrialForReportSerializer(many=True, instance=[trial]).data
+        experiment_trials = self.context.get('experiment_trials')
+        if experiment_trials:
+            # streamed: the trials are serialized one at a time
+            return (TrialForReportSerializer(instance=trial).data
+                    for trial in experiment_trials(experiment))
         return TrialForReportSerializer(many=True,
                                         instance=experiment.trials).data
 
@@ -157,7 +164,9 @@ class TrialScheduleSerializer(serializers.ModelSerializer):
         return super(TrialScheduleSerializer, self).create(validated_data)
 
     def get_trials(self, trial_schedule: TrialSchedule):
-        sorted_trials = trial_schedule.trials.order_by('executed_at')
+        sorted_trials = getattr(trial_schedule, 'sorted_trials', None)
+        if sorted_trials is None:
+            sorted_trials = trial_schedule.trials.order_by('executed_at')
         return TrialStatusSerializer(sorted_trials, read_only=True,
                                      many=True).data
 
@@ -1,23 +1,24 @@
 from django.db.models.signals import post_save, pre_save
 from django.dispatch import receiver
-from django.conf import settings
 
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
 from kallisticore.models import Trial
-from kallisticore.tasks import execute_trial
+from kallisticore.models.trial import TrialStatus
+from kallisticore.tasks import execute_trial, before_trial_task_creation
 
 
 @receiver(post_save, sender=Trial)
 def execute_plan_for_trial(sender, instance, created, **kwargs):
     if created:
-        execute_trial(_before_trial_task_creation(instance))
+        execute_trial(before_trial_task_creation(instance))
+
+
+@receiver(post_save, sender=Trial)
+def signal_trial_stop(sender, instance, created, **kwargs):
+    if instance.status == TrialStatus.STOP_INITIATED.value:
+        TrialStopSignals().signal(instance.id)
 
 
 @receiver(pre_save, sender=Trial)
 def execute_full_clean_for_trial(sender, instance, **kwargs):
     instance.full_clean()
-
-
-def _before_trial_task_creation(trial: Trial):
-    for hook in getattr(settings, 'TRIAL_TASK_CREATION_HOOKS', []):
-        hook(trial)
-    return trial
@@ -1,6 +1,7 @@
 from django.conf import settings
 from huey import crontab
 
+from kallisticore.lib.action import ActionRegistry
 from kallisticore.lib.trial_executor import execute_trial as exec_trial
 from kallisticore.lib.trial_scheduler import schedule
 
@@ -10,10 +11,29 @@ def execute_trial(instance):
     exec_trial(instance)
 
 
+@settings.HUEY.on_startup()
+def warm_action_registry():
+    ActionRegistry().build()
+
+
 @settings.HUEY.periodic_task(crontab())
 def schedule_trials():
     _schedule_trials(60)
 
 
 def _schedule_trials(scheduler_interval_seconds):
-    schedule(scheduler_interval_seconds)
+    enqueue_trials(schedule(scheduler_interval_seconds))
+
+
+def enqueue_trials(trials):
+    """ Enqueue the execution of trials created in bulk, i.e. without the
+    post_save signal of the trials.
+    """
+    for trial in trials:
+        execute_trial(before_trial_task_creation(trial))
+
+
+def before_trial_task_creation(trial):
+    for hook in getattr(settings, 'TRIAL_TASK_CREATION_HOOKS', []):
+        hook(trial)
+    return trial
@@ -6,6 +6,7 @@ from kallisticore.views.report import ReportAPI
 from kallisticore.views.trial import TrialViewSet
 from kallisticore.views.trial_schedule import TrialScheduleViewSet
 from kallisticore.views.trial_stop import TrialStopAPI
+from kallisticore.views.trial_stream import TrialStreamAPI
 from kallisticore.views.notification import NotificationViewSet
 
 router = DefaultRouter()
@@ -20,5 +21,7 @@ urlpatterns = [
     re_path(r'^notification', NotificationViewSet.as_view(
         {'get': 'list', 'put': 'update'}), name='notification'),
     re_path(r'trial/(?P<trial_id>[-\w]+)/stop', TrialStopAPI.as_view(),
-            name='trial-stop')
+            name='trial-stop'),
+    re_path(r'trial/(?P<trial_id>[-\w]+)/stream', TrialStreamAPI.as_view(),
+            name='trial-stream')
 ]
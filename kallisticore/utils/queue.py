@@ -0,0 +1,26 @@
+from huey import FileHuey, MemoryHuey, RedisHuey, SqliteHuey
+from huey.api import Huey
+
+QUEUE_BACKENDS = {
+    'file': FileHuey,
+    'memory': MemoryHuey,
+    'redis': RedisHuey,
+    'sqlite': SqliteHuey,
+}
+
+
+def make_huey(backend: str, name: str = 'kallisti_queues', **options) \
+        -> Huey:
+    """ Create the task queue of the given backend.
+
+    :param backend: sqlite, file (a directory), memory (in-process only,
+     e.g. for tests) or redis (any server speaking the Redis protocol)
+    :param name: the name of the queue
+    :param options: the options of the backend storage, e.g. `filename` for
+     sqlite, `path` for file or `url` for redis
+    :returns the huey instance
+    """
+    if backend not in QUEUE_BACKENDS:
+        raise ValueError("Unsupported queue backend: {}, expected one of {}"
+                         .format(backend, sorted(QUEUE_BACKENDS)))
+    return QUEUE_BACKENDS[backend](name, **options)
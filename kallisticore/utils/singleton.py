@@ -1,4 +1,5 @@
 import inspect
+from threading import RLock
 
 
 class Singleton(type):
@@ -12,15 +13,22 @@ class Singleton(type):
     #   {dict_items([('self', None), ('a', 1), ('b', 0)]): foo_instance1},
     #   {dict_items([('self', None), ('a', 1), ('b', 2)]): foo_instance2}}
     #
+    #
+    # Instances are created under a lock so that concurrent callers get the
+    # same instance. It is reentrant as an instance may create others.
     _instances = {}
+    _lock = RLock()
 
     def __call__(cls, *args, **kwargs):
-        insts_by_args = cls._instances.setdefault(cls, {})
         call_args = inspect.getcallargs(cls.__init__, None, *args, **kwargs)
         items = tuple((k, v) for k, v in call_args.items() if v)
         key = frozenset(items)
-        inst = insts_by_args.get(key)
+        inst = cls._instances.get(cls, {}).get(key)
         if not inst:
-            inst = super(Singleton, cls).__call__(*args, **kwargs)
-            insts_by_args[key] = inst
+            with Singleton._lock:
+                insts_by_args = cls._instances.setdefault(cls, {})
+                inst = insts_by_args.get(key)
+                if not inst:
+                    inst = super(Singleton, cls).__call__(*args, **kwargs)
+                    insts_by_args[key] = inst
         return inst
@@ -0,0 +1,50 @@
+import hashlib
+from typing import Tuple
+
+from django.utils.cache import get_conditional_response, \
+    patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+
+class ConditionalRetrieveMixin:
+    """
+    Retrieves objects with a strong ETag derived from their version, so that
+    a request whose If-None-Match header matches is answered with 304 Not
+    Modified without serializing the object. The object is still read
+    first, for its permissions to be checked.
+
+    Responses are private to the authenticated user.
+    """
+
+    def get_version(self, instance) -> Tuple:
+        """
+        :returns the values changing along with the representation of the
+         object, e.g. its update time.
+        """
+        raise NotImplementedError
+
+    def get_cache_control(self, instance) -> dict:
+        """
+        :returns the Cache-Control directives of the object, revalidated by
+         default.
+        """
+        return {'private': True, 'no_cache': True}
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        etag = self._make_etag(self.get_version(instance))
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = Response(self.get_serializer(instance).data)
+        response['ETag'] = etag
+        patch_cache_control(response, **self.get_cache_control(instance))
+        patch_vary_headers(response, ['Authorization'])
+        return response
+
+    def _make_etag(self, version: Tuple) -> str:
+        # the representation also depends on the renderer and query params
+        key = [str(value) for value in version] + [
+            self.request.accepted_renderer.format or '',
+            self.request.GET.urlencode()]
+        return quote_etag(hashlib.sha1('|'.join(key).encode()).hexdigest())
@@ -1,15 +1,18 @@
 from django.conf import settings
 from django.db.models.query import QuerySet
 from kallisticore.models.experiment import Experiment
+from kallisticore.pagination import KallistiCursorPagination
 from kallisticore.serializers import ExperimentSerializer
+from kallisticore.views.conditional import ConditionalRetrieveMixin
 from rest_framework import viewsets
 from rest_framework.decorators import authentication_classes
 
 
 @authentication_classes((settings.KALLISTI_API_AUTH_CLASS,))
-class ExperimentViewSet(viewsets.ModelViewSet):
+class ExperimentViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     queryset = Experiment.objects.all()
     serializer_class = ExperimentSerializer
+    pagination_class = KallistiCursorPagination
     permission_classes = (settings.KALLISTI_API_PERMISSION_CLASS,)
 
     def get_queryset(self):
@@ -30,3 +33,6 @@ class ExperimentViewSet(viewsets.ModelViewSet):
             queryset = queryset.all()
 
         return queryset
+
+    def get_version(self, instance):
+        return instance.updated_at,
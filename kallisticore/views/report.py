@@ -1,4 +1,8 @@
+from typing import Iterator
+
 from django.conf import settings
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from kallisticore.models import Experiment, Trial
@@ -19,6 +23,7 @@ class ReportAPI(ListAPIView):
     serializer_class = ReportSerializer
     renderer_classes = (XMLRenderer,)
     permission_classes = (settings.KALLISTI_API_PERMISSION_CLASS,)
+    experiment_trials = None
 
     @swagger_auto_schema(manual_parameters=[trial_id_query_param])
     def get(self, request, *args, **kwargs):
@@ -27,14 +32,61 @@ class ReportAPI(ListAPIView):
     def list(self, request, *args, **kwargs):
         trial_id = request.query_params.get('trial-id')
         if trial_id:
-            trial = get_object_or_404(Trial.objects, id=trial_id)
-            self.queryset = [trial.experiment]
-        return super(ListAPIView, self).list(request, *args, **kwargs)
+            trial = get_object_or_404(
+                Trial.objects.select_related('experiment'), id=trial_id)
+            experiments = [trial.experiment]
+        else:
+            # shared by the experiments of the report
+            self.experiment_trials = ExperimentTrials(
+                self.filter_queryset(self.get_queryset()))
+            experiments = self.experiment_trials.experiments.iterator()
+        # the report is rendered and sent one experiment at a time
+        report = request.accepted_renderer.render_stream(
+            self.get_serializer(experiment).data
+            for experiment in experiments)
+        return StreamingHttpResponse(
+            report, content_type='{}; charset={}'.format(
+                request.accepted_renderer.media_type,
+                request.accepted_renderer.charset))
 
     def get_serializer_context(self):
         return {
             'request': self.request,
             'format': self.format_kwarg,
             'view': self,
-            'trial_id': self.request.query_params.get('trial-id')
+            'trial_id': self.request.query_params.get('trial-id'),
+            'experiment_trials': self.experiment_trials
         }
+
+
+class ExperimentTrials:
+    """
+    Trials of the experiments of a report, read in chunks with a single
+    query along with their record rows. The trials are ordered by the
+    database the same way as `experiments`, the experiments of the report
+    in the order of their creation, for each experiment's trials to be read
+    before the next experiment's.
+    """
+    ORDERING = ('created_at', 'id')
+
+    def __init__(self, experiments: QuerySet):
+        chunk_size = getattr(settings, 'KALLISTI_REPORT_CHUNK_SIZE', 100)
+        self.experiments = experiments.order_by(*self.ORDERING)
+        self._trials = Trial.objects.filter(experiment__in=experiments)\
+            .order_by(*['experiment__' + field for field in self.ORDERING],
+                      'created_at', 'id')\
+            .prefetch_related('record_entries')\
+            .iterator(chunk_size=chunk_size)
+        self._next_trial = None
+
+    def __call__(self, experiment: Experiment) -> Iterator[Trial]:
+        while True:
+            if self._next_trial is None:
+                self._next_trial = next(self._trials, None)
+                if self._next_trial is None:
+                    return
+            # the trials of the next experiments are kept for them
+            if self._next_trial.experiment_id != experiment.id:
+                return
+            trial, self._next_trial = self._next_trial, None
+            yield trial
@@ -1,15 +1,20 @@
 from django.conf import settings
+from django.db.models import Prefetch
 from django.db.models.query import QuerySet
 from kallisticore.models.trial import Trial
+from kallisticore.models.trial_record import TrialRecord
+from kallisticore.pagination import KallistiCursorPagination
 from kallisticore.serializers import TrialSerializer
+from kallisticore.views.conditional import ConditionalRetrieveMixin
 from rest_framework import viewsets
 from rest_framework.decorators import authentication_classes
 
 
 @authentication_classes((settings.KALLISTI_API_AUTH_CLASS,))
-class TrialViewSet(viewsets.ModelViewSet):
-    queryset = Trial.objects.all()
+class TrialViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
+    queryset = Trial.objects.prefetch_related('record_entries')
     serializer_class = TrialSerializer
+    pagination_class = KallistiCursorPagination
     permission_classes = (settings.KALLISTI_API_PERMISSION_CLASS,)
     http_method_names = ['get', 'post']
 
@@ -23,12 +28,49 @@ class TrialViewSet(viewsets.ModelViewSet):
         if 'pk' in self.kwargs:
             # Get all including trials from deleted experiments if user
             # queries by primary key
-            queryset = Trial.objects.get_queryset_all(**self.kwargs)
+            queryset = Trial.objects.get_queryset_all(**self.kwargs)\
+                .prefetch_related(self._get_record_entries())
         else:
-            queryset = self.queryset.filter(**self.kwargs)
+            queryset = self.queryset.filter(**self.kwargs)\
+                .prefetch_related(None)\
+                .prefetch_related(self._get_record_entries())
 
         if isinstance(queryset, QuerySet):
             # Ensure queryset is re-evaluated on each request
             queryset = queryset.all()
 
         return queryset
+
+    def get_version(self, instance):
+        # the records rows are appended without updating the trial
+        last_record_id = max((trial_record.id for trial_record
+                              in instance.record_entries.all()), default=None)
+        return instance.updated_at, instance.completed_at, last_record_id
+
+    def get_cache_control(self, instance):
+        if not instance.is_completed():
+            return super(TrialViewSet, self).get_cache_control(instance)
+        # completed trials are only expected to change when deleted
+        return {'private': True, 'max_age': getattr(
+            settings, 'KALLISTI_COMPLETED_TRIAL_CACHE_MAX_AGE_SECONDS', 86400)}
+
+    def get_serializer_context(self):
+        context = super(TrialViewSet, self).get_serializer_context()
+        context['trial_record_stages'] = self._get_trial_record_stages()
+        return context
+
+    def _get_record_entries(self) -> Prefetch:
+        # only the records of the requested stages are read
+        trial_record_stages = self._get_trial_record_stages()
+        if trial_record_stages is None:
+            return Prefetch('record_entries')
+        return Prefetch('record_entries', queryset=TrialRecord.objects.filter(
+            trial_stage__in=trial_record_stages))
+
+    def _get_trial_record_stages(self):
+        trial_record_stages = self.request.query_params.get(
+            'trial-record-stages') if self.request else None
+        if not trial_record_stages:
+            return None
+        return [trial_stage.strip()
+                for trial_stage in trial_record_stages.split(',')]
@@ -1,10 +1,12 @@
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
+from django.db.models import Prefetch
 from django.db.models.query import QuerySet
 from django.http import Http404
-from kallisticore.models import Experiment
+from kallisticore.models import Experiment, Trial
 from kallisticore.models.trial_schedule import TrialSchedule
+from kallisticore.pagination import KallistiCursorPagination
 from kallisticore.serializers import TrialScheduleSerializer
 from rest_framework import viewsets
 from rest_framework.decorators import authentication_classes
@@ -14,6 +16,7 @@ from rest_framework.decorators import authentication_classes
 class TrialScheduleViewSet(viewsets.ModelViewSet):
     queryset = TrialSchedule.objects.all()
     serializer_class = TrialScheduleSerializer
+    pagination_class = KallistiCursorPagination
     permission_classes = (settings.KALLISTI_API_PERMISSION_CLASS,)
 
     def get_queryset(self):
@@ -26,6 +29,7 @@ class TrialScheduleViewSet(viewsets.ModelViewSet):
             queryset = TrialSchedule.objects.get_queryset_all(**self.kwargs)
         else:
             queryset = self.queryset.filter(**self.kwargs)
+        queryset = queryset.prefetch_related(self._get_sorted_trials())
 
         if isinstance(queryset, QuerySet):
             queryset = queryset.all()
@@ -40,6 +44,14 @@ class TrialScheduleViewSet(viewsets.ModelViewSet):
             'experiment_id': self.kwargs.get('experiment_id')
         }
 
+    @staticmethod
+    def _get_sorted_trials() -> Prefetch:
+        # the trials of all the schedules are read at once, without their
+        # records
+        return Prefetch('trials', queryset=Trial.objects.order_by(
+            'executed_at').only('id', 'status', 'executed_at'),
+            to_attr='sorted_trials')
+
     def create(self, request, *args, **kwargs):
         try:
             return super(TrialScheduleViewSet, self).create(request, *args,
@@ -0,0 +1,70 @@
+from threading import Lock
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework import status
+from rest_framework.decorators import authentication_classes
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from kallisticore.lib.trial_event_stream import TrialEventStream
+from kallisticore.models import Trial
+
+
+@authentication_classes((settings.KALLISTI_API_AUTH_CLASS,))
+class TrialStreamAPI(APIView):
+    """
+    Streams the records and status transitions of a trial as server-sent
+    events, resumed after the id given by the Last-Event-ID header or the
+    'last-event-id' query parameter.
+
+    Each open stream holds a worker of the server, so that a process serves
+    up to KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS streams at a time and
+    answers the other requests for a stream with 503 Service Unavailable.
+    """
+    permission_classes = (settings.KALLISTI_API_PERMISSION_CLASS,)
+    open_streams = 0
+    _open_streams_lock = Lock()
+
+    def get(self, request, trial_id):
+        trial = get_object_or_404(Trial.objects.get_queryset_all(),
+                                  id=trial_id)
+        last_event_id = request.META.get('HTTP_LAST_EVENT_ID') or \
+            request.query_params.get('last-event-id') or 0
+        try:
+            last_event_id = int(last_event_id)
+        except ValueError:
+            return Response(
+                data={"message": "Last event id must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        if not self._open_stream():
+            return Response(
+                data={"message": "Too many open trial streams, retry "
+                                 "later."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        response = StreamingHttpResponse(
+            TrialEventStream(trial.id, last_event_id,
+                             on_close=self._close_stream),
+            content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # stops proxies from buffering the events
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @classmethod
+    def _open_stream(cls) -> bool:
+        max_connections = getattr(
+            settings, 'KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS', 10)
+        with cls._open_streams_lock:
+            if cls.open_streams >= max_connections:
+                return False
+            cls.open_streams += 1
+            return True
+
+    @classmethod
+    def _close_stream(cls) -> None:
+        with cls._open_streams_lock:
+            cls.open_streams -= 1
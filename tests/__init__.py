@@ -1,5 +1,10 @@
-from kallisticore.lib.action import KallistiFunctionCache
+from kallisticore.lib.action import ActionRegistry
+from kallisticore.lib.credential import CredentialCache
 
 
 def clear_kallisti_functions_cache():
-    KallistiFunctionCache().functions = {}
+    ActionRegistry().clear()
+
+
+def clear_credential_cache():
+    CredentialCache().clear()
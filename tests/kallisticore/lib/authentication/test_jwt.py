@@ -1,10 +1,12 @@
 import base64
 import json
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import requests_mock
 from django.test import TestCase
-from kallisticore.lib.authentication.jwt import JwtHandler, JwtException
+from kallisticore.lib.authentication.jwt import JwtHandler, JwtException, \
+    PublicKeys
 
 
 class TestJwt(TestCase):
@@ -62,3 +64,23 @@ class TestJwt(TestCase):
                 '.'.join([token_header, token_body, token_sig]))
         self.assertEqual('jwk for this token was not found',
                          str(exc_context.exception))
+
+    @mock.patch('kallisticore.lib.authentication.jwt.jwt.decode')
+    @mock.patch('kallisticore.lib.authentication.jwt.jwk.construct')
+    @requests_mock.mock()
+    def test_concurrent_decode_retrieves_public_keys_once(
+            self, mock_jwk_construct, decode_mock, req_mock):
+        mock_jwk_construct.return_value = mock.Mock()
+        decode_mock.return_value = {}
+        mock_jwks = {'keys': [{'kty': 'RSA', 'kid': 'concurrent-kid'}]}
+        req_mock.get('https://test-iss', text=json.dumps(mock_jwks))
+        token_header = base64.b64encode(
+            json.dumps({'kid': 'concurrent-kid'}).encode()).decode('utf-8')
+        token = '.'.join([token_header, 'test-body', 'test-sig'])
+        handler = JwtHandler('https://test-iss', '')
+
+        with mock.patch.object(PublicKeys(), 'keys', {}), \
+                ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(handler.decode, [token] * 8))
+
+        self.assertEqual(1, req_mock.call_count)
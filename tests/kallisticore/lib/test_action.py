@@ -1,3 +1,4 @@
+import asyncio
 import os
 from unittest.mock import patch
 
@@ -11,19 +12,26 @@ import kallisticore.modules.examples.sample_module2.subtract_action as \
 from django.conf import settings
 from django.test import TestCase
 from kallisticore.exceptions import CouldNotFindFunction, UnknownModuleName
-from kallisticore.lib.action import FunctionLoader, Action
+from kallisticore.lib.action import FunctionLoader, Action, ActionRegistry
 from kallisticore.lib.action import make_action
 from kallisticore.lib.credential import EnvironmentUserNamePasswordCredential
 from kallisticore.lib.expectation import OperatorExpectation
 from kallisticore.models.step import Step
 from kallisticore.modules.cloud_foundry.cloud_foundry_action import \
     CloudFoundryAction
+from tests import clear_kallisti_functions_cache
 
 
 class TestFunctionLoader(TestCase):
     MODULE_MAP = {'eg': 'kallisticore.modules.examples.sample_module1',
                   'eg2': 'kallisticore.modules.examples.sample_module2'}
 
+    def setUp(self):
+        clear_kallisti_functions_cache()
+
+    def tearDown(self):
+        clear_kallisti_functions_cache()
+
     def test_single_module(self):
         # Action functions are defined in single module
         # with __all__ defined, and no __actions_modules__
@@ -84,6 +92,59 @@ class TestFunctionLoader(TestCase):
         self.assertEqual(cm.exception.args[0], 'eg.function_name')
 
 
+class TestActionRegistry(TestCase):
+    MODULE_MAP = {'eg': 'kallisticore.modules.examples.sample_module1',
+                  'eg2': 'kallisticore.modules.examples.sample_module2',
+                  'unknown': 'kallisticore.modules.unknown'}
+
+    def setUp(self):
+        clear_kallisti_functions_cache()
+
+    def tearDown(self):
+        clear_kallisti_functions_cache()
+
+    def test_modules_are_searched_once(self):
+        with patch.object(FunctionLoader, 'get_functions',
+                          autospec=True,
+                          side_effect=FunctionLoader.get_functions) \
+                as get_functions:
+            FunctionLoader(self.MODULE_MAP, 'eg').get_function('increment')
+            FunctionLoader(self.MODULE_MAP, 'eg').get_function('subtract')
+
+        get_functions.assert_called_once()
+
+    def test_functions_are_indexed_by_module_name(self):
+        functions = ActionRegistry().get_functions(
+            FunctionLoader(self.MODULE_MAP, 'eg'))
+        self.assertEqual('kallisticore.modules.examples.sample_module1',
+                         functions['increment'])
+
+    def test_patched_functions_are_returned(self):
+        FunctionLoader(self.MODULE_MAP, 'eg').get_function('increment')
+        module_path = 'kallisticore.modules.examples.sample_module1.increment'
+        with patch(module_path) as increment:
+            self.assertEqual(increment, FunctionLoader(self.MODULE_MAP, 'eg')
+                             .get_function('increment'))
+
+    def test_build_and_list_functions(self):
+        duration = ActionRegistry().build(self.MODULE_MAP)
+
+        self.assertEqual(duration, ActionRegistry().build_duration)
+        self.assertGreaterEqual(duration, 0)
+        functions = ActionRegistry().list_functions(self.MODULE_MAP)
+        self.assertEqual(['eg', 'eg2'], sorted(functions))
+        self.assertEqual(['increment', 'multiply', 'subtract'],
+                         functions['eg'])
+        self.assertEqual(['Add', 'increment', 'multiply', 'subtract'],
+                         functions['eg2'])
+
+    def test_build_from_kallisti_module_map(self):
+        ActionRegistry().build()
+        functions = ActionRegistry().list_functions()
+        self.assertEqual(set(settings.KALLISTI_MODULE_MAP), set(functions))
+        self.assertIn('http_probe', functions['cm'])
+
+
 class TestAction(TestCase):
     MODULE_MAP = {'eg': 'kallisticore.modules.examples.sample_module1',
                   'eg2': 'kallisticore.modules.examples.sample_module2'}
@@ -184,6 +245,31 @@ class TestAction(TestCase):
 
         self.assertEqual(3, action.execute())
 
+    def test_execute_coroutine_function_action(self):
+        async def increment(a):
+            return a + 1
+
+        action = Action(increment, {'a': 1})
+
+        self.assertEqual(2, action.execute())
+
+    def test_execute_async_function_action(self):
+        step = Step.build({'step': 'increment',
+                           'do': 'eg.increment',
+                           'where': {'a': 1}})
+        action = Action.build(step, self.MODULE_MAP, {})
+
+        self.assertEqual(2, asyncio.run(action.execute_async()))
+
+    def test_execute_async_coroutine_function_action(self):
+        async def increment(a):
+            return a + 1
+
+        action = Action(increment, {'a': 1},
+                        [OperatorExpectation('==', 'value', 2)])
+
+        self.assertEqual(2, asyncio.run(action.execute_async()))
+
 
 class TestMakeAction(TestCase):
     MODULE_MAP = {'eg': 'kallisticore.modules.examples.sample_module1',
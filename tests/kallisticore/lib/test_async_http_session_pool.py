@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from http.server import HTTPServer
+from unittest import TestCase
+
+from django.test import override_settings
+
+from kallisticore.lib.async_http_session_pool import AsyncHttpSessionPool
+from kallisticore.utils.singleton import Singleton
+from tests.kallisticore.lib.test_http_session_pool import _KeepAliveHandler
+
+
+class TestAsyncHttpSessionPool(TestCase):
+    def setUp(self):
+        Singleton._instances.pop(AsyncHttpSessionPool, None)
+        self.server = HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever,
+                         kwargs={'poll_interval': 0.01}, daemon=True).start()
+        self.url = 'http://127.0.0.1:{}/health'.format(
+            self.server.server_port)
+
+    def tearDown(self):
+        Singleton._instances.pop(AsyncHttpSessionPool, None)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_requests_on_a_loop_share_one_session(self):
+        async def send_requests():
+            pool = AsyncHttpSessionPool()
+            sessions = []
+            statuses = []
+            for _ in range(3):
+                session = pool.get_session()
+                async with session.request('GET', self.url) as response:
+                    statuses.append(response.status)
+                    await response.text()
+                sessions.append(session)
+            connections = len(sessions[0].connector._conns)
+            await pool.close()
+            return sessions, statuses, connections
+
+        sessions, statuses, connections = asyncio.run(send_requests())
+
+        self.assertEqual([200, 200, 200], statuses)
+        self.assertIs(sessions[0], sessions[1])
+        self.assertIs(sessions[0], sessions[2])
+        self.assertEqual(1, connections)
+        self.assertTrue(sessions[0].closed)
+
+    def test_each_loop_has_its_own_session(self):
+        async def get_session():
+            session = AsyncHttpSessionPool().get_session()
+            await AsyncHttpSessionPool().close()
+            return session
+
+        first = asyncio.run(get_session())
+        second = asyncio.run(get_session())
+
+        self.assertIsNot(first, second)
+
+    def test_session_of_closed_loop_is_forgotten(self):
+        async def get_session():
+            return AsyncHttpSessionPool().get_session()
+
+        async def get_sessions_and_close():
+            AsyncHttpSessionPool().get_session()
+            sessions = list(AsyncHttpSessionPool()._sessions.values())
+            await AsyncHttpSessionPool().close()
+            return sessions
+
+        first = asyncio.run(get_session())
+        sessions = asyncio.run(get_sessions_and_close())
+
+        self.assertEqual(1, len(sessions))
+        self.assertIsNot(first, sessions[0])
+
+    @override_settings(KALLISTI_HTTP_CONNECT_TIMEOUT_SECONDS=3,
+                       KALLISTI_HTTP_READ_TIMEOUT_SECONDS=7)
+    def test_session_timeout_from_settings(self):
+        async def get_timeout():
+            session = AsyncHttpSessionPool().get_session()
+            await AsyncHttpSessionPool().close()
+            return session.timeout
+
+        timeout = asyncio.run(get_timeout())
+
+        self.assertEqual(3, timeout.sock_connect)
+        self.assertEqual(7, timeout.sock_read)
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase
+from kallisticore import signals
+from kallisticore.lib.async_trial_executor import AsyncTrialExecutor
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
+from kallisticore.models.trial import Trial, TrialStatus
+from kallisticore.signals import execute_plan_for_trial
+from tests.kallisticore.lib.test_trial_executor import \
+    create_experiment_and_trial
+
+
+class TestAsyncTrialExecutor(TestCase):
+    module_map = {'eg': 'kallisticore.modules.examples.sample_module1'}
+    LOG_REC = 'kallisticore.lib.trial_executor.TrialLogRecord'
+    COMMIT = 'kallisticore.lib.trial_executor.TrialLogRecorder.commit'
+    EG_INCREMENT = 'kallisticore.modules.examples.sample_module1.increment'
+    EG_SUBTRACT = 'kallisticore.modules.examples.sample_module1.subtract'
+
+    def setUp(self):
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self.steps = [
+            {'id': 'first', 'depends_on': [],
+             'do': 'eg.increment', 'where': {'a': 1}},
+            {'id': 'second', 'depends_on': [],
+             'do': 'eg.increment', 'where': {'a': 2}},
+            {'id': 'last', 'depends_on': ['first', 'second'],
+             'do': 'eg.subtract', 'where': {'a': 2, 'b': 1}}]
+        self.trial = create_experiment_and_trial({}, self.steps)
+
+    def tearDown(self):
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def test_coroutine_actions_run_concurrently_on_event_loop(self):
+        started = []
+
+        async def increment(a):
+            started.append(a)
+            while len(started) < 2:
+                await asyncio.sleep(0.01)
+            return a + 1
+
+        with mock.patch(self.COMMIT) as mock_rec_commit, \
+            mock.patch(self.EG_INCREMENT, new=increment), \
+            mock.patch(self.EG_SUBTRACT, return_value=1) as subtract, \
+                AsyncTrialExecutor(self.trial, self.module_map, {},
+                                   max_workers=2) as trial_executor:
+            trial_executor.run()
+
+        self.assertEqual([1, 2], sorted(started))
+        subtract.assert_called_once_with(a=2, b=1)
+        self.assertEqual(4, mock_rec_commit.call_count)
+        self.assertEqual(self.trial.status, TrialStatus.SUCCEEDED.value)
+
+    def test_dependant_steps_not_run_when_step_fails(self):
+        async def increment(a):
+            raise Exception("increment error")
+
+        with mock.patch(self.LOG_REC) as mock_log_rec_cls, \
+            mock.patch(self.COMMIT), \
+            mock.patch(self.EG_INCREMENT, new=increment), \
+            mock.patch(self.EG_SUBTRACT) as subtract, \
+                AsyncTrialExecutor(self.trial, self.module_map, {},
+                                   max_workers=2) as trial_executor:
+            mock_trial_log = mock.Mock()
+            mock_log_rec_cls.return_value = mock_trial_log
+            trial_executor.run()
+
+        subtract.assert_not_called()
+        mock_trial_log.append.assert_called_with(
+            'ERROR', 'Trial Failed. Type: StepsExecutionError. '
+                     'Error: [in: steps, reason: increment error]')
+        self.assertEqual(self.trial.status, TrialStatus.FAILED.value)
+
+    def test_sequential_steps_with_sync_actions(self):
+        steps = [{'do': 'eg.increment', 'where': {'a': 1}},
+                 {'do': 'eg.subtract', 'where': {'a': 2, 'b': 1}}]
+        trial = create_experiment_and_trial({}, steps)
+
+        with mock.patch(self.COMMIT) as mock_rec_commit, \
+                AsyncTrialExecutor(trial, self.module_map, {}) \
+                as trial_executor:
+            trial_executor.run()
+
+        self.assertEqual(3, mock_rec_commit.call_count)
+        self.assertEqual(trial.status, TrialStatus.SUCCEEDED.value)
+
+    def test_coroutine_action_cancelled_on_stop(self):
+        cancelled = []
+
+        async def increment(a):
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                cancelled.append(a)
+                raise
+
+        steps = [{'do': 'eg.increment', 'where': {'a': 1}}]
+        trial = create_experiment_and_trial({}, steps)
+        with mock.patch(self.COMMIT), \
+            mock.patch(self.EG_INCREMENT, new=increment), \
+                AsyncTrialExecutor(trial, self.module_map, {}) \
+                as trial_executor:
+            threading.Timer(0.1, TrialStopSignals().signal,
+                            args=(trial.id,)).start()
+            started = time.monotonic()
+            trial_executor.run()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual([1], cancelled)
+        self.assertEqual(trial.status, TrialStatus.STOPPED.value)
+
+    def test_wait_in_sync_action_interrupted_on_stop(self):
+        steps = [{'do': 'cm.wait', 'where': {'time_in_seconds': 30}}]
+        trial = create_experiment_and_trial({}, steps)
+        module_map = {'cm': 'kallisticore.modules.common'}
+        with mock.patch(self.COMMIT), \
+                AsyncTrialExecutor(trial, module_map, {}) as trial_executor:
+            threading.Timer(0.1, TrialStopSignals().signal,
+                            args=(trial.id,)).start()
+            started = time.monotonic()
+            trial_executor.run()
+
+        self.assertLess(time.monotonic() - started, 5)
+        self.assertEqual(trial.status, TrialStatus.STOPPED.value)
@@ -1,9 +1,10 @@
 import os
+import tempfile
 import unittest
-from unittest.mock import patch
+from unittest.mock import patch, mock_open
 
 from kallisticore.exceptions import InvalidCredentialType
-from kallisticore.lib.credential import Credential, \
+from kallisticore.lib.credential import Credential, CredentialCache, \
     EnvironmentUserNamePasswordCredential
 
 
@@ -80,3 +81,134 @@ class TestEnvironmentUserNamePasswordCredential(unittest.TestCase):
 
         self.assertEqual(self.username, self.credentials.username)
         self.assertEqual(self.password, self.credentials.password)
+
+
+class TestCredentialCache(unittest.TestCase):
+    CRED_CLS_MAP = {
+        'ENV_VAR_USERNAME_PASSWORD': 'kallisticore.lib.credential.'
+                                     'EnvironmentUserNamePasswordCredential',
+        'TOKEN_FILE': 'kallisticore.lib.credential.TokenFileCredential'}
+    MONOTONIC = 'kallisticore.lib.credential.time.monotonic'
+
+    def setUp(self):
+        CredentialCache().clear()
+        self.credential_dict = {'type': 'ENV_VAR_USERNAME_PASSWORD',
+                                'username_key': 'CACHE_USERNAME',
+                                'password_key': 'CACHE_PASSWORD'}
+        self.token_file = tempfile.NamedTemporaryFile('w', delete=False)
+        self.token_file.write('token-1')
+        self.token_file.close()
+
+    def tearDown(self):
+        CredentialCache().clear()
+        os.remove(self.token_file.name)
+
+    def test_build_returns_shared_credential(self):
+        credential = Credential.build(self.CRED_CLS_MAP, self.credential_dict)
+
+        self.assertIs(credential,
+                      Credential.build(self.CRED_CLS_MAP,
+                                       dict(self.credential_dict)))
+        self.assertIsNot(credential, Credential.build(
+            self.CRED_CLS_MAP, dict(self.credential_dict,
+                                    username_key='OTHER_USERNAME')))
+
+    def test_invalidate_drops_shared_credential(self):
+        credential = Credential.build(self.CRED_CLS_MAP, self.credential_dict)
+
+        CredentialCache().invalidate(EnvironmentUserNamePasswordCredential,
+                                     username_key='CACHE_USERNAME',
+                                     password_key='CACHE_PASSWORD')
+
+        self.assertIsNot(credential, Credential.build(self.CRED_CLS_MAP,
+                                                      self.credential_dict))
+
+    def test_least_recently_used_credential_is_dropped(self):
+        cache = CredentialCache()
+        credentials = [Credential.build(self.CRED_CLS_MAP, dict(
+            self.credential_dict, username_key='USERNAME_{}'.format(index)))
+            for index in range(2)]
+
+        with patch.object(cache, 'max_size', 2):
+            # the first credential is used again
+            Credential.build(self.CRED_CLS_MAP, dict(
+                self.credential_dict, username_key='USERNAME_0'))
+            Credential.build(self.CRED_CLS_MAP, dict(
+                self.credential_dict, username_key='USERNAME_2'))
+
+            self.assertIs(credentials[0], Credential.build(
+                self.CRED_CLS_MAP, dict(self.credential_dict,
+                                        username_key='USERNAME_0')))
+            self.assertIsNot(credentials[1], Credential.build(
+                self.CRED_CLS_MAP, dict(self.credential_dict,
+                                        username_key='USERNAME_1')))
+
+    def test_load_credential_not_initialized_by_credential(self):
+        class CustomCredential(Credential):
+            def __init__(self):
+                self.fetched = 0
+
+            def fetch(self):
+                self.fetched += 1
+
+        credential = CustomCredential()
+        credential.load()
+        credential.load()
+
+        self.assertEqual(1, credential.fetched)
+
+    def test_load_fetches_once_within_ttl(self):
+        credential = Credential.build(self.CRED_CLS_MAP, self.credential_dict)
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-1',
+                                     'CACHE_PASSWORD': 'pw'}), \
+                patch(self.MONOTONIC, return_value=1000):
+            credential.load()
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-2',
+                                     'CACHE_PASSWORD': 'pw'}), \
+                patch(self.MONOTONIC,
+                      return_value=1000 + CredentialCache().ttl - 1):
+            self.assertEqual('user-1', credential.load().username)
+
+    def test_load_fetches_again_after_ttl(self):
+        credential = Credential.build(self.CRED_CLS_MAP, self.credential_dict)
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-1',
+                                     'CACHE_PASSWORD': 'pw'}), \
+                patch(self.MONOTONIC, return_value=1000):
+            credential.load()
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-2',
+                                     'CACHE_PASSWORD': 'pw'}), \
+                patch(self.MONOTONIC,
+                      return_value=1000 + CredentialCache().ttl):
+            self.assertEqual('user-2', credential.load().username)
+
+    def test_invalidated_credential_is_fetched_again(self):
+        credential = Credential.build(self.CRED_CLS_MAP, self.credential_dict)
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-1',
+                                     'CACHE_PASSWORD': 'pw'}):
+            credential.load()
+        credential.invalidate()
+        with patch.dict(os.environ, {'CACHE_USERNAME': 'user-2',
+                                     'CACHE_PASSWORD': 'pw'}):
+            self.assertEqual('user-2', credential.load().username)
+
+    def test_token_file_is_read_again_when_modified(self):
+        credential = Credential.build(self.CRED_CLS_MAP,
+                                      {'type': 'TOKEN_FILE',
+                                       'token_path': self.token_file.name})
+        self.assertEqual('token-1', credential.load().token)
+
+        with open(self.token_file.name, 'w') as token_file:
+            token_file.write('token-2')
+        os.utime(self.token_file.name, (0, 0))
+
+        self.assertEqual('token-2', credential.load().token)
+
+    def test_token_file_is_read_once_when_not_modified(self):
+        credential = Credential.build(self.CRED_CLS_MAP,
+                                      {'type': 'TOKEN_FILE',
+                                       'token_path': self.token_file.name})
+        with patch('builtins.open', mock_open(read_data='token-1')) as m_open:
+            credential.load()
+            credential.load()
+
+        m_open.assert_called_once_with(self.token_file.name)
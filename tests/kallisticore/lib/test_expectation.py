@@ -1,10 +1,11 @@
+import re
 from unittest import TestCase
 from unittest.mock import patch
 
 from kallisticore.exceptions import InvalidExpectOperator, FailedExpectation, \
-    KeyNotFoundException
+    KeyNotFoundException, InvalidExpectAggregate
 from kallisticore.lib.expectation import Expectation, OperatorExpectation, \
-    RegexExpectation, ValueExtractor
+    RegexExpectation, ValueExtractor, parse_json_path, AggregateExpectation
 
 
 class TestExpectation(TestCase):
@@ -17,6 +18,19 @@ class TestExpectation(TestCase):
         expect_spec = {"operator": "regex", "status_text": "/Hello/"}
         self.assertIsInstance(Expectation.build(expect_spec), RegexExpectation)
 
+    def test_build_aggregate_expectation(self):
+        expect_spec = {"operator": "lt", "aggregate": "p95", "values": 0.5}
+        self.assertIsInstance(Expectation.build(expect_spec),
+                              AggregateExpectation)
+
+    def test_build_throws_an_error_when_aggregate_operator_is_regex(self):
+        expect_spec = {"operator": "regex", "aggregate": "max",
+                       "values": "^1"}
+        with self.assertRaises(InvalidExpectAggregate) as error:
+            Expectation.build(expect_spec)
+        self.assertEqual("Invalid aggregate: max with operator regex",
+                         error.exception.message)
+
     def test_build_throws_an_error_when_operator_is_invalid(self):
         expect_spec = {"operator": "invalid-operator",
                        "status_text": "/Hello/"}
@@ -183,6 +197,109 @@ class TestArithmeticExpectation(TestCase):
         self.assertEqual("Expectation failed(200 == 500)",
                          str(error.exception))
 
+    def test_does_not_evaluate_expressions(self):
+        expectation = Expectation.build({"operator": "eq", "value": 2})
+        with patch('builtins.eval') as mock_eval:
+            expectation.execute(2)
+        mock_eval.assert_not_called()
+
+    def test_json_path_is_parsed_once(self):
+        expectation = Expectation.build({"operator": "eq",
+                                         "status_code": 200})
+        with patch('kallisticore.lib.expectation.parse_json_path',
+                   wraps=parse_json_path) as mock_parse:
+            for _ in range(3):
+                expectation.execute({'status_code': 200})
+        mock_parse.assert_called_once_with('$.status_code')
+
+
+class TestAggregateExpectation(TestCase):
+    def setUp(self):
+        self.result = {"data": {"result": [
+            {"values": [[1, "0.1"], [2, "0.2"], [3, "0.3"]]},
+            {"values": [[1, "0.4"], [2, "1.0"]]}]}}
+        self.key = "data.result[*].values[*][1]"
+
+    def test_passes_for_aggregates(self):
+        test_cases = [
+            {"operator": "eq", "aggregate": "count", self.key: 5},
+            {"operator": "eq", "aggregate": "sum", self.key: 2.0},
+            {"operator": "eq", "aggregate": "mean", self.key: 0.4},
+            {"operator": "eq", "aggregate": "min", self.key: 0.1},
+            {"operator": "eq", "aggregate": "max", self.key: 1.0},
+            {"operator": "eq", "aggregate": "p50", self.key: 0.3},
+            {"operator": "gt", "aggregate": "p99.9", self.key: 0.99},
+            {"operator": "eq", "aggregate": "count_where",
+             "where": {"ge": 0.3}, self.key: 3},
+            {"operator": "lt", "aggregate": "all", self.key: 1.5},
+            {"operator": "ge", "aggregate": "any", self.key: 1},
+        ]
+        for expect_spec in test_cases:
+            with self.subTest(expect_spec=expect_spec):
+                expectation = Expectation.build(expect_spec)
+                self.assertIsNone(expectation.execute(self.result))
+
+    def test_passes_for_list_of_values(self):
+        expectation = Expectation.build(
+            {"operator": "lt", "aggregate": "max", "latencies": 0.5})
+        self.assertIsNone(
+            expectation.execute({"latencies": [0.1, 0.2, 0.3]}))
+
+    def test_raise_exception_when_expectation_fails(self):
+        expectation = Expectation.build(
+            {"operator": "lt", "aggregate": "max", self.key: 0.5})
+        with self.assertRaises(FailedExpectation) as error:
+            expectation.execute(self.result)
+        self.assertEqual(
+            "Expectation failed(max of {} 1.0 < 0.5)".format(self.key),
+            error.exception.message)
+
+    def test_raise_exception_when_not_all_values_match(self):
+        expectation = Expectation.build(
+            {"operator": "lt", "aggregate": "all", "latencies": 0.5})
+        with self.assertRaises(FailedExpectation) as error:
+            expectation.execute({"latencies": [0.1, 0.6]})
+        self.assertEqual("Expectation failed(all of [0.1, 0.6] < 0.5)",
+                         error.exception.message)
+
+    def test_raise_exception_for_non_numeric_values(self):
+        expectation = Expectation.build(
+            {"operator": "lt", "aggregate": "mean", "latencies": 0.5})
+        with self.assertRaises(FailedExpectation):
+            expectation.execute({"latencies": [0.1, "slow"]})
+
+    def test_raise_exception_when_there_are_no_values(self):
+        expectation = Expectation.build(
+            {"operator": "lt", "aggregate": "mean", "latencies": 0.5})
+        with self.assertRaises(FailedExpectation) as error:
+            expectation.execute({"latencies": []})
+        self.assertEqual("Expectation failed(No values of latencies to "
+                         "aggregate)", error.exception.message)
+
+    def test_build_throws_an_error_when_aggregate_is_invalid(self):
+        for aggregate, where in [("median", None), ("p101", None),
+                                 ("count_where", None),
+                                 ("count_where", {"regex": "x"})]:
+            with self.subTest(aggregate=aggregate, where=where):
+                with self.assertRaises(InvalidExpectAggregate):
+                    Expectation.build({"operator": "lt",
+                                       "aggregate": aggregate,
+                                       "where": where, "latencies": 0.5})
+
+    def test_build_throws_an_error_when_values_are_not_numeric(self):
+        for data, message in [
+                ({"aggregate": "p95", "latencies": "fast"},
+                 "Invalid aggregate: p95 of latencies requires a numeric "
+                 "value: 'fast'"),
+                ({"aggregate": "count_where", "where": {"gt": None},
+                  "latencies": 3},
+                 "Invalid aggregate: count_where with where gt requires a "
+                 "numeric value: None")]:
+            with self.subTest(data=data):
+                with self.assertRaises(InvalidExpectAggregate) as error:
+                    Expectation.build(dict(data, operator="lt"))
+                self.assertEqual(message, error.exception.message)
+
 
 class TestRegexExpectation(TestCase):
     def setUp(self):
@@ -204,6 +321,15 @@ class TestRegexExpectation(TestCase):
                          "(Regex pattern UP does not match DOWN.)",
                          str(error.exception))
 
+    def test_pattern_is_compiled_once(self):
+        with patch('kallisticore.lib.expectation.re.compile',
+                   wraps=re.compile) as mock_compile:
+            expectation = RegexExpectation.build(
+                {"operator": "regex", "response_text": "^U"})
+            for _ in range(3):
+                expectation.execute({'response_text': 'UP'})
+        mock_compile.assert_called_once_with('^U')
+
 
 class TestValueExtractor(TestCase):
     def test_initialize(self):
@@ -289,3 +415,24 @@ class TestValueExtractor(TestCase):
 
         self.assertEqual("The key path [3] is not found in [1, 2, 3]",
                          error.exception.message)
+
+    def test_extract_all_values_matched(self):
+        input_data = {"items": [{"value": 1}, {"value": 2}]}
+        self.assertEqual([1, 2], ValueExtractor(
+            input_data, "items[*].value").extract_all())
+
+    def test_extract_all_values_of_matched_list(self):
+        input_data = {"items": [1, 2]}
+        self.assertEqual([1, 2],
+                         ValueExtractor(input_data, "items").extract_all())
+
+    def test_parsed_json_paths_are_kept(self):
+        json_paths = {}
+        ValueExtractor({'a': {'b': 1}}, 'a.b', json_paths).extract()
+        ValueExtractor([{'b': 1}], '[0].b', json_paths).extract()
+
+        self.assertEqual({'$.{}': parse_json_path('$.a.b'),
+                          '${}': parse_json_path('$[0].b')}, json_paths)
+
+    def test_parsed_json_paths_are_shared(self):
+        self.assertIs(parse_json_path('$.a.b'), parse_json_path('$.a.b'))
@@ -0,0 +1,116 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer, \
+    ThreadingHTTPServer
+from unittest import TestCase, mock
+
+from kallisticore.lib.http_session_pool import HttpSessionPool
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        if self.path.endswith('?redirect'):
+            self.send_response(302)
+            self.send_header('Location', self.server.redirect_url)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = json.dumps({'status': 'UP',
+                           'cookie': self.headers.get('Cookie', '')}).encode()
+        self.send_response(200)
+        if self.path.endswith('?set-cookie'):
+            self.send_header('Set-Cookie', 'session=trial-1')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpSessionPool(TestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        threading.Thread(target=self.server.serve_forever,
+                         kwargs={'poll_interval': 0.01}, daemon=True).start()
+        self.url = 'http://127.0.0.1:{}/health'.format(
+            self.server.server_port)
+        self.host = 'http://127.0.0.1:{}'.format(self.server.server_port)
+        self.pool = HttpSessionPool()
+        self.pool.close()
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_is_a_singleton(self):
+        self.assertIs(self.pool, HttpSessionPool())
+
+    def test_connections_are_reused(self):
+        for _ in range(3):
+            response = self.pool.request('GET', self.url)
+            self.assertEqual(200, response.status_code)
+
+        self.assertEqual({self.host: {'requests': 3, 'connections': 1,
+                                      'reused': 2}},
+                         self.pool.get_stats())
+
+    def test_one_adapter_per_host(self):
+        adapter = self.pool.get_adapter(self.url)
+
+        self.assertIs(adapter, self.pool.get_adapter(self.host + '/other'))
+        self.assertIsNot(adapter,
+                         self.pool.get_adapter('https://app.test/health'))
+
+    def test_sessions_share_the_adapter_of_the_host(self):
+        session = self.pool.get_session(self.url)
+
+        self.assertIsNot(session, self.pool.get_session(self.url))
+        self.assertIs(self.pool.get_adapter(self.url),
+                      session.get_adapter(self.url))
+
+    def test_cookies_are_not_shared(self):
+        self.pool.request('GET', self.url + '?set-cookie')
+
+        response = self.pool.request('GET', self.url)
+
+        self.assertEqual('', response.json()['cookie'])
+
+    def test_redirect_to_other_host_is_followed(self):
+        # the kept-alive connections are served by threads of their own
+        other_server = ThreadingHTTPServer(('127.0.0.1', 0),
+                                           _KeepAliveHandler)
+        other_server.redirect_url = self.url
+        threading.Thread(target=other_server.serve_forever,
+                         kwargs={'poll_interval': 0.01}, daemon=True).start()
+        other_host = 'http://127.0.0.1:{}'.format(other_server.server_port)
+        try:
+            response = self.pool.request('GET',
+                                         other_host + '/health?redirect')
+        finally:
+            other_server.shutdown()
+            other_server.server_close()
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('UP', response.json()['status'])
+        self.assertEqual({self.host, other_host}, set(self.pool.get_stats()))
+
+    def test_request_uses_configured_timeout(self):
+        with mock.patch('requests.Session.request') as request, \
+                mock.patch.object(self.pool, 'timeout', (1, 2)):
+            self.pool.request('GET', self.url, headers={})
+
+        request.assert_called_once_with('GET', self.url, headers={},
+                                        timeout=(1, 2))
+
+    def test_close_discards_adapters(self):
+        adapter = self.pool.get_adapter(self.url)
+
+        self.pool.close()
+
+        self.assertEqual({}, self.pool.get_stats())
+        self.assertIsNot(adapter, self.pool.get_adapter(self.url))
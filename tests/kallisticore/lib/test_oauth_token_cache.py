@@ -0,0 +1,149 @@
+import threading
+from unittest import TestCase, mock
+
+from kallisticore.lib.oauth_token_cache import OAuthTokenCache
+
+
+class TestOAuthTokenCache(TestCase):
+    MONOTONIC = 'kallisticore.lib.oauth_token_cache.time.monotonic'
+    KEY = ('https://auth.test/token', 'client-id', 'ENV_VAR', 'user', None)
+
+    def setUp(self):
+        self.cache = OAuthTokenCache()
+        self.cache.clear()
+        self.refresh_ahead_patch = mock.patch.object(self.cache,
+                                                     'refresh_ahead', 60)
+        self.refresh_ahead_patch.start()
+        self.fetch_token = mock.Mock(side_effect=[('token-1', 3600),
+                                                  ('token-2', 3600)])
+
+    def tearDown(self):
+        self.refresh_ahead_patch.stop()
+        self.cache.clear()
+
+    def test_is_a_singleton(self):
+        self.assertIs(self.cache, OAuthTokenCache())
+
+    def test_token_is_reused_until_refresh(self):
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self.assertEqual('token-1',
+                             self.cache.get_token(self.KEY, self.fetch_token))
+        with mock.patch(self.MONOTONIC, return_value=1000 + 3539):
+            self.assertEqual('token-1',
+                             self.cache.get_token(self.KEY, self.fetch_token))
+
+        self.fetch_token.assert_called_once_with()
+
+    def test_token_is_refreshed_ahead_of_expiry(self):
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self.cache.get_token(self.KEY, self.fetch_token)
+        with mock.patch(self.MONOTONIC, return_value=1000 + 3540):
+            self.assertEqual('token-2',
+                             self.cache.get_token(self.KEY, self.fetch_token))
+
+        self.assertEqual(2, self.fetch_token.call_count)
+
+    def test_tokens_are_cached_by_key(self):
+        other_key = self.KEY[:-1] + ('resource',)
+
+        self.assertEqual('token-1',
+                         self.cache.get_token(self.KEY, self.fetch_token))
+        self.assertEqual('token-2',
+                         self.cache.get_token(other_key, self.fetch_token))
+
+    def test_token_without_expiry_is_not_cached(self):
+        fetch_token = mock.Mock(side_effect=[('token-1', None),
+                                             ('token-2', None)])
+
+        self.assertEqual('token-1', self.cache.get_token(self.KEY,
+                                                         fetch_token))
+        self.assertEqual('token-2', self.cache.get_token(self.KEY,
+                                                         fetch_token))
+
+    def test_invalidate(self):
+        self.cache.get_token(self.KEY, self.fetch_token)
+
+        self.cache.invalidate(self.KEY)
+
+        self.assertEqual('token-2',
+                         self.cache.get_token(self.KEY, self.fetch_token))
+
+    def test_fetch_error_is_raised_and_not_cached(self):
+        fetch_token = mock.Mock(side_effect=[Exception('auth failed'),
+                                             ('token-1', 3600)])
+
+        with self.assertRaises(Exception):
+            self.cache.get_token(self.KEY, fetch_token)
+        self.assertEqual('token-1', self.cache.get_token(self.KEY,
+                                                         fetch_token))
+
+    def test_concurrent_fetches_are_coalesced(self):
+        fetching = threading.Event()
+        release = threading.Event()
+
+        def fetch_token():
+            fetching.set()
+            release.wait(5)
+            return 'token-1', 3600
+
+        fetch_token = mock.Mock(side_effect=fetch_token)
+        tokens = []
+        threads = [threading.Thread(
+            target=lambda: tokens.append(
+                self.cache.get_token(self.KEY, fetch_token)))
+            for _ in range(4)]
+        threads[0].start()
+        fetching.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        fetch_token.assert_called_once_with()
+        self.assertEqual(['token-1'] * 4, tokens)
+
+    def test_valid_token_is_returned_while_refreshing(self):
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self.cache.get_token(self.KEY, self.fetch_token)
+        key_lock = self.cache._get_key_lock(self.KEY)
+
+        with key_lock, mock.patch(self.MONOTONIC, return_value=1000 + 3550):
+            self.assertEqual('token-1',
+                             self.cache.get_token(self.KEY, self.fetch_token))
+
+        self.fetch_token.assert_called_once_with()
+
+    def test_valid_token_is_returned_when_refresh_fails(self):
+        fetch_token = mock.Mock(side_effect=[('token-1', 3600),
+                                             Exception('auth failed')])
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self.cache.get_token(self.KEY, fetch_token)
+
+        with mock.patch(self.MONOTONIC, return_value=1000 + 3550), \
+                mock.patch.object(OAuthTokenCache.logger, 'warning') as \
+                mock_log_warning:
+            self.assertEqual('token-1',
+                             self.cache.get_token(self.KEY, fetch_token))
+
+        self.assertEqual(2, fetch_token.call_count)
+        mock_log_warning.assert_called_once()
+
+    def test_refresh_error_of_expired_token_is_raised(self):
+        fetch_token = mock.Mock(side_effect=[('token-1', 3600),
+                                             Exception('auth failed')])
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self.cache.get_token(self.KEY, fetch_token)
+
+        with mock.patch(self.MONOTONIC, return_value=1000 + 3600), \
+                self.assertRaises(Exception):
+            self.cache.get_token(self.KEY, fetch_token)
+
+    def test_invalidate_and_clear_drop_key_locks(self):
+        self.cache.get_token(self.KEY, self.fetch_token)
+        self.cache.invalidate(self.KEY)
+        self.assertNotIn(self.KEY, self.cache._locks)
+
+        self.cache.get_token(self.KEY, self.fetch_token)
+        self.cache.clear()
+        self.assertEqual({}, self.cache._locks)
@@ -0,0 +1,151 @@
+import json
+from unittest import mock
+
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from kallisticore.lib.trial_event_stream import TrialEventStream
+from kallisticore.models import Experiment, Trial, TrialRecord
+from kallisticore.models.trial import TrialStatus
+from kallisticore.signals import execute_plan_for_trial
+
+
+def parse_events(chunks):
+    events = []
+    for chunk in chunks:
+        fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n')
+                      if not line.startswith(':'))
+        if 'event' in fields:
+            fields['data'] = json.loads(fields['data'])
+            events.append(fields)
+    return events
+
+
+class TestTrialEventStream(TestCase):
+    def setUp(self):
+        post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        experiment = Experiment.create(name='test-experiment', steps=[])
+        self.trial = Trial.create(experiment=experiment)
+
+    def tearDown(self):
+        post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def _add_record(self, trial_stage, step_index=None):
+        return TrialRecord.objects.create(
+            trial=self.trial, trial_stage=trial_stage,
+            record={'logs': [trial_stage]}, step_index=step_index)
+
+    def test_streams_records_and_status_of_completed_trial(self):
+        step_record = self._add_record('steps', 0)
+        result_record = self._add_record('result')
+        self.trial.update_status(TrialStatus.SUCCEEDED)
+
+        chunks = list(TrialEventStream(self.trial.id, poll_interval=0.01))
+
+        self.assertEqual('retry: 10\n\n', chunks[0])
+        events = parse_events(chunks)
+        self.assertEqual(['record', 'record', 'status', 'end'],
+                         [event['event'] for event in events])
+        self.assertEqual(str(step_record.id), events[0]['id'])
+        self.assertEqual({'trial_stage': 'steps', 'step_index': 0,
+                          'step_name': None, 'status': None,
+                          'started_at': None, 'completed_at': None,
+                          'record': {'logs': ['steps']}}, events[0]['data'])
+        self.assertEqual(str(result_record.id), events[1]['id'])
+        self.assertEqual('Succeeded', events[2]['data']['status'])
+        self.assertNotIn('id', events[2])
+
+    def test_resumes_after_last_event_id(self):
+        step_record = self._add_record('steps', 0)
+        result_record = self._add_record('result')
+        self.trial.update_status(TrialStatus.FAILED)
+
+        events = parse_events(TrialEventStream(
+            self.trial.id, last_event_id=step_record.id, poll_interval=0.01))
+
+        self.assertEqual([str(result_record.id)],
+                         [event['id'] for event in events if 'id' in event])
+
+    def test_polls_running_trial(self):
+        self.trial.update_status(TrialStatus.IN_PROGRESS)
+
+        def complete_trial(_):
+            if not TrialRecord.objects.exists():
+                self._add_record('result')
+                self.trial.update_status(TrialStatus.SUCCEEDED)
+
+        with mock.patch('time.sleep', side_effect=complete_trial):
+            events = parse_events(TrialEventStream(self.trial.id,
+                                                   poll_interval=0.01))
+
+        self.assertEqual(['status', 'record', 'status', 'end'],
+                         [event['event'] for event in events])
+        self.assertEqual(['In Progress', 'Succeeded'],
+                         [event['data']['status'] for event in events
+                          if event['event'] == 'status'])
+
+    def test_streams_records_column(self):
+        self.trial.records = {
+            'steps': [{'step_name': 'step-1', 'logs': ['step-1']},
+                      {'step_name': 'step-2', 'logs': ['step-2']}],
+            'result': [{'logs': ['result']}]}
+        self.trial.save()
+        self.trial.update_status(TrialStatus.SUCCEEDED)
+
+        events = parse_events(TrialEventStream(
+            self.trial.id, last_event_id=1, poll_interval=0.01))
+
+        self.assertEqual(['record', 'record', 'status', 'end'],
+                         [event['event'] for event in events])
+        self.assertEqual(['2', '3'], [events[0]['id'], events[1]['id']])
+        self.assertEqual({'trial_stage': 'steps', 'step_index': None,
+                          'step_name': 'step-2', 'status': None,
+                          'started_at': None, 'completed_at': None,
+                          'record': {'step_name': 'step-2',
+                                     'logs': ['step-2']}}, events[0]['data'])
+        self.assertEqual('result', events[1]['data']['trial_stage'])
+
+    def test_polls_records_column_of_running_trial(self):
+        self.trial.records = {'steps': [{'logs': ['step-1']}]}
+        self.trial.save()
+        self.trial.update_status(TrialStatus.IN_PROGRESS)
+
+        def complete_trial(_):
+            self.trial.records['result'] = [{'logs': ['result']}]
+            self.trial.save()
+            self.trial.update_status(TrialStatus.SUCCEEDED)
+
+        with mock.patch('time.sleep', side_effect=complete_trial):
+            events = parse_events(TrialEventStream(self.trial.id,
+                                                   poll_interval=0.01))
+
+        self.assertEqual([('record', '1'), ('status', None),
+                          ('record', '2'), ('status', None), ('end', None)],
+                         [(event['event'], event.get('id'))
+                          for event in events])
+
+    def test_sends_keep_alive_and_closes_after_timeout(self):
+        with mock.patch('time.sleep'), \
+                mock.patch('time.monotonic', side_effect=[0, 0, 0, 20, 40]):
+            chunks = list(TrialEventStream(
+                self.trial.id, poll_interval=0.01, heartbeat_interval=15,
+                timeout=30))
+
+        self.assertIn(': keep-alive\n\n', chunks)
+        self.assertEqual(['status'],
+                         [event['event'] for event in parse_events(chunks)])
+
+    def test_ends_when_trial_does_not_exist(self):
+        events = parse_events(TrialEventStream(
+            '00000000-0000-0000-0000-000000000000', poll_interval=0.01))
+
+        self.assertEqual(['end'], [event['event'] for event in events])
+
+    def test_close_calls_on_close_once(self):
+        on_close = mock.Mock()
+        stream = TrialEventStream(self.trial.id, on_close=on_close)
+
+        stream.close()
+        stream.close()
+
+        on_close.assert_called_once_with()
@@ -1,3 +1,5 @@
+import threading
+import time
 import uuid
 from unittest import mock
 from unittest.mock import Mock, ANY, call
@@ -8,6 +10,7 @@ from django.utils import timezone
 from kallisticore import signals
 from kallisticore.lib.observe.observer import Observer
 from kallisticore.lib.trial_executor import TrialExecutor, execute_trial
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
 from kallisticore.models import Experiment
 from kallisticore.models.step import Step
 from kallisticore.models.trial import Trial, TrialStatus
@@ -176,17 +179,19 @@ class TestTrialRunScenarioStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 self.populated_step_get_app_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_app_by_name['where'], 0),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(app_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
             call('steps', 'Get org by name',
-                 self.populated_step_get_org_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_org_by_name['where'], 1),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(org_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
         ])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
@@ -230,16 +235,18 @@ class TestTrialRunScenarioStepsSucceeded(TestTrialExecutor):
             trial_executor.run()
 
         mock_step_rec_cls.assert_has_calls([
-            call('steps', 'Get app by name', step_get_app_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+            call('steps', 'Get app by name', step_get_app_by_name['where'], 0),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(app_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
-            call('steps', 'Get org by name', step_get_org_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+            call().complete('Succeeded'),
+            call('steps', 'Get org by name', step_get_org_by_name['where'], 1),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(org_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
         ])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
@@ -273,17 +280,19 @@ class TestTrialRunScenarioStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 self.populated_step_get_app_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_app_by_name['where'], 0),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(app_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
             call('steps', 'Get org by name',
-                 self.populated_step_get_org_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_org_by_name['where'], 1),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(org_cmd_mock.return_value)),
-            call().append('INFO', 'Completed.')])
+            call().append('INFO', 'Completed.'),
+            call().complete('Succeeded')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('INFO', 'Trial Completed.')])
@@ -314,17 +323,19 @@ class TestTrialRunScenarioStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 self.populated_step_get_app_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_app_by_name['where'], 0),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(app_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
             call('steps', 'Get org by name',
-                 self.populated_step_get_org_by_name['where']),
-            call().append('INFO', 'Starting command execution.'),
+                 self.populated_step_get_org_by_name['where'], 1),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(org_cmd_mock.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
         ])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
@@ -369,14 +380,16 @@ class TestTrialRunScenarioStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url},
+                 0),
+            call().start(),
             call().append('INFO',
                           "Result: {}.".format(app_cmd_mock.return_value)),
             call().append('INFO',
                           "Succeeded. All expectations passed: {}.".format(
                               expect_spec)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
         ])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
@@ -477,11 +490,13 @@ class TestTrialRunScenarioStepsFailed(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url},
+                 0),
+            call().start(),
             call().append('ERROR',
                           "Step failed. Type: Exception. "
-                          "Error: api function error.")])
+                          "Error: api function error."),
+            call().complete('Failed')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('ERROR',
@@ -523,11 +538,13 @@ class TestTrialRunScenarioStepsFailed(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url},
+                 0),
+            call().start(),
             call().append('ERROR',
                           "Step failed. Type: Exception. "
-                          "Error: api function error.")])
+                          "Error: api function error."),
+            call().complete('Failed')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('ERROR',
@@ -592,12 +609,14 @@ class TestTrialRunScenarioStepsFailed(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Get app by name',
-                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'app_name': self.app_name, 'cf_api_url': self.cf_api_url},
+                 0),
+            call().start(),
             call().append('ERROR',
                           "Step failed. Type: FailedExpectation. "
                           "Error: Expectation failed"
-                          "(Hello World == unexpected-app-name)")])
+                          "(Hello World == unexpected-app-name)"),
+            call().complete('Failed')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('ERROR',
@@ -646,17 +665,21 @@ class TestTrialRunScenarioPostStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('steps', 'Stop app',
-                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name},
+                 0),
+            call().start(),
             call().append('INFO',
                           'Result: {}.'.format(stop_app_action.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
             call('post_steps', 'Start app',
-                 {'cf_api_url': self.cf_api_url, 'app_name': 'hello-world'}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'cf_api_url': self.cf_api_url, 'app_name': 'hello-world'},
+                 0),
+            call().start(),
             call().append('INFO',
                           'Result: {}.'.format(start_app_action.return_value)),
-            call().append('INFO', 'Completed.')])
+            call().append('INFO', 'Completed.'),
+            call().complete('Succeeded')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('INFO', 'Trial Completed.')])
@@ -737,17 +760,21 @@ class TestTrialRunScenarioPreStepsSucceeded(TestTrialExecutor):
 
         mock_step_rec_cls.assert_has_calls([
             call('pre_steps', 'Stop app',
-                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name},
+                 0),
+            call().start(),
             call().append('INFO',
                           'Result: {}.'.format(stop_app_action.return_value)),
             call().append('INFO', 'Completed.'),
+            call().complete('Succeeded'),
             call('steps', 'Start app',
-                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name}),
-            call().append('INFO', 'Starting command execution.'),
+                 {'cf_api_url': self.cf_api_url, 'app_name': self.app_name},
+                 0),
+            call().start(),
             call().append('INFO',
                           'Result: {}.'.format(start_app_action.return_value)),
-            call().append('INFO', 'Completed.')])
+            call().append('INFO', 'Completed.'),
+            call().complete('Succeeded')])
         mock_log_rec_cls.assert_has_calls([
             call('result'),
             call().append('INFO', 'Trial Completed.')])
@@ -866,6 +893,141 @@ class TestTrialRunOnStopped(TestTrialExecutor):
 
         self.assertEqual(self._trial.status, TrialStatus.SUCCEEDED.value)
 
+    def test_steps_not_run_after_stop_initiated(self):
+        with mock.patch(self.COMMIT), \
+            mock.patch(self.CF_GET_APP) as get_app_action, \
+            mock.patch(self.CF_STOP_APP) as stop_app_action, \
+                TrialExecutor(self._trial, self.module_map, {}) \
+                as trial_executor:
+            get_app_action.side_effect = lambda *args, **kwargs: \
+                Trial.objects.get(id=self._trial.id).update_status(
+                    TrialStatus.STOP_INITIATED)
+            trial_executor.run()
+
+        get_app_action.assert_called_once()
+        stop_app_action.assert_not_called()
+        self.assertEqual(self._trial.status, TrialStatus.STOPPED.value)
+        self.assertIsNotNone(self._trial.completed_at)
+
+    def test_stop_initiated_before_run_is_picked_up(self):
+        Trial.objects.filter(id=self._trial.id).update(
+            status=TrialStatus.STOP_INITIATED.value)
+
+        with mock.patch(self.COMMIT), \
+            mock.patch(self.CF_GET_APP) as get_app_action, \
+                TrialExecutor(self._trial, self.module_map, {}) \
+                as trial_executor:
+            trial_executor.run()
+
+        get_app_action.assert_not_called()
+        self.assertEqual(self._trial.status, TrialStatus.STOPPED.value)
+
+    def test_wait_interrupted_by_stop(self):
+        trial = create_experiment_and_trial(
+            {}, [{'do': 'cm.wait', 'where': {'time_in_seconds': 30}}],
+            post_steps=[{'do': 'cm.wait', 'where': {'time_in_seconds': 0}}])
+        stop_timer = threading.Timer(
+            0.1, lambda: TrialStopSignals().signal(trial.id))
+
+        start = time.monotonic()
+        with mock.patch(self.COMMIT), \
+                TrialExecutor(trial, {'cm': 'kallisticore.modules.common'},
+                              {}) as trial_executor:
+            stop_timer.start()
+            trial_executor.run()
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(trial.status, TrialStatus.STOPPED.value)
+
+
+class TestTrialRunConcurrentSteps(TestTrialExecutor):
+    EG_INCREMENT = 'kallisticore.modules.examples.sample_module1.increment'
+    EG_SUBTRACT = 'kallisticore.modules.examples.sample_module1.subtract'
+
+    def setUp(self):
+        super(TestTrialRunConcurrentSteps, self).setUp()
+        self.eg_module_map = {
+            'eg': 'kallisticore.modules.examples.sample_module1'}
+        self.steps = [
+            {'id': 'first', 'depends_on': [],
+             'do': 'eg.increment', 'where': {'a': 1}},
+            {'id': 'second', 'depends_on': [],
+             'do': 'eg.increment', 'where': {'a': 2}},
+            {'id': 'last', 'depends_on': ['first', 'second'],
+             'do': 'eg.subtract', 'where': {'a': 2, 'b': 1}}]
+        self.trial = create_experiment_and_trial({}, self.steps)
+
+    def test_independent_steps_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def increment(a):
+            barrier.wait()
+            return a + 1
+
+        with mock.patch(self.COMMIT) as mock_rec_commit, \
+            mock.patch(self.EG_INCREMENT, side_effect=increment), \
+            mock.patch(self.EG_SUBTRACT, return_value=1) as subtract, \
+                TrialExecutor(self.trial, self.eg_module_map, {},
+                              max_workers=2) as trial_executor:
+            trial_executor.run()
+
+        subtract.assert_called_once_with(a=2, b=1)
+        self.assertEqual(4, mock_rec_commit.call_count)
+        self.assertEqual(self.trial.status, TrialStatus.SUCCEEDED.value)
+
+    def test_dependant_steps_not_run_when_step_fails(self):
+        with mock.patch(self.LOG_REC) as mock_log_rec_cls, \
+            mock.patch(self.COMMIT), \
+            mock.patch(self.EG_INCREMENT,
+                       side_effect=Exception("increment error")), \
+            mock.patch(self.EG_SUBTRACT) as subtract, \
+                TrialExecutor(self.trial, self.eg_module_map, {},
+                              max_workers=2) as trial_executor:
+            mock_trial_log = mock.Mock()
+            mock_log_rec_cls.return_value = mock_trial_log
+            trial_executor.run()
+
+        subtract.assert_not_called()
+        mock_trial_log.append.assert_called_with(
+            'ERROR', 'Trial Failed. Type: StepsExecutionError. '
+                     'Error: [in: steps, reason: increment error]')
+        self.assertEqual(self.trial.status, TrialStatus.FAILED.value)
+
+    def test_steps_run_in_order_with_single_worker(self):
+        with mock.patch(self.COMMIT), \
+            mock.patch(self.EG_INCREMENT, return_value=2) as increment, \
+            mock.patch(self.EG_SUBTRACT, return_value=1) as subtract, \
+            mock.patch('threading.Thread.start') as thread_start, \
+                TrialExecutor(self.trial, self.eg_module_map, {},
+                              max_workers=1) as trial_executor:
+            trial_executor.run()
+
+        thread_start.assert_not_called()
+        increment.assert_has_calls([call(a=1), call(a=2)])
+        subtract.assert_called_once_with(a=2, b=1)
+        self.assertEqual(self.trial.status, TrialStatus.SUCCEEDED.value)
+
+    def test_steps_run_after_their_dependencies_with_single_worker(self):
+        steps = [{'id': 'last', 'depends_on': ['first'],
+                  'do': 'eg.subtract', 'where': {'a': 2, 'b': 1}},
+                 {'id': 'first', 'depends_on': [],
+                  'do': 'eg.increment', 'where': {'a': 1}}]
+        trial = create_experiment_and_trial({}, steps)
+        calls = mock.Mock()
+
+        with mock.patch(self.COMMIT), \
+            mock.patch(self.EG_INCREMENT, return_value=2) as increment, \
+            mock.patch(self.EG_SUBTRACT, return_value=1) as subtract, \
+                TrialExecutor(trial, self.eg_module_map, {},
+                              max_workers=1) as trial_executor:
+            calls.attach_mock(increment, 'increment')
+            calls.attach_mock(subtract, 'subtract')
+            trial_executor.run()
+
+        self.assertEqual([call.increment(a=1), call.subtract(a=2, b=1)],
+                         calls.mock_calls)
+        self.assertEqual(trial.status, TrialStatus.SUCCEEDED.value)
+
 
 class TestExecuteTrial(TestCase):
 
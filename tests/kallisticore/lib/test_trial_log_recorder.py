@@ -4,20 +4,28 @@ import time
 from collections import OrderedDict
 from unittest import mock
 
+from django.db.models.signals import post_save
 from django.test import TestCase
 from kallisticore.lib.trial_log_recorder import TrialLogRecord, \
     TrialStepLogRecord, TrialLogRecorder
+from kallisticore.models import Experiment, Trial, TrialRecord
+from kallisticore.signals import execute_plan_for_trial
 
 
 class TestTrialLogRecorder(TestCase):
     def setUp(self):
         self.trial_id = 'test-trial-id'
-        self.trial_log_recorder = TrialLogRecorder(self.trial_id)
+        self.trial_log_recorder = TrialLogRecorder(
+            self.trial_id, TrialLogRecorder.STORAGE_BLOB)
 
     def test_trial_log_recorder_init(self):
         self.assertEqual(self.trial_log_recorder.trial_id, self.trial_id)
         self.assertEqual(self.trial_log_recorder.trial_record, {})
 
+    def test_trial_log_recorder_default_storage(self):
+        self.assertEqual(TrialLogRecorder.STORAGE_ROWS,
+                         TrialLogRecorder(self.trial_id).storage)
+
     def test_trial_log_append(self):
         timestamp = time.time()
         timestamp_string = datetime.datetime.fromtimestamp(timestamp).strftime(
@@ -136,7 +144,8 @@ class TestTrialLogRecorder(TestCase):
             self.assertEqual(trial_log.trial_stage, trial_stage)
             mock_trial_object_filter.assert_called_once_with(pk=self.trial_id)
             mock_filter.update.assert_called_once_with(
-                records=json.dumps(self.trial_log_recorder.trial_record))
+                records=json.dumps(self.trial_log_recorder.trial_record),
+                updated_at=mock.ANY)
 
     def test_trial_log_recorder_commit_trial_step_logs(self):
         timestamp = time.time()
@@ -170,7 +179,8 @@ class TestTrialLogRecorder(TestCase):
             )]}, self.trial_log_recorder.trial_record)
             mock_trial_object_filter.assert_called_once_with(pk=self.trial_id)
             mock_filter.update.assert_called_once_with(
-                records=json.dumps(self.trial_log_recorder.trial_record))
+                records=json.dumps(self.trial_log_recorder.trial_record),
+                updated_at=mock.ANY)
 
     def test_trial_log_recorder_commit_logs_exception(self):
         with mock.patch('kallisticore.models.trial.Trial.objects.filter')\
@@ -192,3 +202,99 @@ class TestTrialLogRecorder(TestCase):
             mock_logger.assert_called_once_with(
                 "Failed to update 'records' column for trial {}, {}"
                 .format(self.trial_id, expected_exception))
+
+
+class TestTrialLogRecorderRowsStorage(TestCase):
+    def setUp(self):
+        post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        experiment = Experiment.create(name='test-experiment', steps=[])
+        self.trial = Trial.create(experiment=experiment)
+
+    def tearDown(self):
+        post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def _make_log(self, trial_stage, message):
+        trial_log = TrialLogRecord(trial_stage)
+        trial_log.append('INFO', message)
+        return trial_log
+
+    def test_commit_appends_a_row_per_record(self):
+        recorder = TrialLogRecorder(self.trial.id,
+                                    TrialLogRecorder.STORAGE_ROWS)
+
+        recorder.commit(self._make_log('steps', 'first'))
+        recorder.commit(self._make_log('steps', 'second'))
+        recorder.commit(self._make_log('result', 'done'))
+
+        rows = TrialRecord.objects.filter(trial=self.trial)
+        self.assertEqual(['steps', 'steps', 'result'],
+                         [row.trial_stage for row in rows])
+        trial = Trial.objects.get(pk=self.trial.id)
+        self.assertEqual({}, trial.records)
+        self.assertEqual(json.loads(json.dumps(recorder.trial_record)),
+                         trial.get_records())
+
+    def test_commit_writes_rows_in_batches(self):
+        recorder = TrialLogRecorder(self.trial.id,
+                                    TrialLogRecorder.STORAGE_ROWS,
+                                    batch_size=2)
+
+        recorder.commit(self._make_log('steps', 'first'))
+        self.assertEqual(0, TrialRecord.objects.count())
+        recorder.commit(self._make_log('steps', 'second'))
+        self.assertEqual(2, TrialRecord.objects.count())
+        recorder.commit(self._make_log('result', 'done'))
+        self.assertEqual(2, TrialRecord.objects.count())
+
+        recorder.flush()
+        self.assertEqual(3, TrialRecord.objects.count())
+
+    def test_commit_rows_exception(self):
+        recorder = TrialLogRecorder(self.trial.id,
+                                    TrialLogRecorder.STORAGE_ROWS)
+        with mock.patch('kallisticore.models.trial_record.TrialRecord.'
+                        'objects.bulk_create') as mock_bulk_create, \
+                mock.patch('kallisticore.lib.trial_log_recorder.'
+                           'TrialLogRecorder.logger.warning') as mock_logger:
+            mock_bulk_create.side_effect = Exception('test error')
+            recorder.commit(self._make_log('steps', 'first'))
+
+        mock_logger.assert_called_once_with(
+            "Failed to append 1 record(s) for trial {}, test error"
+            .format(self.trial.id))
+
+    def test_commit_writes_step_columns(self):
+        recorder = TrialLogRecorder(self.trial.id,
+                                    TrialLogRecorder.STORAGE_ROWS)
+        step_log = TrialStepLogRecord('steps', 'stop app', {}, step_index=2)
+        step_log.start()
+        step_log.complete('Failed')
+
+        recorder.commit(step_log)
+        recorder.commit(self._make_log('result', 'done'))
+
+        step_row, result_row = TrialRecord.objects.filter(trial=self.trial)
+        self.assertEqual(2, step_row.step_index)
+        self.assertEqual('stop app', step_row.step_name)
+        self.assertEqual('Failed', step_row.status)
+        self.assertEqual(step_log.started_at, step_row.started_at)
+        self.assertEqual(step_log.completed_at, step_row.completed_at)
+        self.assertIsNone(result_row.step_index)
+        self.assertIsNone(result_row.status)
+
+
+class TestTrialStepLogRecord(TestCase):
+    def test_start_and_complete(self):
+        step_log = TrialStepLogRecord('steps', 'stop app', {}, step_index=0)
+        self.assertEqual({'step_index': 0, 'step_name': 'stop app',
+                          'status': None, 'started_at': None,
+                          'completed_at': None}, step_log.get_columns())
+
+        step_log.start()
+        step_log.complete('Succeeded')
+
+        columns = step_log.get_columns()
+        self.assertEqual('Succeeded', columns['status'])
+        self.assertLessEqual(columns['started_at'], columns['completed_at'])
+        self.assertTrue(step_log.make()['logs'][0].endswith(
+            'Starting command execution.'))
@@ -1,64 +1,150 @@
 import datetime
 from unittest import mock
-from unittest.mock import Mock
 
 from django.test import TestCase
+from django.utils import timezone
+
+from kallisticore import signals
 from kallisticore.lib.trial_scheduler import schedule, _get_current_datetime
 from kallisticore.models import Experiment, Trial
+from kallisticore.models.trial_schedule import TrialSchedule
+from kallisticore.signals import execute_plan_for_trial
 
 
+@mock.patch('kallisticore.lib.trial_scheduler._get_current_datetime')
 class TestTrialScheduler(TestCase):
+    def setUp(self):
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self.current_datetime = datetime.datetime(
+            2019, 1, 1, 0, 0, 0, tzinfo=datetime.timezone.utc)
+        self.experiment = Experiment.create(name='one-action', steps=[])
+        self.parameters = {'mock_param': 'mock-param-value'}
+        self.ticket = {}
+        self.metadata = {'mock_metadata': 'mock-metadata-value'}
+        self.trial_schedule = TrialSchedule.create(
+            experiment=self.experiment, recurrence_pattern='* * * * *',
+            recurrence_count=2, parameters=self.parameters,
+            ticket=self.ticket, metadata=self.metadata)
+
+    def tearDown(self):
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def _set_next_run_at(self, next_run_at):
+        TrialSchedule.objects.filter(id=self.trial_schedule.id).update(
+            next_run_at=next_run_at)
+
+    def test_schedule_does_not_run_schedule_not_due(
+            self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        self._set_next_run_at(
+            self.current_datetime + datetime.timedelta(seconds=61))
+
+        schedule(60)
+
+        self.assertEqual(0, Trial.objects.count())
+
+    def test_schedule_runs_due_schedule(self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        self._set_next_run_at(
+            self.current_datetime + datetime.timedelta(seconds=60))
 
-    @mock.patch('kallisticore.lib.trial_scheduler.Trial')
-    @mock.patch('kallisticore.lib.trial_scheduler._get_current_datetime')
-    @mock.patch('kallisticore.lib.trial_scheduler.TrialSchedule')
-    def test_schedule(self, mock_trial_schedule_class, mock_current_datetime,
-                      mock_trial_class):
-        mock_experiment = Experiment()
-        mock_parameters = {'mock_param': 'mock-param-value'}
-        mock_ticket = {'mock_ticket': 'mock-ticket-value'}
-        mock_metadata = {'mock_metadata': 'mock-metadata-value'}
-        mock_trials = Mock()
-
-        mock_trial_schedule = Mock()
-        mock_trial_schedule.experiment = mock_experiment
-        mock_trial_schedule.recurrence_pattern = '* * * * *'
-        mock_trial_schedule.ticket = mock_ticket
-        mock_trial_schedule.parameters = mock_parameters
-        mock_trial_schedule.metadata = mock_metadata
-        mock_trial_schedule.trials = mock_trials
-
-        class MockQuerySet:
-            @staticmethod
-            def all():
-                return [mock_trial_schedule]
-
-        class MockTrialObjects:
-            @staticmethod
-            def get_queryset():
-                return MockQuerySet()
-
-        mock_trial_schedule_class.objects = MockTrialObjects()
-        mock_current_datetime.return_value = datetime.datetime(
-            2019, 1, 1, 0, 0, 0)
-
-        mock_trial_object = Trial()
-        mock_trial_class.create.return_value = mock_trial_object
-
-        mock_trial_schedule.should_execute_at.return_value = False
         schedule(60)
-        mock_trial_class.create.assert_not_called()
-        mock_trial_schedule.decrement_recurrence_left.assert_not_called()
-        mock_trials.add.assert_not_called()
 
-        mock_trial_schedule.should_execute_at.return_value = True
+        trial = Trial.objects.get()
+        self.assertEqual(self.experiment.id, trial.experiment_id)
+        self.assertEqual(self.parameters, trial.parameters)
+        self.assertEqual(self.ticket, trial.ticket)
+        self.assertEqual(self.metadata, trial.metadata)
+        trial_schedule = TrialSchedule.objects.get(id=self.trial_schedule.id)
+        self.assertEqual([trial], list(trial_schedule.trials.all()))
+        self.assertEqual(1, trial_schedule.recurrence_left)
+        self.assertEqual(
+            self.current_datetime + datetime.timedelta(seconds=120),
+            trial_schedule.next_run_at)
+
+    def test_schedule_runs_missed_schedule_once(self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        self._set_next_run_at(
+            self.current_datetime - datetime.timedelta(hours=1))
+
+        schedule(60)
         schedule(60)
 
-        mock_trial_class.create.assert_called_once_with(
-            experiment=mock_experiment, parameters=mock_parameters,
-            ticket=mock_ticket, metadata=mock_metadata)
-        mock_trial_schedule.decrement_recurrence_left.assert_called_once()
-        mock_trials.add.assert_called_once_with(mock_trial_object)
+        self.assertEqual(1, Trial.objects.count())
+        self.assertEqual(
+            self.current_datetime + datetime.timedelta(seconds=120),
+            TrialSchedule.objects.get(id=self.trial_schedule.id).next_run_at)
+
+    def test_schedule_stops_without_recurrence_left(
+            self, mock_current_datetime):
+        for minute in range(3):
+            mock_current_datetime.return_value = self.current_datetime + \
+                datetime.timedelta(minutes=minute)
+            if minute == 0:
+                self._set_next_run_at(
+                    self.current_datetime + datetime.timedelta(minutes=1))
+            schedule(60)
+
+        self.assertEqual(2, Trial.objects.count())
+        trial_schedule = TrialSchedule.objects.get(id=self.trial_schedule.id)
+        self.assertEqual(0, trial_schedule.recurrence_left)
+        self.assertIsNone(trial_schedule.next_run_at)
+
+    def test_schedule_fetches_due_schedules_with_one_query(
+            self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        TrialSchedule.create(experiment=self.experiment,
+                             recurrence_pattern='* * * * *')
+        TrialSchedule.objects.update(
+            next_run_at=self.current_datetime + datetime.timedelta(days=1))
+
+        with self.assertNumQueries(1):
+            self.assertEqual([], schedule(60))
+
+    def test_schedule_creates_trials_in_bulk(self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        for _ in range(49):
+            TrialSchedule.create(experiment=self.experiment,
+                                 recurrence_pattern='* * * * *')
+        TrialSchedule.objects.update(next_run_at=self.current_datetime)
+
+        with self.assertNumQueries(6):
+            trials = schedule(60)
+
+        self.assertEqual(50, len(trials))
+        self.assertEqual(50, Trial.objects.count())
+        self.assertEqual(
+            50, TrialSchedule.trials.through.objects.count())
+        self.assertEqual(
+            1, TrialSchedule.objects.get(id=self.trial_schedule.id)
+            .recurrence_left)
+
+    @mock.patch('kallisticore.signals.execute_trial')
+    def test_schedule_does_not_enqueue_trials(self, mock_execute_trial,
+                                              mock_current_datetime):
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+        mock_current_datetime.return_value = self.current_datetime
+        self._set_next_run_at(self.current_datetime)
+
+        self.assertEqual(1, len(schedule(60)))
+
+        mock_execute_trial.assert_not_called()
+
+    def test_schedule_skips_invalid_trial(self, mock_current_datetime):
+        mock_current_datetime.return_value = self.current_datetime
+        TrialSchedule.objects.filter(id=self.trial_schedule.id).update(
+            next_run_at=self.current_datetime,
+            ticket={'type': 'invalid-type', 'number': '1'})
+
+        with self.assertLogs('kallisticore.lib.trial_scheduler', 'ERROR'):
+            self.assertEqual([], schedule(60))
+
+        self.assertEqual(0, Trial.objects.count())
+        self.assertEqual(
+            self.current_datetime + datetime.timedelta(seconds=120),
+            TrialSchedule.objects.get(id=self.trial_schedule.id).next_run_at)
 
-    def test_get_current_datetime(self):
-        self.assertIsInstance(_get_current_datetime(), datetime.datetime)
+    def test_get_current_datetime(self, mock_current_datetime):
+        current_datetime = _get_current_datetime()
+        self.assertIsInstance(current_datetime, datetime.datetime)
+        self.assertTrue(timezone.is_aware(current_datetime))
@@ -0,0 +1,104 @@
+import threading
+import time
+import uuid
+from unittest import mock
+
+from django.test import TestCase
+from kallisticore import signals
+from kallisticore.exceptions import TrialStopError
+from kallisticore.lib.trial_stop_signals import TrialStopSignals
+from kallisticore.models import Experiment
+from kallisticore.models.trial import Trial, TrialStatus
+from kallisticore.signals import execute_plan_for_trial
+
+
+class TestTrialStopSignals(TestCase):
+    def setUp(self):
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        experiment = Experiment.create(name='one-action', description='',
+                                       steps=[])
+        self.trial = Trial.create(experiment=experiment)
+        self.stop_signals = TrialStopSignals()
+        self.poll_interval_patch = mock.patch.object(
+            self.stop_signals, 'poll_interval', 0)
+        self.poll_interval_patch.start()
+
+    def tearDown(self):
+        self.stop_signals.unregister(self.trial.id)
+        self.poll_interval_patch.stop()
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def test_is_a_singleton(self):
+        self.assertIs(self.stop_signals, TrialStopSignals())
+
+    def test_signal_sets_event_of_registered_trial(self):
+        event = self.stop_signals.register(self.trial.id)
+        self.assertFalse(self.stop_signals.is_stop_initiated(self.trial.id))
+
+        self.stop_signals.signal(self.trial.id)
+
+        self.assertTrue(event.is_set())
+        self.assertTrue(self.stop_signals.is_stop_initiated(self.trial.id))
+
+    def test_signal_ignores_unregistered_trial(self):
+        self.stop_signals.signal(self.trial.id)
+        self.assertFalse(self.stop_signals.is_stop_initiated(self.trial.id))
+
+    def test_unregister(self):
+        self.stop_signals.register(self.trial.id)
+        self.stop_signals.signal(self.trial.id)
+
+        self.stop_signals.unregister(self.trial.id)
+
+        self.assertFalse(self.stop_signals.is_stop_initiated(self.trial.id))
+
+    def test_saving_stop_initiated_trial_signals_stop(self):
+        event = self.stop_signals.register(self.trial.id)
+
+        self.trial.update_status(TrialStatus.STOP_INITIATED)
+
+        self.assertTrue(event.is_set())
+
+    def test_refresh_signals_trials_stopped_in_database(self):
+        event = self.stop_signals.register(self.trial.id)
+        other_trial_id = uuid.uuid4()
+        other_event = self.stop_signals.register(other_trial_id)
+        self.addCleanup(self.stop_signals.unregister, other_trial_id)
+        Trial.objects.filter(id=self.trial.id).update(
+            status=TrialStatus.STOP_INITIATED.value)
+
+        self.stop_signals.refresh()
+
+        self.assertTrue(event.is_set())
+        self.assertFalse(other_event.is_set())
+
+    def test_refresh_does_not_query_without_pending_trials(self):
+        with mock.patch.object(self.stop_signals, '_events', {}), \
+                self.assertNumQueries(0):
+            self.stop_signals.refresh()
+
+    @mock.patch('time.sleep')
+    def test_sleep_outside_of_trial(self, mock_sleep):
+        self.stop_signals.sleep(15)
+
+        mock_sleep.assert_called_once_with(15)
+
+    def test_sleep_interrupted_by_stop(self):
+        event = self.stop_signals.register(self.trial.id)
+        stop_timer = threading.Timer(
+            0.05, lambda: self.stop_signals.signal(self.trial.id))
+
+        start = time.monotonic()
+        with self.stop_signals.watching(event):
+            stop_timer.start()
+            with self.assertRaises(TrialStopError):
+                self.stop_signals.sleep(30)
+
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_sleep_not_interrupted_without_stop_event(self):
+        event = self.stop_signals.register(self.trial.id)
+        event.set()
+
+        with self.stop_signals.watching(None):
+            self.stop_signals.sleep(0)
@@ -0,0 +1,122 @@
+import signal
+import time
+from threading import Event, Thread
+from unittest import TestCase, mock
+
+from huey import MemoryHuey
+
+from kallisticore.lib.worker import KallistiConsumer
+
+
+class TestKallistiConsumer(TestCase):
+    def setUp(self):
+        self.huey = MemoryHuey('test_worker')
+        self.release = Event()
+        self.started = Event()
+
+        @self.huey.task()
+        def run_trial():
+            self.started.set()
+            self.release.wait(5)
+
+        self.run_trial = run_trial
+        self.consumer = KallistiConsumer(
+            self.huey, workers=2, periodic=False, initial_delay=0.01,
+            max_delay=0.01, drain_timeout=5, capacity_report_interval=0)
+
+    def tearDown(self):
+        self.release.set()
+        self.consumer.stop_flag.set()
+
+    def test_get_capacity(self):
+        self.consumer.start()
+        self.run_trial()
+        self.assertTrue(self.started.wait(5))
+        self.run_trial()
+        self.run_trial()
+
+        self.assertEqual({'workers': 2, 'busy': 2, 'idle': 0, 'pending': 1},
+                         self._wait_for_capacity(busy=2, pending=1))
+
+        self.release.set()
+        self.assertEqual({'workers': 2, 'busy': 0, 'idle': 2, 'pending': 0},
+                         self._wait_for_capacity(busy=0, pending=0))
+
+    def test_report_capacity(self):
+        with self.assertLogs('kallisticore.lib.worker', 'INFO') as logs:
+            self.consumer.report_capacity()
+
+        self.assertIn('Capacity: 0/2 workers busy, 0 tasks pending',
+                      logs.output[0])
+
+    def test_sigterm_drains_running_trials(self):
+        self.consumer.start()
+        self.run_trial()
+        self.assertTrue(self.started.wait(5))
+
+        self.consumer._handle_stop_signal(signal.SIGTERM, None)
+        self.assertTrue(self.consumer._graceful)
+        self.release.set()
+        with self.assertLogs('kallisticore.lib.worker', 'INFO') as logs:
+            self.consumer.stop(graceful=self.consumer._graceful)
+
+        self.assertIn('All workers have stopped.', logs.output[-1])
+        self.assertEqual(0, self.consumer.busy_workers.value)
+        self.assertEqual(0, len(self.huey))
+
+    def test_drain_timeout(self):
+        self.consumer.drain_timeout = 0.05
+        self.consumer.start()
+        self.run_trial()
+        self.assertTrue(self.started.wait(5))
+
+        with self.assertLogs('kallisticore.lib.worker', 'WARNING') as logs:
+            self.consumer.stop(graceful=True)
+
+        self.assertIn('1 workers still busy after 0.05 seconds',
+                      logs.output[0])
+
+    def test_second_sigterm_stops_right_away(self):
+        self.consumer.start()
+        self.run_trial()
+        self.assertTrue(self.started.wait(5))
+        self.consumer._handle_stop_signal(signal.SIGTERM, None)
+        # the running trial never completes within the drain timeout
+        drain = Thread(target=self.consumer.stop,
+                       kwargs={'graceful': self.consumer._graceful})
+        start = time.monotonic()
+
+        with self.assertLogs('kallisticore.lib.worker', 'INFO') as logs:
+            drain.start()
+            time.sleep(0.2)
+            self.assertTrue(drain.is_alive())
+            self.consumer._handle_stop_signal(signal.SIGTERM, None)
+            drain.join(5)
+
+        self.assertFalse(drain.is_alive())
+        self.assertLess(time.monotonic() - start,
+                        self.consumer.drain_timeout / 2)
+        self.assertIn('Stopping 1 busy workers right away', logs.output[-1])
+
+    def _wait_for_capacity(self, **expected):
+        deadline = time.monotonic() + 5
+        capacity = self.consumer.get_capacity()
+        while time.monotonic() < deadline and any(
+                capacity[key] != value for key, value in expected.items()):
+            time.sleep(0.01)
+            capacity = self.consumer.get_capacity()
+        return capacity
+
+
+class TestKallistiConsumerSignals(TestCase):
+    @mock.patch('kallisticore.lib.worker.connections')
+    @mock.patch('kallisticore.lib.worker.Consumer.start')
+    def test_process_workers_close_database_connections(
+            self, mock_start, mock_connections):
+        consumer = KallistiConsumer(MemoryHuey('test_worker'),
+                                    worker_type='process', workers=1)
+
+        consumer.start()
+
+        mock_connections.close_all.assert_called_once_with()
+        mock_start.assert_called_once_with()
@@ -0,0 +1,35 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from kallisticore.models import Experiment, Trial
+
+
+class TestBenchmarkQueueCommand(TestCase):
+    EXEC_TRIAL = 'kallisticore.management.commands.benchmark_queue.exec_trial'
+
+    def test_benchmark_memory_queue(self):
+        out = StringIO()
+        call_command('benchmark_queue', backend='memory', tasks=20,
+                     workers=2, stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertRegex(lines[0], r'^memory: enqueued 20 tasks in ')
+        self.assertRegex(lines[1], r'^memory: dequeued and executed 20 tasks '
+                                   r'with 2 workers in ')
+        self.assertRegex(lines[2], r'^memory: task latency under load p50 ')
+
+    def test_benchmark_trials(self):
+        out = StringIO()
+        with mock.patch(self.EXEC_TRIAL) as mock_exec_trial:
+            call_command('benchmark_queue', backend='memory', tasks=5,
+                         workers=2, trials=3, stdout=out)
+
+        self.assertEqual(3, mock_exec_trial.call_count)
+        self.assertRegex(out.getvalue().splitlines()[-1],
+                         r'^memory: trial latency under load p50 ')
+        self.assertFalse(Trial.objects.get_queryset_all().exists())
+        self.assertFalse(Experiment.objects.get_queryset_all().exists())
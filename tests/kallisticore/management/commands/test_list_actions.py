@@ -0,0 +1,39 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class TestListActionsCommand(TestCase):
+    REGISTRY = 'kallisticore.management.commands.list_actions.ActionRegistry'
+
+    def setUp(self):
+        self.registry = mock.Mock()
+        self.registry.build.return_value = 0.25
+        self.registry.list_functions.return_value = {
+            'cm': ['http_probe', 'wait'], 'prom': ['query']}
+
+    def test_list_all_actions(self):
+        out = StringIO()
+        with mock.patch(self.REGISTRY, return_value=self.registry):
+            call_command('list_actions', stdout=out)
+
+        self.registry.build.assert_called_once_with()
+        self.assertEqual('cm (2 actions):\n'
+                         '  cm.http_probe\n'
+                         '  cm.wait\n'
+                         'prom (1 actions):\n'
+                         '  prom.query\n'
+                         'Built action registry in 0.250 seconds.\n',
+                         out.getvalue())
+
+    def test_list_actions_of_namespace(self):
+        out = StringIO()
+        with mock.patch(self.REGISTRY, return_value=self.registry):
+            call_command('list_actions', 'prom', stdout=out)
+
+        self.assertEqual('prom (1 actions):\n'
+                         '  prom.query\n'
+                         'Built action registry in 0.250 seconds.\n',
+                         out.getvalue())
@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+
+@mock.patch('kallisticore.management.commands.run_kallisti_worker.'
+            'ConsumerConfig.setup_logger', mock.Mock())
+@mock.patch('kallisticore.management.commands.run_kallisti_worker.'
+            'KallistiConsumer')
+class TestRunKallistiWorkerCommand(TestCase):
+    def test_run_with_configured_worker_pool(self, mock_consumer_class):
+        with self.settings(KALLISTI_WORKER_TYPE='process',
+                           KALLISTI_WORKER_CONCURRENCY=8):
+            call_command('run_kallisti_worker', disable_autoload=True)
+
+        args, kwargs = mock_consumer_class.call_args
+        self.assertEqual((settings.HUEY,), args)
+        self.assertEqual('process', kwargs['worker_type'])
+        self.assertEqual(8, kwargs['workers'])
+        self.assertEqual(300, kwargs['drain_timeout'])
+        self.assertEqual(60, kwargs['capacity_report_interval'])
+        mock_consumer_class.return_value.run.assert_called_once_with()
+
+    def test_run_with_options(self, mock_consumer_class):
+        call_command('run_kallisti_worker', '--workers', '2',
+                     '--worker-type', 'greenlet', '--drain-timeout', '30',
+                     '--capacity-report-interval', '0', '--disable-autoload')
+
+        kwargs = mock_consumer_class.call_args[1]
+        self.assertEqual('greenlet', kwargs['worker_type'])
+        self.assertEqual(2, kwargs['workers'])
+        self.assertEqual(30, kwargs['drain_timeout'])
+        self.assertEqual(0, kwargs['capacity_report_interval'])
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from importlib import import_module
+
+from django.apps import apps
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.utils import timezone
+
+from kallisticore.models import Experiment, Trial
+from kallisticore.signals import execute_plan_for_trial
+
+migration = import_module('kallisticore.migrations.0026_distinct_created_at')
+
+
+class TestMakeCreatedAtDistinct(TestCase):
+    def setUp(self):
+        post_save.disconnect(execute_plan_for_trial, sender=Trial)
+
+    def tearDown(self):
+        post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def test_rows_sharing_created_at_are_spread_by_id(self):
+        created_at = timezone.now()
+        experiments = sorted([Experiment.create(name='experiment-{}'.format(
+            index), created_at=created_at) for index in range(3)],
+            key=lambda experiment: str(experiment.id))
+        trial = Trial.create(experiment=experiments[0])
+
+        migration.make_created_at_distinct(apps, None)
+
+        self.assertEqual(
+            [created_at + timedelta(microseconds=index)
+             for index in range(3)],
+            [Experiment.objects.get(id=experiment.id).created_at
+             for experiment in experiments])
+        self.assertEqual(trial.created_at,
+                         Trial.objects.get(id=trial.id).created_at)
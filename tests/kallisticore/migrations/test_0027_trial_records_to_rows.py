@@ -0,0 +1,45 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.db.models.signals import post_save
+from django.test import TestCase
+
+from kallisticore.models import Experiment, Trial, TrialRecord
+from kallisticore.signals import execute_plan_for_trial
+
+migration = import_module('kallisticore.migrations.0027_trial_records_to_rows')
+
+
+class TestCopyTrialRecordsToRows(TestCase):
+    def setUp(self):
+        post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self.experiment = Experiment.create(name='test-experiment')
+
+    def tearDown(self):
+        post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def test_records_column_is_copied_to_rows(self):
+        records = {'steps': [{'step_name': 'step-1', 'logs': ['step-1']},
+                             {'step_name': 'step-2', 'logs': ['step-2']}],
+                   'result': [{'logs': ['result']}]}
+        trial = Trial.create(experiment=self.experiment, records=records)
+        Trial.create(experiment=self.experiment)
+
+        migration.copy_trial_records_to_rows(apps, None)
+
+        self.assertEqual(
+            [('steps', 'step-1'), ('steps', 'step-2'), ('result', None)],
+            list(TrialRecord.objects.values_list('trial_stage', 'step_name')))
+        trial = Trial.objects.get(id=trial.id)
+        self.assertEqual(records, trial.get_records())
+        self.assertEqual(records, trial.records)
+
+    def test_trials_recorded_in_rows_are_skipped(self):
+        trial = Trial.create(experiment=self.experiment,
+                             records={'result': [{'logs': ['blob']}]})
+        TrialRecord.objects.create(trial=trial, trial_stage='result',
+                                   record={'logs': ['row']})
+
+        migration.copy_trial_records_to_rows(apps, None)
+
+        self.assertEqual(1, TrialRecord.objects.count())
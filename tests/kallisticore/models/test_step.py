@@ -1,6 +1,9 @@
+import json
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
-from kallisticore.models.step import Step
+from kallisticore.models.step import Step, StepGraph
 
 
 class TestStep(TestCase):
@@ -118,3 +121,130 @@ class TestStep(TestCase):
             {"app_health_endpoint": app_health_endpoint})
 
         self.assertEqual({"url": app_health_endpoint}, step.where)
+
+    def test_build_with_id_and_depends_on(self):
+        step = Step.build({"do": self.action, "where": self.where_clause,
+                           "id": "second", "depends_on": ["first"]})
+
+        self.assertEqual("second", step.id)
+        self.assertEqual(["first"], step.depends_on)
+
+    def test_to_dict_with_id_and_depends_on(self):
+        step_dict = {"do": "test", "where": {"a": "b"}, "id": "first",
+                     "depends_on": []}
+        step = Step.build(step_dict)
+        self.assertEqual(step_dict, step.to_dict())
+
+    def test_convert_to_steps_with_unknown_dependency(self):
+        with self.assertRaises(ValidationError) as error:
+            Step.convert_to_steps([{"do": "test", "where": {"a": "b"},
+                                    "depends_on": ["unknown"]}])
+
+        self.assertEqual(
+            "Invalid Steps: Unknown step id in depends_on: 'unknown'.",
+            error.exception.message)
+
+    def test_convert_to_steps_with_duplicate_id(self):
+        with self.assertRaises(ValidationError) as error:
+            Step.convert_to_steps([{"do": "test", "where": {"a": "b"},
+                                    "id": "first"},
+                                   {"do": "test", "where": {"a": "b"},
+                                    "id": "first"}])
+
+        self.assertEqual("Invalid Steps: Duplicate step id: 'first'.",
+                         error.exception.message)
+
+    def test_convert_to_steps_with_circular_dependency(self):
+        with self.assertRaises(ValidationError) as error:
+            Step.convert_to_steps([{"do": "test", "where": {"a": "b"},
+                                    "id": "first", "depends_on": ["second"]},
+                                   {"do": "test", "where": {"a": "b"},
+                                    "id": "second", "depends_on": ["first"]}])
+
+        self.assertEqual("Invalid Steps: Circular dependency between steps.",
+                         error.exception.message)
+
+    def test_convert_to_steps_with_invalid_depends_on(self):
+        for depends_on in ["first", [1], {"id": "first"}]:
+            with self.subTest(depends_on=depends_on):
+                with self.assertRaises(ValidationError) as error:
+                    Step.convert_to_steps([
+                        {"do": "test", "where": {"a": "b"}, "id": "first"},
+                        {"do": "test", "where": {"a": "b"},
+                         "depends_on": depends_on}])
+
+                self.assertEqual(
+                    "Invalid Steps: depends_on must be a list of step ids: "
+                    "{}.".format(json.dumps(depends_on)),
+                    error.exception.message)
+
+    def test_interpolate_with_parameters_reuses_compiled_template(self):
+        Step.clear_template_cache()
+        where = {"url": "{{ app_health_endpoint }}"}
+        for endpoint in ["http://app1.test/health", "http://app2.test/health"]:
+            step = Step(action="cm.http_health_check", description='',
+                        where=dict(where))
+            step.interpolate_with_parameters(
+                {"app_health_endpoint": endpoint})
+            self.assertEqual({"url": endpoint}, step.where)
+
+        cache_info = Step.template_cache_info()['templates']
+        self.assertEqual(1, cache_info['misses'])
+        self.assertEqual(1, cache_info['hits'])
+        self.assertEqual(1, cache_info['currsize'])
+
+    def test_get_where_clause_template_variables(self):
+        Step.clear_template_cache()
+        step = Step(action="cm.http_health_check", description='',
+                    where={"url": "{{ endpoint }}/{{ path }}"})
+
+        self.assertEqual({"endpoint", "path"},
+                         step.get_where_clause_template_variables())
+        self.assertEqual({"endpoint", "path"},
+                         step.get_where_clause_template_variables())
+        cache_info = Step.template_cache_info()['variables']
+        self.assertEqual(1, cache_info['misses'])
+        self.assertEqual(1, cache_info['hits'])
+
+
+class TestStepGraph(TestCase):
+    def _step(self, step_id=None, depends_on=None):
+        return Step("eg.increment", None, {"a": 1}, step_id=step_id,
+                    depends_on=depends_on)
+
+    def test_steps_without_depends_on_run_in_order(self):
+        graph = StepGraph([self._step(), self._step(), self._step()])
+
+        self.assertTrue(graph.is_sequential())
+        self.assertEqual([0], graph.get_ready())
+        self.assertEqual([1], graph.complete(0))
+        self.assertEqual([2], graph.complete(1))
+        self.assertEqual([], graph.complete(2))
+
+    def test_independent_steps_are_ready_together(self):
+        graph = StepGraph([self._step("a", []), self._step("b", []),
+                           self._step("c", ["a", "b"])])
+
+        self.assertFalse(graph.is_sequential())
+        self.assertEqual([0, 1], graph.get_ready())
+        self.assertEqual([], graph.complete(0))
+        self.assertEqual([2], graph.complete(1))
+
+    def test_step_without_depends_on_waits_for_previous_step(self):
+        graph = StepGraph([self._step("a", []), self._step("b", []),
+                           self._step()])
+
+        self.assertEqual([0, 1], graph.get_ready())
+        self.assertEqual([], graph.complete(0))
+        self.assertEqual([2], graph.complete(1))
+
+    def test_order_runs_steps_after_their_dependencies(self):
+        graph = StepGraph([self._step("a", ["c"]), self._step("b", []),
+                           self._step("c", []), self._step()])
+
+        self.assertEqual([1, 2, 0, 3], graph.get_order())
+
+    def test_order_of_steps_without_depends_on(self):
+        graph = StepGraph([self._step(), self._step(), self._step()])
+
+        self.assertEqual([0, 1, 2], graph.get_order())
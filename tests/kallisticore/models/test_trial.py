@@ -1,4 +1,5 @@
-from datetime import datetime
+import pickle
+from datetime import datetime, timedelta
 from unittest import mock
 
 from django.core.exceptions import ValidationError
@@ -6,7 +7,7 @@ from django.test import TestCase
 from django.utils import timezone
 
 from kallisticore import signals
-from kallisticore.models import Experiment, Trial
+from kallisticore.models import Experiment, Trial, TrialRecord
 from kallisticore.models.step import Step
 from kallisticore.models.trial import TrialStatus, validate_trial_status, \
     validate_trial_ticket
@@ -183,6 +184,11 @@ class TestTrialWithInterpolation(TestCase):
         self.assertEqual(self._trial.status, TrialStatus.ABORTED.value)
         self.assertIsInstance(self._trial.completed_at, timezone.datetime)
 
+    def test_trial_update_status_stopped_update_completed_at(self):
+        self._trial.update_status(TrialStatus.STOPPED)
+        self.assertEqual(self._trial.status, TrialStatus.STOPPED.value)
+        self.assertIsInstance(self._trial.completed_at, timezone.datetime)
+
     def test_trial_update_status_created_doesnt_update_completed_at(self):
         self._trial.update_status(TrialStatus.SCHEDULED)
         self.assertEqual(self._trial.status, TrialStatus.SCHEDULED.value)
@@ -238,6 +244,54 @@ class TestTrialWithInterpolation(TestCase):
                       self._experiment.trials.values_list('status', flat=True))
 
 
+class TestTrialPopulatedParameters(TestCase):
+    def setUp(self):
+        self._experiment = Experiment.create(
+            name='one-action', description='one action description',
+            parameters={"app_name": "hello-world", "org": "test-org"},
+            steps=Step.convert_to_steps(
+                [{"do": "cf.stop_app",
+                  "where": {"app_name": "{{app_name}}", "org": "{{org}}",
+                            "space": "{{space}}"}}]))
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self._trial = Trial.create(experiment=self._experiment,
+                                   parameters={"org": "other-org"})
+
+    def tearDown(self):
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def test_trial_parameters_override_experiment_parameters(self):
+        self.assertEqual({"app_name": "hello-world", "org": "other-org"},
+                         dict(self._trial.get_populated_parameters()))
+
+    def test_experiment_parameters_are_not_modified(self):
+        self._trial.get_populated_parameters()
+        self.assertEqual({"app_name": "hello-world", "org": "test-org"},
+                         self._experiment.parameters)
+
+    def test_populated_parameters_are_frozen(self):
+        parameters = self._trial.get_populated_parameters()
+        with self.assertRaises(TypeError):
+            parameters["org"] = "another-org"
+
+    def test_populated_parameters_are_resolved_once(self):
+        parameters = self._trial.get_populated_parameters()
+        self._trial.parameters["org"] = "another-org"
+
+        self.assertIs(parameters, self._trial.get_populated_parameters())
+        self.assertEqual("another-org",
+                         self._trial.resolve_parameters()["org"])
+
+    def test_get_undefined_variables(self):
+        self.assertEqual({"space"}, self._trial.get_undefined_variables())
+
+    def test_trial_can_be_pickled_after_resolving_parameters(self):
+        self._trial.resolve_parameters()
+        trial = pickle.loads(pickle.dumps(self._trial))
+        self.assertEqual("other-org",
+                         trial.get_populated_parameters()["org"])
+
+
 class TestValidateTrialStatus(TestCase):
     def test_returns_true_when_passed_a_valid_trial_status(self):
         self.assertEqual(True, validate_trial_status(TrialStatus.FAILED.value))
@@ -390,3 +444,57 @@ class TestTrialIsCompleted(TestCase):
     def test_completed_at_not_present(self):
         trial = Trial.create(experiment=self.experiment, completed_at=None)
         self.assertFalse(trial.is_completed())
+
+
+class TestTrialRecords(TestCase):
+    def setUp(self):
+        self.experiment = Experiment.create(name='one-action', steps=[])
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self.trial = Trial.create(experiment=self.experiment)
+
+    def tearDown(self):
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def _add_record(self, trial_stage, step_index=None, status=None,
+                    completed_at=None):
+        return TrialRecord.objects.create(
+            trial=self.trial, trial_stage=trial_stage,
+            record={'logs': [trial_stage]}, step_index=step_index,
+            step_name='step-{}'.format(step_index), status=status,
+            completed_at=completed_at)
+
+    def test_get_records_from_blob(self):
+        self.trial.records = {'steps': [{'logs': []}],
+                              'result': 'Succeeded'}
+
+        self.assertEqual(self.trial.records, self.trial.get_records())
+        self.assertEqual({'result': 'Succeeded'},
+                         self.trial.get_records(['result']))
+
+    def test_get_records_of_stages(self):
+        self._add_record('pre_steps', 0, TrialStatus.SUCCEEDED.value)
+        self._add_record('steps', 0, TrialStatus.SUCCEEDED.value)
+        self._add_record('result')
+
+        self.assertEqual({'pre_steps': [{'logs': ['pre_steps']}],
+                          'steps': [{'logs': ['steps']}],
+                          'result': [{'logs': ['result']}]},
+                         self.trial.get_records())
+        self.assertEqual({'steps': [{'logs': ['steps']}]},
+                         self.trial.get_records(['steps']))
+
+    def test_step_queries(self):
+        now = timezone.now()
+        first = self._add_record('steps', 0, TrialStatus.SUCCEEDED.value,
+                                 now - timedelta(seconds=5))
+        last = self._add_record('steps', 1, TrialStatus.FAILED.value, now)
+        self._add_record('result')
+
+        self.assertEqual([first, last],
+                         list(TrialRecord.objects.steps().order_by('id')))
+        self.assertEqual([first], list(TrialRecord.objects.succeeded()))
+        self.assertEqual([last], list(TrialRecord.objects.failed()))
+        self.assertEqual(last, self.trial.get_last_step_record())
+
+    def test_get_last_step_record_without_rows(self):
+        self.assertIsNone(self.trial.get_last_step_record())
@@ -1,4 +1,5 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
@@ -75,7 +76,8 @@ class TestTrialSchedule(TestCase):
                          self._trial_schedule.recurrence_count)
         self.assertEqual(self._recurrence_count,
                          self._trial_schedule.recurrence_left)
-        self._trial_schedule.decrement_recurrence_left()
+        self._trial_schedule.record_run(datetime.now(timezone.utc))
+        self._trial_schedule.save()
         self.assertEqual(self._recurrence_count,
                          self._trial_schedule.recurrence_count)
         self.assertEqual(self._recurrence_count - 1,
@@ -112,60 +114,76 @@ class TestTrialSchedule(TestCase):
         trial_schedule.save()
         self.assertFalse(trial_schedule.has_recurrence_left())
 
-    def test_should_execute_at(self):
-        # time logic
-        at_datetime = datetime(2019, 1, 1, 0, 0, 0)
-        self._trial_schedule.recurrence_pattern = '* * * * *'
-        self._trial_schedule.save()
-        self.assertFalse(
-            self._trial_schedule.should_execute_at(at_datetime, 59))
-        self.assertTrue(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
+    @mock.patch('kallisticore.models.trial_schedule.timezone.now')
+    def test_next_run_at_is_set_on_save(self, mock_now):
+        mock_now.return_value = datetime(2019, 1, 1, 0, 0, 30,
+                                         tzinfo=timezone.utc)
+        trial_schedule = TrialSchedule.create(
+            experiment=self._experiment, recurrence_pattern='5 * * * *')
+        self.assertEqual(datetime(2019, 1, 1, 0, 5, tzinfo=timezone.utc),
+                         trial_schedule.next_run_at)
 
-        after_60_seconds = at_datetime + timedelta(seconds=60)
-        self.assertTrue(
-            self._trial_schedule.should_execute_at(after_60_seconds, 60))
+        mock_now.return_value = datetime(2019, 1, 1, 0, 1,
+                                         tzinfo=timezone.utc)
+        trial_schedule.parameters = {'changed': 'value'}
+        trial_schedule.save()
+        self.assertEqual(datetime(2019, 1, 1, 0, 5, tzinfo=timezone.utc),
+                         trial_schedule.next_run_at)
 
-        self._trial_schedule.recurrence_pattern = '5 * * * *'
-        self._trial_schedule.save()
-        self.assertFalse(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
-        after_4_minutes = at_datetime + timedelta(minutes=4)
-        self.assertTrue(
-            self._trial_schedule.should_execute_at(after_4_minutes, 60))
-
-        # recurrence count logic
-        self._trial_schedule.recurrence_pattern = '* * * * *'
+        trial_schedule.recurrence_pattern = '10 * * * *'
+        trial_schedule.save()
+        self.assertEqual(datetime(2019, 1, 1, 0, 10, tzinfo=timezone.utc),
+                         trial_schedule.next_run_at)
+
+    def test_next_run_at_is_cleared(self):
         self._trial_schedule.recurrence_count = 0
         self._trial_schedule.save()
-        self.assertFalse(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
+        self.assertIsNone(self._trial_schedule.next_run_at)
 
         self._trial_schedule.recurrence_count = 1
         self._trial_schedule.save()
-        self.assertTrue(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
-        self._trial_schedule.decrement_recurrence_left()
-        self.assertFalse(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
+        self.assertIsNotNone(self._trial_schedule.next_run_at)
 
-        self._trial_schedule.recurrence_count = None
+        self._trial_schedule.delete()
+        self.assertIsNone(self._trial_schedule.next_run_at)
+
+    def test_record_run(self):
+        at_datetime = datetime(2019, 1, 1, 0, 1, tzinfo=timezone.utc)
+        self._trial_schedule.next_run_at = at_datetime
         self._trial_schedule.save()
-        self.assertTrue(
-            self._trial_schedule.should_execute_at(at_datetime, 60))
 
-    def test_decrement_recurrence_left(self):
-        self._trial_schedule.decrement_recurrence_left()
-        self.assertEqual(self._recurrence_count,
-                         self._trial_schedule.recurrence_count)
+        self._trial_schedule.record_run(at_datetime)
+        self._trial_schedule.save()
+
+        trial_schedule = TrialSchedule.objects.get(
+            id=self._trial_schedule.id)
         self.assertEqual(self._recurrence_count - 1,
-                         self._trial_schedule.recurrence_left)
+                         trial_schedule.recurrence_left)
+        self.assertEqual(at_datetime + timedelta(minutes=1),
+                         trial_schedule.next_run_at)
+
+    def test_record_last_run(self):
+        self._trial_schedule.recurrence_count = 1
+        self._trial_schedule.save()
+
+        self._trial_schedule.record_run(
+            datetime(2019, 1, 1, 0, 1, tzinfo=timezone.utc))
+
+        self.assertEqual(0, self._trial_schedule.recurrence_left)
+        self.assertIsNone(self._trial_schedule.next_run_at)
 
+    def test_record_run_without_recurrence_count(self):
+        at_datetime = datetime(2019, 1, 1, 0, 1, tzinfo=timezone.utc)
         self._trial_schedule.recurrence_count = None
+        self._trial_schedule.next_run_at = at_datetime
         self._trial_schedule.save()
         self.assertIsNone(self._trial_schedule.recurrence_left)
-        self._trial_schedule.decrement_recurrence_left()
+
+        self._trial_schedule.record_run(at_datetime)
+
         self.assertIsNone(self._trial_schedule.recurrence_left)
+        self.assertEqual(datetime(2019, 1, 1, 0, 2, tzinfo=timezone.utc),
+                         self._trial_schedule.next_run_at)
 
     def _assert_same_trial_schedule(self, trial_schedule: TrialSchedule):
         self.assertEqual(trial_schedule.recurrence_pattern,
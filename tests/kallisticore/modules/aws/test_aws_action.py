@@ -1,12 +1,21 @@
+import json
+import os
+import sys
+import tempfile
 from unittest import TestCase, mock
 from unittest.mock import Mock
 
+import chaosaws
+from django.test import override_settings
+
 from kallisticore.exceptions import CouldNotFindFunction, InvalidCredentialType
-from kallisticore.lib.action import Action
+from kallisticore.lib.action import Action, ActionRegistry
 from kallisticore.lib.credential import TokenCredential
 from kallisticore.models.step import Step
 from kallisticore.modules.aws import AwsAction
-from kallisticore.modules.aws.aws_action import AwsFunctionLoader
+from kallisticore.modules.aws.aws_action import AwsFunctionLoader, \
+    get_activity_index
+from tests import clear_kallisti_functions_cache
 
 
 class TestAwsAction(TestCase):
@@ -53,3 +62,86 @@ class TestAwsAction(TestCase):
         self.assertEqual('Invalid credential type: Environment variables '
                          'should be used for AWS client config.',
                          str(error_context.exception))
+
+    def test_activity_modules_are_imported_on_first_use(self):
+        index = {'get_policy': 'chaosaws.iam.probes',
+                 'stop_instance': 'kallisticore.modules.unknown'}
+        clear_kallisti_functions_cache()
+        with mock.patch('kallisticore.modules.aws.aws_action.'
+                        'get_activity_index', return_value=index):
+            loader = AwsFunctionLoader(self.module_map, 'aws')
+            self.assertEqual(index, ActionRegistry().get_functions(loader))
+            get_policy = loader.get_function('iam.get_policy')
+        self.assertEqual(sys.modules['chaosaws.iam.probes'].get_policy,
+                         get_policy)
+        self.assertNotIn('kallisticore.modules.unknown', sys.modules)
+        clear_kallisti_functions_cache()
+
+
+class TestActivityIndex(TestCase):
+    DISCOVER = 'kallisticore.modules.aws.aws_action.discover'
+    activities = {'activities': [
+        {'name': 'get_policy', 'mod': 'chaosaws.iam.probes'},
+        {'name': 'stop_instance', 'mod': 'chaosaws.ec2.actions'}]}
+
+    def setUp(self):
+        get_activity_index.cache_clear()
+        self.manifest_dir = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(
+            self.manifest_dir.name,
+            'chaosaws-activities-{}.json'.format(chaosaws.__version__))
+
+    def tearDown(self):
+        get_activity_index.cache_clear()
+        self.manifest_dir.cleanup()
+
+    def test_index_is_discovered_once(self):
+        with mock.patch(self.DISCOVER, return_value=self.activities) \
+                as discover, \
+                override_settings(KALLISTI_AWS_ACTIVITY_MANIFEST_DIR=''):
+            get_activity_index()
+            index = get_activity_index()
+
+        discover.assert_called_once_with(False)
+        self.assertEqual({'get_policy': 'chaosaws.iam.probes',
+                          'stop_instance': 'chaosaws.ec2.actions'}, index)
+        self.assertFalse(os.path.exists(self.manifest_path))
+
+    def test_manifest_is_written_and_read(self):
+        with mock.patch(self.DISCOVER, return_value=self.activities) \
+                as discover, \
+                override_settings(KALLISTI_AWS_ACTIVITY_MANIFEST_DIR=self
+                                  .manifest_dir.name):
+            index = get_activity_index()
+            get_activity_index.cache_clear()
+            self.assertEqual(index, get_activity_index())
+
+        discover.assert_called_once_with(False)
+        with open(self.manifest_path) as manifest_file:
+            self.assertEqual({'version': chaosaws.__version__,
+                              'activities': index},
+                             json.load(manifest_file))
+
+    def test_manifest_of_other_version_is_ignored(self):
+        with open(self.manifest_path, 'w') as manifest_file:
+            json.dump({'version': '0.0.1',
+                       'activities': {'old': 'chaosaws.old'}}, manifest_file)
+
+        with mock.patch(self.DISCOVER, return_value=self.activities), \
+                override_settings(KALLISTI_AWS_ACTIVITY_MANIFEST_DIR=self
+                                  .manifest_dir.name):
+            index = get_activity_index()
+
+        self.assertNotIn('old', index)
+        self.assertIn('get_policy', index)
+
+    def test_invalid_manifest_is_ignored(self):
+        with open(self.manifest_path, 'w') as manifest_file:
+            manifest_file.write('{')
+
+        with mock.patch(self.DISCOVER, return_value=self.activities), \
+                override_settings(KALLISTI_AWS_ACTIVITY_MANIFEST_DIR=self
+                                  .manifest_dir.name):
+            index = get_activity_index()
+
+        self.assertIn('get_policy', index)
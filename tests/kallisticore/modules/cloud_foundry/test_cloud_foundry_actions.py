@@ -2,10 +2,13 @@ import os
 from unittest import TestCase, mock
 from unittest.mock import ANY
 
+import requests_mock
+from chaoscf.api import call_api
+from kallisticore.lib.oauth_token_cache import OAuthTokenCache
 from kallisticore.models.step import Step
 from kallisticore.modules.cloud_foundry.cloud_foundry_action import \
-    CloudFoundryAction
-from tests import clear_kallisti_functions_cache
+    CloudFoundryAction, CloudFoundrySecrets
+from tests import clear_credential_cache, clear_kallisti_functions_cache
 
 
 class TestCFAction(TestCase):
@@ -26,6 +29,16 @@ class TestCFAction(TestCase):
                             'where': self.arguments}
         self.step = Step.build(self.action_spec)
         clear_kallisti_functions_cache()
+        clear_credential_cache()
+        OAuthTokenCache().clear()
+
+    def tearDown(self):
+        OAuthTokenCache().clear()
+
+    def _assert_credential_secrets(self, expected, secrets):
+        self.assertEqual(expected, {key: secrets[key] for key in expected})
+        self.assertEqual(set(expected) | set(CloudFoundrySecrets.TOKEN_KEYS),
+                         set(secrets))
 
     def test_init_cloud_foundry_action_for_local_environment(self):
         self.user_name = TestCFAction.user_name
@@ -39,11 +52,11 @@ class TestCFAction(TestCase):
                                              self.cred_cls_map)
 
         self.assertEqual(self.org_name, cf_action.arguments['org_name'])
-        self.assertDictEqual({'cf_client_id': 'cf',
-                              'cf_client_secret': '',
-                              'cf_username': TestCFAction.user_name,
-                              'cf_password': TestCFAction.user_pw},
-                             cf_action.arguments['secrets'])
+        self._assert_credential_secrets(
+            {'cf_client_id': 'cf', 'cf_client_secret': '',
+             'cf_username': TestCFAction.user_name,
+             'cf_password': TestCFAction.user_pw},
+            cf_action.arguments['secrets'])
         self.assertDictEqual(
             {'cf_verify_ssl': True, 'cf_api_url': self.cf_api_url},
             cf_action.arguments['configuration'])
@@ -66,11 +79,11 @@ class TestCFAction(TestCase):
                                              self.cred_cls_map)
 
         self.assertEqual(self.org_name, cf_action.arguments['org_name'])
-        self.assertDictEqual({'cf_client_id': 'cf',
-                              'cf_client_secret': '',
-                              'cf_username': TestCFAction.user_name,
-                              'cf_password': TestCFAction.user_pw},
-                             cf_action.arguments['secrets'])
+        self._assert_credential_secrets(
+            {'cf_client_id': 'cf', 'cf_client_secret': '',
+             'cf_username': TestCFAction.user_name,
+             'cf_password': TestCFAction.user_pw},
+            cf_action.arguments['secrets'])
         self.assertDictEqual({'cf_verify_ssl': True,
                               'cf_api_url': self.cf_api_url},
                              cf_action.arguments['configuration'])
@@ -85,3 +98,76 @@ class TestCFAction(TestCase):
             org_name=self.org_name, secrets=ANY,
             configuration={'cf_api_url': self.cf_api_url,
                            'cf_verify_ssl': True})
+
+    @requests_mock.mock()
+    def test_uaa_token_is_reused_across_actions(self, mock_request):
+        os.environ[CloudFoundryAction.CF_DEFAULT_USERNAME_KEY] = \
+            TestCFAction.user_name
+        os.environ[
+            CloudFoundryAction.CF_DEFAULT_PASSWORD_KEY] = TestCFAction.user_pw
+        tokens = {'access_token': 'test-token', 'token_type': 'bearer',
+                  'expires_in': 600}
+        mock_api = mock_request.get(
+            self.cf_api_url + '/v2/organizations', json={'resources': []},
+            request_headers={'Authorization': 'bearer test-token'})
+
+        with mock.patch('chaoscf.auth', return_value=tokens) as mock_auth:
+            for _ in range(2):
+                action = CloudFoundryAction.build(self.step, self.module_map,
+                                                  self.cred_cls_map)
+                call_api('/v2/organizations', **{
+                    key: action.arguments[key]
+                    for key in ('configuration', 'secrets')})
+
+        mock_auth.assert_called_once_with(
+            {'cf_verify_ssl': True, 'cf_api_url': self.cf_api_url},
+            {'cf_client_id': 'cf', 'cf_client_secret': '',
+             'cf_username': TestCFAction.user_name,
+             'cf_password': TestCFAction.user_pw})
+        self.assertEqual(2, mock_api.call_count)
+
+    def test_uaa_tokens_are_cached_by_user(self):
+        step = Step.build({'step': 'Get org by name',
+                           'do': 'cf.get_org_by_name',
+                           'where': {'cf_api_url': self.cf_api_url,
+                                     'org_name': self.org_name,
+                                     'credentials': {
+                                         'type': 'ENV_VAR_USERNAME_PASSWORD',
+                                         'username_key': 'OTHER_USERNAME',
+                                         'password_key': 'OTHER_PASSWORD'}}})
+        os.environ['OTHER_USERNAME'] = 'other-user'
+        os.environ['OTHER_PASSWORD'] = 'other-password'
+
+        with mock.patch('chaoscf.auth', side_effect=[
+                {'access_token': 'token-1', 'expires_in': 600},
+                {'access_token': 'token-2', 'expires_in': 600}]):
+            secrets = CloudFoundryAction.build(
+                self.step, self.module_map,
+                self.cred_cls_map).arguments['secrets']
+            other_secrets = CloudFoundryAction.build(
+                step, self.module_map, self.cred_cls_map).arguments['secrets']
+
+            self.assertEqual('token-1', secrets.get('cf_access_token'))
+            self.assertEqual('token-2', other_secrets.get('cf_access_token'))
+            self.assertEqual('bearer', secrets.get('cf_token_type'))
+
+    def test_secrets_mapping_fetches_token_once(self):
+        secrets = CloudFoundrySecrets(
+            {'cf_api_url': self.cf_api_url}, cf_client_id='cf',
+            cf_username='user', cf_password='password')
+
+        with mock.patch('chaoscf.auth', return_value={
+                'access_token': 'token', 'expires_in': 600}) as mock_auth:
+            self.assertIn('cf_access_token', secrets)
+            self.assertEqual({'cf_client_id': 'cf', 'cf_username': 'user',
+                              'cf_password': 'password',
+                              'cf_access_token': 'token',
+                              'cf_token_type': 'bearer'}, dict(secrets))
+            self.assertEqual('token', secrets.get('cf_access_token'))
+            self.assertIsNone(secrets.get('cf_unknown'))
+            self.assertEqual(5, len(secrets))
+
+        mock_auth.assert_called_once_with(
+            {'cf_api_url': self.cf_api_url},
+            {'cf_client_id': 'cf', 'cf_username': 'user',
+             'cf_password': 'password'})
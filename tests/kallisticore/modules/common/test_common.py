@@ -1,3 +1,4 @@
+import asyncio
 import base64
 import json
 from unittest import TestCase, mock
@@ -6,17 +7,22 @@ from unittest.mock import Mock, mock_open
 import requests_mock
 from kallisticore.exceptions import FailedAction, InvalidHttpProbeMethod, \
     InvalidCredentialType, InvalidHttpRequestMethod
-from kallisticore.lib.credential import \
+from kallisticore.lib.credential import CredentialCache, \
     EnvironmentUserNamePasswordCredential, \
     KubernetesServiceAccountTokenCredential
+from kallisticore.lib.oauth_token_cache import OAuthTokenCache
 from kallisticore.modules import common
-from kallisticore.modules.common import wait, http_probe, http_request
+from kallisticore.modules.common import wait, http_probe, http_request, \
+    async_http_probe, async_http_request
+
+SESSION_REQUEST = 'kallisticore.modules.common.HttpSessionPool.request'
 
 
 class TestCommonModule(TestCase):
     def test_exported_functions(self):
         self.assertListEqual(
-            ['http_probe', 'http_request', 'wait'],
+            ['async_http_probe', 'async_http_request', 'http_probe',
+             'http_request', 'wait'],
             common.__all__)
 
 
@@ -27,6 +33,7 @@ class TestHttpProbe(TestCase):
     def setUp(self):
         self._url = "http://go.test/-/status/health"
         self._headers = {"Content-type": "text/html"}
+        OAuthTokenCache().clear()
 
     def test_exception_for_invalid_method(self):
         method = "PUT"
@@ -70,7 +77,7 @@ class TestHttpProbe(TestCase):
         mock_duration = 1
 
         with self.assertRaises(FailedAction) as error:
-            with mock.patch('requests.get') as mock_get:
+            with mock.patch(SESSION_REQUEST) as mock_get:
                 mock_get.return_value.status_code = status_code
                 mock_get.return_value.text = text
                 mock_get.return_value.elapsed.total_seconds.return_value = \
@@ -108,7 +115,7 @@ class TestHttpProbe(TestCase):
         mock_duration = 1
 
         with self.assertRaises(FailedAction) as error:
-            with mock.patch('requests.get') as mock_get:
+            with mock.patch(SESSION_REQUEST) as mock_get:
                 mock_get.return_value.status_code = status_code
                 mock_get.return_value.elapsed.total_seconds.return_value = \
                     mock_duration
@@ -148,7 +155,7 @@ class TestHttpProbe(TestCase):
         mock_duration = 1
 
         with self.assertRaises(FailedAction) as error:
-            with mock.patch('requests.post') as mock_post:
+            with mock.patch(SESSION_REQUEST) as mock_post:
                 mock_post.return_value.status_code = status_code
                 mock_post.return_value.elapsed.total_seconds.return_value = \
                     mock_duration
@@ -190,7 +197,7 @@ class TestHttpProbe(TestCase):
         mock_duration = 1
 
         with self.assertRaises(FailedAction) as error:
-            with mock.patch('requests.post') as mock_post:
+            with mock.patch(SESSION_REQUEST) as mock_post:
                 mock_post.return_value.status_code = status_code
                 mock_post.return_value.elapsed.total_seconds.return_value = \
                     mock_duration
@@ -339,6 +346,65 @@ class TestHttpProbe(TestCase):
                                      mock_response_text),
                 error.exception.message)
 
+    @requests_mock.mock()
+    def test_env_pw_authentication_token_is_reused(self, mock_request):
+        auth_config = {
+            'type': 'oauth2_token',
+            'url': 'https://test-auth.com',
+            'credentials': {'type': 'ENV_VAR_USERNAME_PASSWORD',
+                            'username_key': 'TEST_USERNAME',
+                            'password_key': 'TEST_PASSWORD'},
+            'client': {'id': 'test-client-id'}
+        }
+        mock_auth_post = mock_request.post(
+            url=auth_config['url'],
+            text=json.dumps({'access_token': 'test-token',
+                             'expires_in': 3600}))
+        mock_request.get(url=self._url, text=json.dumps({'status': 'UP'}),
+                         request_headers={
+                             'Authorization': 'Bearer test-token'})
+
+        with mock.patch.dict('os.environ', {'TEST_USERNAME': 'user',
+                                            'TEST_PASSWORD': 'password'}):
+            http_probe(url=self._url, authentication=auth_config)
+            result = http_probe(url=self._url, authentication=auth_config)
+
+        self.assertEqual(200, result['status_code'])
+        self.assertEqual(1, mock_auth_post.call_count)
+
+    @requests_mock.mock()
+    def test_authentication_token_not_reused_after_secret_rotation(
+            self, mock_request):
+        auth_config = {
+            'type': 'oauth2_token',
+            'url': 'https://test-auth.com',
+            'credentials': {'type': 'ENV_VAR_USERNAME_PASSWORD',
+                            'username_key': 'TEST_USERNAME',
+                            'password_key': 'TEST_PASSWORD'},
+            'client': {'id': 'test-client-id', 'secret': 'client-secret'}
+        }
+        mock_auth_post = mock_request.post(
+            url=auth_config['url'],
+            text=json.dumps({'access_token': 'test-token',
+                             'expires_in': 3600}))
+        mock_request.get(url=self._url, text=json.dumps({'status': 'UP'}))
+
+        with mock.patch.dict('os.environ', {'TEST_USERNAME': 'user',
+                                            'TEST_PASSWORD': 'password'}):
+            http_probe(url=self._url, authentication=auth_config)
+        # the credential is fetched again once its cache ttl has passed
+        CredentialCache().clear()
+        with mock.patch.dict('os.environ', {'TEST_USERNAME': 'user',
+                                            'TEST_PASSWORD': 'rotated'}):
+            http_probe(url=self._url, authentication=auth_config)
+            auth_config['client']['secret'] = 'rotated-client-secret'
+            http_probe(url=self._url, authentication=auth_config)
+            http_probe(url=self._url, authentication=auth_config)
+
+        self.assertEqual(3, mock_auth_post.call_count)
+        key = next(iter(OAuthTokenCache()._tokens))
+        self.assertNotIn('rotated', str(key))
+
     def test_authentication_unknown_credential(self):
         with mock.patch('kallisticore.modules.common.Credential') \
                 as mock_credential_module:
@@ -630,8 +696,111 @@ class TestHttpRequest(TestCase):
                              error.exception.message)
 
 
+def _mock_client_session(mock_session_cls, status=200, text='',
+                         headers=None):
+    response = mock.MagicMock()
+    response.status = status
+    response.text = mock.AsyncMock(return_value=text)
+    response.headers = headers or {}
+    session = mock.MagicMock()
+    session.request.return_value.__aenter__.return_value = response
+    mock_session_cls.return_value = session
+    return session
+
+
+class TestAsyncHttpProbe(TestCase):
+    CLIENT_SESSION = \
+        'kallisticore.lib.async_http_session_pool.aiohttp.ClientSession'
+
+    def setUp(self):
+        self._url = "http://go.test/-/status/health"
+        self._headers = {"Content-type": "text/html"}
+        OAuthTokenCache().clear()
+
+    def test_get_response(self):
+        data = {'status': 'UP'}
+        with mock.patch(self.CLIENT_SESSION) as mock_session_cls:
+            session = _mock_client_session(
+                mock_session_cls, text=json.dumps(data),
+                headers=self._headers)
+            result = asyncio.run(async_http_probe(url=self._url))
+
+        session.request.assert_called_once_with('GET', self._url, data=None,
+                                                headers=None)
+        self.assertEqual(200, result['status_code'])
+        self.assertEqual(data, result['response'])
+        self.assertEqual(self._headers, result['response_headers'])
+        self.assertIn('response_time_in_seconds', result)
+
+    def test_post_request_body(self):
+        body = {'key': 'value'}
+        with mock.patch(self.CLIENT_SESSION) as mock_session_cls:
+            session = _mock_client_session(mock_session_cls)
+            asyncio.run(async_http_probe(url=self._url, method='post',
+                                         request_body=body,
+                                         headers=self._headers))
+
+        session.request.assert_called_once_with(
+            'POST', self._url, data=json.dumps(body), headers=self._headers)
+
+    def test_exception_for_invalid_method(self):
+        with self.assertRaises(InvalidHttpProbeMethod) as error:
+            asyncio.run(async_http_probe(url=self._url, method="PUT"))
+        self.assertEqual(
+            "Invalid method: PUT. HTTP Probe allows only GET and POST "
+            "methods", error.exception.message)
+
+    def test_exception_for_4xx_or_5xx_status_code(self):
+        with mock.patch(self.CLIENT_SESSION) as mock_session_cls, \
+                self.assertRaises(FailedAction) as error:
+            _mock_client_session(mock_session_cls, status=404,
+                                 text='Not Found')
+            asyncio.run(async_http_probe(url=self._url))
+
+        self.assertIn("for url {} with status code 404. Details: Not Found"
+                      .format(self._url), error.exception.message)
+
+
+class TestAsyncHttpRequest(TestCase):
+    CLIENT_SESSION = \
+        'kallisticore.lib.async_http_session_pool.aiohttp.ClientSession'
+
+    def setUp(self):
+        self._url = "http://go.test/-/status/health"
+
+    def test_not_raise_exception_for_4xx_or_5xx(self):
+        with mock.patch(self.CLIENT_SESSION) as mock_session_cls:
+            session = _mock_client_session(mock_session_cls, status=500,
+                                           text='Server Error')
+            result = asyncio.run(async_http_request(url=self._url,
+                                                    method='delete'))
+
+        session.request.assert_called_once_with('DELETE', self._url,
+                                                data=None, headers=None)
+        self.assertEqual(500, result['status_code'])
+        self.assertEqual('Server Error', result['response_text'])
+        self.assertNotIn('response', result)
+
+    def test_put_request_body(self):
+        body = {'key': 'value'}
+        with mock.patch(self.CLIENT_SESSION) as mock_session_cls:
+            session = _mock_client_session(mock_session_cls)
+            asyncio.run(async_http_request(url=self._url, method='PUT',
+                                           request_body=body))
+
+        session.request.assert_called_once_with(
+            'PUT', self._url, data=json.dumps(body), headers=None)
+
+    def test_exception_when_invalid_method_is_provided(self):
+        with self.assertRaises(InvalidHttpRequestMethod) as error:
+            asyncio.run(async_http_request(url=self._url, method="HEAD"))
+        self.assertEqual(
+            "Invalid method: HEAD. Please specify a valid HTTP request "
+            "method", error.exception.message)
+
+
 class TestWait(TestCase):
-    @mock.patch('time.sleep')
+    @mock.patch('kallisticore.modules.common.TrialStopSignals.sleep')
     def test_wait_for_15_seconds(self, mock_sleep):
         wait(time_in_seconds=15)
         mock_sleep.assert_called_once_with(15)
@@ -1,5 +1,8 @@
 import base64
+import os
 import re
+import tempfile
+import threading
 from unittest import TestCase, mock
 from unittest.mock import mock_open
 
@@ -102,82 +105,125 @@ class TestKubernetesAction(TestCase):
             ns=self.namespace, label_selector=self.label_selector,
             qty=self.qty, secrets=expected_credential)
 
-    @mock.patch('kallisticore.modules.kubernetes.'
-                'kubernetes_actions.RequestSigner')
-    def test_execute_eks_under_cf(self, mock_signer_cls):
-        mock_signer = mock.Mock()
-        mock_signer.generate_presigned_url.return_value = 'test-token'
-        mock_signer_cls.return_value = mock_signer
-        mock_fd = mock.Mock()
+    def test_unsupported_platform(self):
+        self.arguments['platform'] = 'UNSUPPORTED_PLATFORM'
+        with self.assertRaises(FailedAction) as context:
+            action = KubernetesAction(mock.Mock(), self.arguments, [])
+            action.execute()
+        self.assertEqual(
+            'K8s on the platform: unsupported_platform is not supported.',
+            str(context.exception))
+
+
+class MockServiceModel:
+    service_id = 'test-service-id'
+
 
-        class MockServiceModel:
-            service_id = 'test-service-id'
+class MockBoto3Session:
+    events = 'test-session-events'
+    describe_cluster_calls = []
 
-        class MockBoto3Session:
-            events = 'test-session-events'
+    def __init__(self, **kwargs):
+        pass
 
-            def __init__(self, **kwargs):
-                pass
+    class MockEksClient:
+        def describe_cluster(self, **kwargs):
+            MockBoto3Session.describe_cluster_calls.append(kwargs)
+            name = kwargs['name']
+            return {'cluster': {
+                'certificateAuthority': {'data': 'test-ca-data'},
+                'endpoint': '{}-endpoint'.format(name),
+                'arn': '{}-arn'.format(name)}}
 
-            class MockEksClient:
-                def describe_cluster(self, **kwargs):
-                    return {'cluster': {
-                        'certificateAuthority': {
-                            'data': 'test-ca-data'},
-                        'endpoint': 'test-cluster-endpoint',
-                        'arn': 'test-cluster-arn'}}
+    class MockStsClient:
+        class Meta:
+            service_model = MockServiceModel
 
-            class MockStsClient:
-                class Meta:
-                    service_model = MockServiceModel
+        meta = Meta
 
-                meta = Meta
+    def client(self, service, **kwargs):
+        if service == 'eks':
+            return self.MockEksClient()
+        elif service == 'sts':
+            return self.MockStsClient()
 
-            def client(self, service, **kwargs):
-                if service == 'eks':
-                    return self.MockEksClient()
-                elif service == 'sts':
-                    return self.MockStsClient()
+    def get_credentials(self):
+        return 'test-credentials'
 
-            def get_credentials(self):
-                return 'test-credentials'
 
-        class MockBoto3SessionModule:
-            class SessionWrapper:
-                Session = MockBoto3Session
+class MockBoto3SessionModule:
+    class SessionWrapper:
+        Session = MockBoto3Session
 
-            DEFAULT_SESSION = None
-            session = SessionWrapper
+    DEFAULT_SESSION = None
+    session = SessionWrapper
 
-            @staticmethod
-            def setup_default_session(**kwargs):
-                return True
+    @staticmethod
+    def setup_default_session(**kwargs):
+        return True
 
-        boto3_path = 'kallisticore.modules.kubernetes.kubernetes_actions.boto3'
+
+class TestKubernetesActionOnEks(TestCase):
+    module_map = {'k8s': 'kallisticore.modules.kubernetes'}
+    BOTO3 = 'kallisticore.modules.kubernetes.kubernetes_actions.boto3'
+    SIGNER = 'kallisticore.modules.kubernetes.kubernetes_actions.RequestSigner'
+    HOME = 'kallisticore.modules.kubernetes.kubernetes_actions.Path.home'
+    MONOTONIC = 'kallisticore.modules.kubernetes.kubernetes_actions.' \
+                'time.monotonic'
+
+    def setUp(self):
+        KubernetesAction.clear_eks_contexts()
+        MockBoto3Session.describe_cluster_calls = []
+        self.home = tempfile.TemporaryDirectory()
+        self.mock_signer = mock.Mock()
+        self.mock_signer.generate_presigned_url.side_effect = \
+            ['test-token', 'test-token-2']
+        self.patches = [mock.patch(self.BOTO3, MockBoto3SessionModule),
+                        mock.patch(self.HOME, return_value=self.home.name),
+                        mock.patch(self.SIGNER,
+                                   return_value=self.mock_signer)]
+        self.mock_signer_cls = [patch.start() for patch in self.patches][-1]
+
+    def tearDown(self):
+        for patch in self.patches:
+            patch.stop()
+        self.home.cleanup()
+        KubernetesAction.clear_eks_contexts()
+
+    def _execute_step(self, cluster_name='test-cluster'):
         arguments = {'platform': 'EKS',
-                     'cluster_name': 'test-cluster',
+                     'cluster_name': cluster_name,
                      'region': 'test-region',
-                     'ns': self.namespace,
-                     'label_selector': self.label_selector,
-                     'qty': self.qty}
-        action_spec = {'step': 'Test Kubernetes Action',
-                       'do': 'k8s.terminate_pods',
-                       'where': arguments}
-        step = Step.build(action_spec)
-        with mock.patch(boto3_path, MockBoto3SessionModule), \
-                mock.patch("builtins.open") as mock_open, \
-                mock.patch('chaosk8s.pod.actions.terminate_pods') \
+                     'ns': 'test-namespace',
+                     'label_selector': 'test-label-selector',
+                     'qty': 1}
+        step = Step.build({'step': 'Test Kubernetes Action',
+                           'do': 'k8s.terminate_pods',
+                           'where': arguments})
+        with mock.patch('chaosk8s.pod.actions.terminate_pods') \
                 as mock_terminate_pods:
-            mock_open.return_value = mock_fd
             action = KubernetesAction.build(step, self.module_map, {})
             action.execute()
-        mock_signer_cls.assert_called_with(
+        return mock_terminate_pods
+
+    def _read_k8s_config(self):
+        with open(os.path.join(self.home.name, '.kube', 'config')) as fd:
+            return yaml.safe_load(fd)
+
+    @staticmethod
+    def _expected_token(token):
+        return 'k8s-aws-v1.' + re.sub(
+            r'=*', '', base64.urlsafe_b64encode(
+                token.encode('utf-8')).decode('utf-8'))
+
+    def test_execute_eks_under_cf(self):
+        mock_terminate_pods = self._execute_step()
+
+        self.mock_signer_cls.assert_called_once_with(
             'test-service-id', 'test-region', 'sts', 'v4', 'test-credentials',
             'test-session-events')
-        expected_token = 'k8s-aws-v1.' + re.sub(
-            r'=*', '', base64.urlsafe_b64encode(
-                'test-token'.encode('utf-8')).decode('utf-8'))
-        expected_k8s_context = yaml.dump({
+        self.mock_signer.generate_presigned_url.assert_called_once()
+        self.assertEqual({
             'apiVersion': 'v1',
             'clusters': [
                 {'cluster': {'server': 'test-cluster-endpoint',
@@ -188,19 +234,82 @@ class TestKubernetesAction(TestCase):
                           'name': 'test-cluster-arn'}],
             'current-context': 'test-cluster-arn',
             'users': [{'name': 'test-cluster-arn',
-                       'user': {'token': expected_token}}]},
-            default_flow_style=False)
-        mock_fd.write.assert_called_with(expected_k8s_context)
+                       'user': {'token': self._expected_token(
+                           'test-token')}}]},
+            self._read_k8s_config())
         expected_credential = {'KUBERNETES_CONTEXT': 'test-cluster-arn'}
         mock_terminate_pods.assert_called_once_with(
-            ns=self.namespace, label_selector=self.label_selector,
-            qty=self.qty, secrets=expected_credential)
+            ns='test-namespace', label_selector='test-label-selector',
+            qty=1, secrets=expected_credential)
 
-    def test_unsupported_platform(self):
-        self.arguments['platform'] = 'UNSUPPORTED_PLATFORM'
-        with self.assertRaises(FailedAction) as context:
-            action = KubernetesAction(mock.Mock(), self.arguments, [])
-            action.execute()
-        self.assertEqual(
-            'K8s on the platform: unsupported_platform is not supported.',
-            str(context.exception))
+    def test_context_is_reused_until_token_expires(self):
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self._execute_step()
+        config_mtime = os.stat(os.path.join(self.home.name, '.kube',
+                                            'config')).st_mtime_ns
+        with mock.patch(self.MONOTONIC, return_value=1049):
+            mock_terminate_pods = self._execute_step()
+
+        self.assertEqual(1, len(MockBoto3Session.describe_cluster_calls))
+        self.mock_signer.generate_presigned_url.assert_called_once()
+        self.assertEqual(config_mtime, os.stat(os.path.join(
+            self.home.name, '.kube', 'config')).st_mtime_ns)
+        mock_terminate_pods.assert_called_once_with(
+            ns='test-namespace', label_selector='test-label-selector',
+            qty=1, secrets={'KUBERNETES_CONTEXT': 'test-cluster-arn'})
+
+    def test_token_is_refreshed_before_expiry(self):
+        with mock.patch(self.MONOTONIC, return_value=1000):
+            self._execute_step()
+        with mock.patch(self.MONOTONIC, return_value=1050):
+            self._execute_step()
+
+        self.assertEqual(1, len(MockBoto3Session.describe_cluster_calls))
+        self.assertEqual(2,
+                         self.mock_signer.generate_presigned_url.call_count)
+        self.assertEqual(self._expected_token('test-token-2'),
+                         self._read_k8s_config()['users'][0]['user']['token'])
+
+    def test_contexts_of_all_clusters_are_kept(self):
+        self._execute_step('cluster-1')
+        self._execute_step('cluster-2')
+
+        k8s_config = self._read_k8s_config()
+        self.assertEqual(['cluster-1-arn', 'cluster-2-arn'],
+                         [context['name']
+                          for context in k8s_config['contexts']])
+        self.assertEqual([self._expected_token('test-token'),
+                          self._expected_token('test-token-2')],
+                         [user['user']['token']
+                          for user in k8s_config['users']])
+
+    def test_aws_calls_for_a_cluster_do_not_block_other_clusters(self):
+        describe_cluster = MockBoto3Session.MockEksClient.describe_cluster
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow_describe_cluster(eks_client, **kwargs):
+            if kwargs['name'] == 'cluster-1':
+                started.set()
+                release.wait(5)
+            return describe_cluster(eks_client, **kwargs)
+
+        with mock.patch.object(MockBoto3Session.MockEksClient,
+                               'describe_cluster', slow_describe_cluster):
+            slow_step = threading.Thread(target=self._execute_step,
+                                         args=('cluster-1',))
+            slow_step.start()
+            started.wait(5)
+            other_step = threading.Thread(target=self._execute_step,
+                                          args=('cluster-2',))
+            other_step.start()
+            other_step.join(2)
+            other_step_blocked = other_step.is_alive()
+            release.set()
+            slow_step.join(5)
+            other_step.join(5)
+
+        self.assertFalse(other_step_blocked)
+        self.assertEqual(['cluster-2-arn', 'cluster-1-arn'],
+                         [context['name'] for context in
+                          self._read_k8s_config()['contexts']])
@@ -48,3 +48,61 @@ class TestXMLRenderer(TestCase):
                          '<list-item>mock_item_1</list-item>'
                          '<list-item>mock_item_2</list-item>'
                          '</root></report>\n')
+
+    @override_settings(KALLISTI_REPORT_HEADER_TITLE='my-kallisti-report')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XML_HEADER',
+                '<?xml_header?>')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XSL_HEADER',
+                '<?xsl_header?>')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XSL_TEMPLATE',
+                MockTemplateSource)
+    def test_render_stream(self):
+        xml_renderer = XMLRenderer()
+        items = [{'name': 'experiment-1', 'trials': iter([{'id': 1}, {}])},
+                 {'name': 'experiment-2', 'trials': []}]
+        chunks = list(xml_renderer.render_stream(items))
+        self.assertEqual(''.join(chunks),
+                         '<?xml_header?><?xsl_header?>'
+                         '<report>\n<?xsl_template?>'
+                         '<report-title>my-kallisti-report</report-title>'
+                         '<root>'
+                         '<list-item><name>experiment-1</name><trials>'
+                         '<list-item><id>1</id></list-item>'
+                         '<list-item></list-item>'
+                         '</trials></list-item>'
+                         '<list-item><name>experiment-2</name><trials>'
+                         '</trials></list-item>'
+                         '</root></report>\n')
+        self.assertIn('<list-item><id>1</id></list-item>', chunks)
+
+    @override_settings(KALLISTI_REPORT_HEADER_TITLE='my-kallisti-report')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XML_HEADER',
+                '<?xml_header?>')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XSL_HEADER',
+                '<?xsl_header?>')
+    @mock.patch('kallisticore.renderers.XMLRenderer.XSL_TEMPLATE',
+                MockTemplateSource)
+    def test_render_stream_closes_document_on_error(self):
+        def trials():
+            yield {'id': 1}
+            raise Exception('failed to read trials')
+
+        xml_renderer = XMLRenderer()
+        items = [{'name': 'experiment-1', 'trials': trials()},
+                 {'name': 'experiment-2', 'trials': []}]
+        with mock.patch.object(XMLRenderer.logger, 'exception') as \
+                mock_log_exception:
+            chunks = list(xml_renderer.render_stream(items))
+
+        self.assertEqual(''.join(chunks),
+                         '<?xml_header?><?xsl_header?>'
+                         '<report>\n<?xsl_template?>'
+                         '<report-title>my-kallisti-report</report-title>'
+                         '<root>'
+                         '<list-item><name>experiment-1</name><trials>'
+                         '<list-item><id>1</id></list-item>'
+                         '<error>The report is incomplete.</error>'
+                         '</trials></list-item>'
+                         '</root></report>\n')
+        mock_log_exception.assert_called_once_with(
+            'Failed to render the report.')
@@ -3,7 +3,7 @@ from collections import OrderedDict
 from django.db.models.signals import post_save
 from django.test import TestCase
 
-from kallisticore.models import Trial
+from kallisticore.models import Trial, TrialRecord
 from kallisticore.models.experiment import Experiment
 from kallisticore.models.trial import TrialStatus
 from kallisticore.serializers import TrialSerializer
@@ -51,3 +51,21 @@ class TestTrialSerializer(TestCase):
         self.assertEqual(data['executed_at'], self._trial.executed_at)
         self.assertEqual(data['completed_at'], None)
         self.assertEqual(data['initiated_by'], 'user-a')
+
+    def test_trial_serialization_with_appended_records(self):
+        trial = Trial.create(experiment=self._experiment)
+        TrialRecord.objects.create(
+            trial=trial, trial_stage='steps',
+            record={'step_name': 'Stop app', 'logs': ['test']})
+        TrialRecord.objects.create(trial=trial, trial_stage='result',
+                                   record={'logs': ['completed']})
+        TrialRecord.objects.create(
+            trial=trial, trial_stage='pre_steps',
+            record={'step_name': 'Probe', 'logs': ['test1']})
+
+        data = TrialSerializer(trial).data
+
+        self.assertEqual(data['trial_record'], OrderedDict(
+            [('pre_steps', [{'step_name': 'Probe', 'logs': ['test1']}]),
+             ('steps', [{'step_name': 'Stop app', 'logs': ['test']}]),
+             ('result', [{'logs': ['completed']}])]))
@@ -5,7 +5,7 @@ from django.test import TestCase
 
 from kallisticore.models import Trial
 from kallisticore.tasks import _schedule_trials, \
-    execute_trial, schedule_trials
+    execute_trial, schedule_trials, warm_action_registry, enqueue_trials
 
 
 class TestExecuteTrialTask(TestCase):
@@ -26,8 +26,33 @@ class TestScheduleTrialTask(TestCase):
 
         method_mock.assert_called_once_with(60)
 
+    @mock.patch('kallisticore.tasks.enqueue_trials')
     @mock.patch('kallisticore.tasks.schedule')
-    def test_trial_schedule_is_invoked(self, mock_trial_schedule):
+    def test_trial_schedule_is_invoked(self, mock_trial_schedule,
+                                       mock_enqueue_trials):
         interval_seconds = 55
         _schedule_trials(interval_seconds)
         mock_trial_schedule.assert_called_with(interval_seconds)
+        mock_enqueue_trials.assert_called_once_with(
+            mock_trial_schedule.return_value)
+
+    @mock.patch('kallisticore.tasks.execute_trial')
+    def test_enqueue_trials(self, mock_execute_trial):
+        trials = [Mock(spec=Trial), Mock(spec=Trial)]
+        hook = Mock()
+        with self.settings(TRIAL_TASK_CREATION_HOOKS=[hook]):
+            enqueue_trials(trials)
+
+        self.assertEqual([mock.call(trial) for trial in trials],
+                         hook.call_args_list)
+        self.assertEqual([mock.call(trial) for trial in trials],
+                         mock_execute_trial.call_args_list)
+
+
+class TestWarmActionRegistry(TestCase):
+
+    @mock.patch("kallisticore.tasks.ActionRegistry.build")
+    def test_action_registry_is_built(self, mock_build):
+        warm_action_registry()
+
+        mock_build.assert_called_once_with()
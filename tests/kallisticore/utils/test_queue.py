@@ -0,0 +1,49 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from huey import FileHuey, MemoryHuey, SqliteHuey
+from huey.storage import SqliteStorage
+
+from kallisticore.utils.queue import make_huey
+
+
+class TestMakeHuey(TestCase):
+    def test_make_memory_huey(self):
+        huey = make_huey('memory')
+
+        self.assertIsInstance(huey, MemoryHuey)
+        self.assertEqual('kallisti_queues', huey.name)
+
+    def test_make_sqlite_huey_in_wal_mode(self):
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, 'queues.sqlite3')
+            huey = make_huey('sqlite', 'test_queue', filename=filename,
+                             journal_mode='wal')
+
+            self.assertIsInstance(huey, SqliteHuey)
+            self.assertIsInstance(huey.storage, SqliteStorage)
+            with huey.storage.db() as cursor:
+                journal_mode = cursor.execute(
+                    'PRAGMA journal_mode').fetchone()[0]
+            self.assertEqual('wal', journal_mode)
+            huey.storage.close()
+
+    def test_make_file_huey(self):
+        with tempfile.TemporaryDirectory() as directory:
+            huey = make_huey('file', path=directory)
+
+            self.assertIsInstance(huey, FileHuey)
+
+            task = huey.task(name='add')(lambda a, b: a + b)
+            task(1, 2)
+            self.assertEqual(1, huey.pending_count())
+            self.assertEqual(3, huey.execute(huey.dequeue()))
+
+    def test_make_huey_of_unsupported_backend(self):
+        with self.assertRaises(ValueError) as error:
+            make_huey('kafka')
+
+        self.assertEqual("Unsupported queue backend: kafka, expected one of "
+                         "['file', 'memory', 'redis', 'sqlite']",
+                         str(error.exception))
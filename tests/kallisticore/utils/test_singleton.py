@@ -1,3 +1,5 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest import TestCase
 
 from kallisticore.utils.singleton import Singleton
@@ -22,6 +24,15 @@ class ClassC(metaclass=Singleton):
         self.b = b
 
 
+class ClassD(metaclass=Singleton):
+    created = 0
+
+    def __init__(self):
+        ClassD.created += 1
+        time.sleep(0.01)
+        self.a = ClassA()
+
+
 class TestSingleton(TestCase):
 
     def test_no_argument(self):
@@ -43,3 +54,11 @@ class TestSingleton(TestCase):
         self.assertEqual(id(ClassC(1, b=2)), id(ClassC(a=1, b=2)))
         self.assertEqual(id(ClassC(1, 2)), id(ClassC(a=1, b=2)))
         self.assertNotEqual(id(ClassC(1, b=2)), id(ClassC(a=3, b=4)))
+
+    def test_concurrent_calls_create_one_instance(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instances = list(executor.map(lambda _: ClassD(), range(8)))
+
+        self.assertEqual(1, ClassD.created)
+        self.assertTrue(all(instance is instances[0]
+                            for instance in instances))
@@ -22,7 +22,7 @@ class TestExperimentListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_list_experiments(self):
         experiment1 = Experiment.create(
@@ -34,11 +34,28 @@ class TestExperimentListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
+        response_data = response.data['results']
         self.assertEqual(len(response_data), 2)
         self.assertIn(ExperimentSerializer(experiment1).data, response_data)
         self.assertIn(ExperimentSerializer(experiment2).data, response_data)
 
+    def test_list_experiments_by_page(self):
+        experiments = [Experiment.create(name='experiment-{}'.format(index))
+                       for index in range(3)]
+
+        url = reverse('experiment-list')
+        response = self.client.get(url, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(experiments[2].id), str(experiments[1].id)],
+                         [experiment['id']
+                          for experiment in response.data['results']])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([str(experiments[0].id)],
+                         [experiment['id']
+                          for experiment in response.data['results']])
+        self.assertIsNone(response.data['next'])
+
 
 class TestExperimentGetAPI(KallistiTestSuite):
     def setUp(self):
@@ -68,6 +85,28 @@ class TestExperimentGetAPI(KallistiTestSuite):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data, ExperimentSerializer(experiment).data)
 
+    def test_get_details_not_modified(self):
+        experiment = Experiment.create(
+            name='kill-my-web-cf-app-instance', description='HA experiment')
+        url = reverse('experiment-detail', args=[experiment.id])
+        etag = self.client.get(url, format='json')['ETag']
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, format='json',
+                                       HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(etag, response['ETag'])
+
+        experiment.description = 'DR experiment'
+        experiment.save()
+        response = self.client.get(url, format='json',
+                                   HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(etag, response['ETag'])
+        self.assertEqual({'private', 'no-cache'},
+                         set(response['Cache-Control'].split(', ')))
+        self.assertEqual('DR experiment', response.data['description'])
+
 
 class TestExperimentCreateAPI(KallistiTestSuite):
     def setUp(self):
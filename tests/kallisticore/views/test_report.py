@@ -1,9 +1,16 @@
+from unittest import mock
+from xml.etree import ElementTree
+
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
-from kallisticore.models import Experiment, Trial
+from kallisticore.models import Experiment, Trial, TrialRecord
+from kallisticore.renderers import XMLRenderer
 from kallisticore.serializers import ReportSerializer
-from kallisticore.views.report import trial_id_query_param
+from kallisticore.views.report import ExperimentTrials, \
+    trial_id_query_param
 from tests.kallisticore.base import KallistiTestSuite
 
 
@@ -29,12 +36,18 @@ class TestReportAPI(KallistiTestSuite):
         self.client.credentials()
         super(TestReportAPI, self).tearDown()
 
+    def _get_content(self, response):
+        self.assertEqual('application/xml; charset=utf-8',
+                         response['Content-Type'])
+        return b''.join(response.streaming_content).decode()
+
     def test_list_report_empty_experiment(self):
         url = reverse('report')
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(XMLRenderer().render([]),
+                         self._get_content(response))
 
     def test_list_report_experiments_without_trials(self):
         experiment1 = Experiment.create(
@@ -46,26 +59,95 @@ class TestReportAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
-        self.assertEqual(len(response_data), 2)
-        self.assertIn(ReportSerializer(experiment1).data, response_data)
-        self.assertIn(ReportSerializer(experiment2).data, response_data)
+        content = self._get_content(response)
+        self.assertEqual(XMLRenderer().render(ReportSerializer(
+            Experiment.objects.order_by('created_at', 'id'), many=True).data),
+            content)
+        self.assertIn('<id>{}</id>'.format(experiment1.id), content)
+        self.assertIn('<id>{}</id>'.format(experiment2.id), content)
 
     def test_list_report_experiments_with_trials(self):
         experiment = Experiment.create(
             name='kill-my-web-cf-app-instance', description='HA experiment')
 
+        trial = Trial.create(experiment=experiment)
+        TrialRecord.objects.create(trial=trial, trial_stage='result',
+                                   record={'logs': ['Trial Succeeded']})
         Trial.create(experiment=experiment)
 
         url = reverse('report')
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
-        self.assertEqual(len(response_data), 1)
-        self.assertIn(ReportSerializer(experiment).data, response_data)
-        self.assertEqual(ReportSerializer(experiment).data['trials'][0]['id'],
-                         response_data[0]['trials'][0]['id'])
+        content = self._get_content(response)
+        self.assertEqual(
+            XMLRenderer().render([ReportSerializer(experiment).data]),
+            content)
+        self.assertIn('<id>{}</id>'.format(trial.id), content)
+        self.assertIn('Trial Succeeded', content)
+        self.assertNotIn('<created_at>', content)
+        self.assertNotIn('<updated_at>', content)
+
+    @override_settings(KALLISTI_REPORT_CHUNK_SIZE=2)
+    def test_list_report_streams_trials_in_chunks(self):
+        experiment = Experiment.create(
+            name='kill-my-web-cf-app-instance', description='HA experiment')
+        for _ in range(5):
+            Trial.create(experiment=experiment)
+
+        url = reverse('report')
+        response = self.client.get(url, format='json')
+        chunks = iter(response.streaming_content)
+        head = next(chunks)
+        # the trials and the records of each chunk of two trials
+        with self.assertNumQueries(5):
+            content = head + b''.join(chunks)
+
+        self.assertEqual(
+            XMLRenderer().render([ReportSerializer(experiment).data]),
+            content.decode())
+
+    def test_list_report_queries(self):
+        experiments = [Experiment.create(name='experiment-{}'.format(index))
+                       for index in range(3)]
+        for experiment in experiments:
+            for stage in ['steps', 'result']:
+                trial = Trial.create(experiment=experiment)
+                TrialRecord.objects.create(trial=trial, trial_stage=stage,
+                                           record={'logs': [stage]})
+
+        url = reverse('report')
+        response = self.client.get(url, format='json')
+        chunks = iter(response.streaming_content)
+        head = next(chunks)
+        # the experiments, the trials and the records of the trials
+        with self.assertNumQueries(3):
+            content = head + b''.join(chunks)
+
+        self.assertEqual(XMLRenderer().render(ReportSerializer(
+            Experiment.objects.order_by('created_at', 'id'), many=True).data),
+            content.decode())
+
+    def test_list_report_failing_trial(self):
+        experiment = Experiment.create(
+            name='kill-my-web-cf-app-instance', description='HA experiment')
+        Trial.create(experiment=experiment)
+
+        url = reverse('report')
+        with mock.patch('kallisticore.serializers.TrialForReportSerializer'
+                        '.to_representation',
+                        side_effect=Exception('failed to serialize')), \
+                mock.patch.object(XMLRenderer.logger, 'exception') as \
+                mock_log_exception:
+            response = self.client.get(url, format='json')
+            content = self._get_content(response)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        report = ElementTree.fromstring(content)
+        self.assertEqual('The report is incomplete.',
+                         report.find('root/list-item/trials/error').text)
+        mock_log_exception.assert_called_once_with(
+            'Failed to render the report.')
 
     def test_get_report_by_trial_id(self):
         experiment_1 = Experiment.create(name='test-experiment-1',
@@ -77,7 +159,7 @@ class TestReportAPI(KallistiTestSuite):
         trial = Trial.create(experiment=experiment_1)
         query_param = '?trial-id=%s' % trial.id
         # make sure report is generated only for only specified trial
-        Trial.create(experiment=experiment_1)
+        other_trial = Trial.create(experiment=experiment_1)
 
         url = reverse('report')
         response = self.client.get(url + query_param, format='json')
@@ -86,8 +168,40 @@ class TestReportAPI(KallistiTestSuite):
             'trial_id': trial.id})
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
-        self.assertEqual(len(response_data), 1)
-        self.assertIn(expected_report_serializer.data, response_data)
-        self.assertEqual(expected_report_serializer.data['trials'][0]['id'],
-                         response_data[0]['trials'][0]['id'])
+        content = self._get_content(response)
+        self.assertEqual(
+            XMLRenderer().render([expected_report_serializer.data]), content)
+        self.assertNotIn(str(other_trial.id), content)
+
+
+class TestExperimentTrials(KallistiTestSuite):
+
+    def test_trials_of_each_experiment(self):
+        experiments = [Experiment.create(name='experiment-{}'.format(index))
+                       for index in range(4)]
+        trials = {experiment.id: [Trial.create(experiment=experiment)
+                                  for _ in range(2)]
+                  for experiment in experiments[1:]}
+        # the trials of the experiments left out are not read
+        experiment_trials = ExperimentTrials(
+            Experiment.objects.exclude(id=experiments[2].id))
+
+        self.assertEqual([experiments[0], experiments[1], experiments[3]],
+                         list(experiment_trials.experiments))
+        self.assertEqual([], list(experiment_trials(experiments[0])))
+        for experiment in [experiments[1], experiments[3]]:
+            self.assertEqual(trials[experiment.id],
+                             list(experiment_trials(experiment)))
+
+    def test_experiments_created_at_the_same_time(self):
+        created_at = timezone.now()
+        experiments = [Experiment.create(name='experiment-{}'.format(index),
+                                         created_at=created_at)
+                       for index in range(3)]
+        trials = {experiment.id: Trial.create(experiment=experiment)
+                  for experiment in experiments}
+        experiment_trials = ExperimentTrials(Experiment.objects.all())
+
+        for experiment in experiment_trials.experiments:
+            self.assertEqual([trials[experiment.id]],
+                             list(experiment_trials(experiment)))
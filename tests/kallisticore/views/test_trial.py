@@ -1,13 +1,18 @@
 from unittest import mock
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
 import kallisticore
+import kallisticore.permissions
 from kallisticore import signals
 from kallisticore.authentication import KallistiUser
-from kallisticore.models import Experiment, Trial
+from kallisticore.models import Experiment, Trial, TrialRecord
 from kallisticore.models.step import Step
+from kallisticore.models.trial import TrialStatus
 from kallisticore.serializers import TrialSerializer
 from kallisticore.signals import execute_plan_for_trial
 from tests.kallisticore.base import KallistiTestSuite
@@ -49,7 +54,7 @@ class TestTrialListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_list_trials(self):
         trial = Trial.create(experiment=self._experiment,
@@ -59,7 +64,7 @@ class TestTrialListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
+        response_data = response.data['results']
         self.assertEqual(len(response_data), 1)
         self.assertIn(TrialSerializer(trial).data, response_data)
 
@@ -72,9 +77,81 @@ class TestTrialListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
+        response_data = response.data['results']
         self.assertEqual(len(response_data), 0)
 
+    def test_list_trials_by_page(self):
+        trials = [Trial.create(experiment=self._experiment,
+                               parameters=self.parameters)
+                  for _ in range(5)]
+
+        url = reverse('trial-list')
+        response = self.client.get(url, {'page_size': 2})
+        trial_ids = [trial['id'] for trial in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            trial_ids.extend(trial['id'] for trial in response.data['results'])
+
+        self.assertEqual([str(trial.id) for trial in reversed(trials)],
+                         trial_ids)
+
+    def test_list_trials_created_at_the_same_time_by_page(self):
+        created_at = timezone.now()
+        trials = [Trial.create(experiment=self._experiment,
+                               parameters=self.parameters,
+                               created_at=created_at)
+                  for _ in range(5)]
+
+        url = reverse('trial-list')
+        response = self.client.get(url, {'page_size': 2})
+        trial_ids = [trial['id'] for trial in response.data['results']]
+        while response.data['next']:
+            response = self.client.get(response.data['next'])
+            trial_ids.extend(trial['id'] for trial in response.data['results'])
+
+        self.assertEqual(sorted([str(trial.id) for trial in trials],
+                                reverse=True), trial_ids)
+
+    def test_list_trials_with_default_page_size(self):
+        for _ in range(3):
+            Trial.create(experiment=self._experiment,
+                         parameters=self.parameters)
+
+        url = reverse('trial-list')
+        with self.settings(KALLISTI_API_PAGE_SIZE=2):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(2, len(response.data['results']))
+        self.assertIsNotNone(response.data['next'])
+        self.assertIsNone(response.data['previous'])
+
+    def test_list_trials_without_page_size(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+
+        url = reverse('trial-list')
+        with self.settings(KALLISTI_API_PAGE_SIZE=None):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([TrialSerializer(trial).data], response.data)
+
+    def test_list_trials_page_reads_after_cursor(self):
+        for _ in range(3):
+            Trial.create(experiment=self._experiment,
+                         parameters=self.parameters)
+        url = reverse('trial-list')
+        next_url = self.client.get(url, {'page_size': 1}).data['next']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(next_url)
+
+        self.assertEqual(1, len(response.data['results']))
+        trial_query = queries.captured_queries[0]['sql']
+        self.assertIn('"kallisticore_trial"."created_at" <', trial_query)
+        self.assertNotIn('OFFSET', trial_query)
+
 
 class TestTrialGetAPI(KallistiTestSuite):
 
@@ -117,6 +194,22 @@ class TestTrialGetAPI(KallistiTestSuite):
         response_data = response.data
         self.assertEqual(TrialSerializer(trial).data, response_data)
 
+    def test_get_trial_record_of_stages(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+        for trial_stage in ['pre_steps', 'steps', 'post_steps']:
+            TrialRecord.objects.create(trial=trial, trial_stage=trial_stage,
+                                       record={'logs': [trial_stage]})
+
+        url = reverse('trial-detail', args=[trial.id])
+        response = self.client.get(url, {'trial-record-stages':
+                                         'steps,post_steps'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'steps': [{'logs': ['steps']}],
+                          'post_steps': [{'logs': ['post_steps']}]},
+                         response.data['trial_record'])
+
     def test_get_non_existing_trial(self):
         url = reverse('trial-detail', args=[self.notexists])
         response = self.client.get(url, format='json')
@@ -150,6 +243,83 @@ class TestTrialGetAPI(KallistiTestSuite):
         response_data = response.data
         self.assertEqual(TrialSerializer(trial).data, response_data)
 
+    def test_get_trial_not_modified(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+        url = reverse('trial-detail', args=[trial.id])
+        etag = self.client.get(url, format='json')['ETag']
+
+        # the trial and its records are read, but not serialized
+        with self.assertNumQueries(2), \
+                mock.patch.object(TrialSerializer, 'to_representation') \
+                as mock_to_representation:
+            response = self.client.get(url, format='json',
+                                       HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(etag, response['ETag'])
+        self.assertEqual(b'', response.content)
+        mock_to_representation.assert_not_called()
+
+    def test_get_trial_not_modified_checks_permissions(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+        url = reverse('trial-detail', args=[trial.id])
+        etag = self.client.get(url, format='json')['ETag']
+
+        with mock.patch.object(
+                kallisticore.permissions.DefaultUserPermission,
+                'has_object_permission', return_value=False):
+            response = self.client.get(url, format='json',
+                                       HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_get_trial_modified(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+        url = reverse('trial-detail', args=[trial.id])
+        etags = [self.client.get(url, format='json')['ETag']]
+
+        TrialRecord.objects.create(trial=trial, trial_stage='steps',
+                                   record={'logs': ['started']})
+        etags.append(self.client.get(url, format='json')['ETag'])
+        trial.update_status(TrialStatus.IN_PROGRESS)
+        etags.append(self.client.get(url, format='json')['ETag'])
+        etags.append(self.client.get(url, {'trial-record-stages': 'steps'},
+                                     format='json')['ETag'])
+
+        self.assertEqual(4, len(set(etags)))
+        response = self.client.get(url, format='json',
+                                   HTTP_IF_NONE_MATCH=etags[0])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(etags[2], response['ETag'])
+        self.assertEqual({'private', 'no-cache'},
+                         set(response['Cache-Control'].split(', ')))
+        self.assertIn('Authorization', response['Vary'].split(', '))
+
+    def test_get_completed_trial_is_cached(self):
+        trial = Trial.create(experiment=self._experiment,
+                             parameters=self.parameters)
+        trial.update_status(TrialStatus.SUCCEEDED)
+
+        url = reverse('trial-detail', args=[trial.id])
+        with self.settings(KALLISTI_COMPLETED_TRIAL_CACHE_MAX_AGE_SECONDS=60):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual({'private', 'max-age=60'},
+                         set(response['Cache-Control'].split(', ')))
+        self.assertIn('Authorization', response['Vary'].split(', '))
+
+    def test_get_non_existing_trial_without_etag(self):
+        url = reverse('trial-detail', args=[self.notexists])
+        response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
 
 class TestTrialCreateAPI(KallistiTestSuite):
     def setUp(self):
@@ -1,5 +1,6 @@
 from django.urls import reverse
-from kallisticore.models import Experiment
+from django.utils import timezone
+from kallisticore.models import Experiment, Trial
 from kallisticore.models.trial_schedule import TrialSchedule
 from kallisticore.serializers import TrialScheduleSerializer
 from rest_framework import status
@@ -26,7 +27,7 @@ class TestTrialScheduleListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, [])
+        self.assertEqual(response.data['results'], [])
 
     def test_list_schedules(self):
         trial_schedule = TrialSchedule.create(
@@ -39,7 +40,7 @@ class TestTrialScheduleListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
+        response_data = response.data['results']
         self.assertEqual(len(response_data), 1)
         self.assertIn(TrialScheduleSerializer(trial_schedule).data,
                       response_data)
@@ -56,9 +57,47 @@ class TestTrialScheduleListAPI(KallistiTestSuite):
         response = self.client.get(url, format='json')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        response_data = response.data
+        response_data = response.data['results']
         self.assertEqual(len(response_data), 0)
 
+    def test_list_schedules_by_page(self):
+        trial_schedules = [TrialSchedule.create(experiment=self._experiment,
+                                                recurrence_pattern='* * * * *')
+                           for _ in range(3)]
+
+        url = reverse('trial-schedule-list',
+                      kwargs={'experiment_id': self._experiment.id})
+        response = self.client.get(url, {'page_size': 2})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([str(trial_schedules[2].id),
+                          str(trial_schedules[1].id)],
+                         [trial_schedule['id'] for trial_schedule
+                          in response.data['results']])
+        self.assertIsNotNone(response.data['next'])
+
+    def test_list_schedules_queries(self):
+        for _ in range(5):
+            trial_schedule = TrialSchedule.create(
+                experiment=self._experiment, recurrence_pattern='* * * * *')
+            trial_schedule.trials.add(
+                Trial.create(experiment=self._experiment,
+                             executed_at=timezone.now()),
+                Trial.create(experiment=self._experiment))
+
+        url = reverse('trial-schedule-list',
+                      kwargs={'experiment_id': self._experiment.id})
+        # the schedules and the trials of all the schedules
+        with self.assertNumQueries(2):
+            response = self.client.get(url, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            TrialScheduleSerializer(TrialSchedule.objects.filter(
+                experiment=self._experiment).order_by('-created_at', '-id'),
+                many=True).data,
+            response.data['results'])
+
 
 class TestTrialScheduleDetailAPI(KallistiTestSuite):
 
@@ -0,0 +1,109 @@
+from unittest import mock
+from uuid import uuid4
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from kallisticore import signals
+from kallisticore.models import Experiment, Trial, TrialRecord
+from kallisticore.models.trial import TrialStatus
+from kallisticore.signals import execute_plan_for_trial
+from kallisticore.views.trial_stream import TrialStreamAPI
+from tests.kallisticore.base import KallistiTestSuite
+
+
+class TestTrialStreamAPI(KallistiTestSuite):
+    def setUp(self):
+        self._token = '123123123123123'
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ' + self._token)
+        self._experiment = Experiment.create(name='one-action', steps=[])
+        super(TestTrialStreamAPI, self).setUp()
+        signals.post_save.disconnect(execute_plan_for_trial, sender=Trial)
+        self.trial = Trial.create(experiment=self._experiment)
+        self.records = [
+            TrialRecord.objects.create(trial=self.trial, trial_stage=stage,
+                                       record={'logs': [stage]})
+            for stage in ['steps', 'result']]
+        self.trial.update_status(TrialStatus.SUCCEEDED)
+
+    def tearDown(self):
+        TrialStreamAPI.open_streams = 0
+        self.client.credentials()
+        super(TestTrialStreamAPI, self).tearDown()
+        signals.post_save.connect(execute_plan_for_trial, sender=Trial)
+
+    def _get_content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_stream_trial_events(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual('text/event-stream', response['Content-Type'])
+        self.assertEqual('no-cache', response['Cache-Control'])
+        content = self._get_content(response)
+        for record in self.records:
+            self.assertIn('id: {}\nevent: record'.format(record.id), content)
+        self.assertIn('event: end', content)
+
+    def test_stream_resumes_from_last_event_id(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        response = self.client.get(
+            url, HTTP_LAST_EVENT_ID=str(self.records[0].id))
+
+        content = self._get_content(response)
+        self.assertNotIn('id: {}\n'.format(self.records[0].id), content)
+        self.assertIn('id: {}\n'.format(self.records[1].id), content)
+
+    def test_stream_resumes_from_last_event_id_parameter(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        with mock.patch('kallisticore.views.trial_stream.TrialEventStream')\
+                as mock_stream:
+            mock_stream.return_value = iter([])
+            self.client.get(url, {'last-event-id': self.records[1].id})
+
+        mock_stream.assert_called_once_with(self.trial.id,
+                                            self.records[1].id,
+                                            on_close=mock.ANY)
+
+    def test_stream_invalid_last_event_id(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        response = self.client.get(url, HTTP_LAST_EVENT_ID='abc')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual({"message": "Last event id must be an integer."},
+                         response.data)
+
+    def test_stream_non_existing_trial(self):
+        url = reverse('trial-stream', kwargs={'trial_id': uuid4()})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(KALLISTI_TRIAL_STREAM_MAX_CONNECTIONS=1)
+    def test_stream_rejected_when_too_many_streams_are_open(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        response = self.client.get(url)
+
+        rejected_response = self.client.get(url)
+        response.close()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(rejected_response.status_code,
+                         status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(
+            {"message": "Too many open trial streams, retry later."},
+            rejected_response.data)
+        self.assertEqual(status.HTTP_200_OK, self.client.get(url).status_code)
+
+    def test_stream_is_released_once_sent(self):
+        url = reverse('trial-stream', kwargs={'trial_id': self.trial.id})
+        response = self.client.get(url)
+        self.assertEqual(1, TrialStreamAPI.open_streams)
+
+        self._get_content(response)
+        response.close()
+
+        self.assertEqual(0, TrialStreamAPI.open_streams)